@@ -39,6 +39,7 @@ try:
     from src.partitions.models.partition import Partition # pyright: ignore[reportUnusedImport]
     from src.partitions.models.partition_file import PartitionFile # pyright: ignore[reportUnusedImport]
     from src.partitions.models.partition_file_tool import PartitionFileTool # pyright: ignore[reportUnusedImport]
+    from src.partitions.models.partition_file_summary import PartitionFileSummary # pyright: ignore[reportUnusedImport]
 except ImportError as e:
     print(f"Import error: {e}")
 
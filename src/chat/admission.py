@@ -0,0 +1,199 @@
+import asyncio
+import uuid
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import AsyncIterator, Dict, Optional, Tuple, Union
+
+from pydantic import BaseModel
+
+from src.chat.config import CHAT_SETTINGS
+from src.chat.constant import (
+    ADMIT_SCRIPT,
+    CHAT_ADMISSION_KEY,
+    PARTITION_ADMISSION_KEY,
+    RENEW_LEASE_SCRIPT,
+)
+from src.database import redis_manager
+from src.deadline import get_deadline
+from src.exceptions import TooManyRequestsError
+
+
+class AdmissionTicket(BaseModel):
+    """Run slot taken by one chat request, released once its run is over"""
+
+    partition_id: str
+    token: str
+
+
+_admission_ticket: ContextVar[Optional[AdmissionTicket]] = ContextVar(
+    "admission_ticket", default=None
+)
+
+
+class AdmissionController:
+    """Bounds the chat runs in progress, globally and per partition, across
+    every worker.
+
+    Run slots are Redis sorted sets of request tokens, leased for
+    lease_ttl_seconds and renewed while held, so only slots of a worker lost
+    mid run, or of a ticket abandoned past its request's deadline, expire.
+    Requests finding no free slot wait in a bounded queue per partition, first
+    come first served, for up to queue_timeout_seconds. Requests finding the queue full, or still queued at
+    their deadline, are rejected with a 429.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = CHAT_SETTINGS.ADMISSION_ENABLED,
+        global_limit: int = CHAT_SETTINGS.ADMISSION_GLOBAL_LIMIT,
+        partition_limit: int = CHAT_SETTINGS.ADMISSION_PARTITION_LIMIT,
+        queue_size: int = CHAT_SETTINGS.ADMISSION_QUEUE_SIZE,
+        queue_timeout_seconds: float = CHAT_SETTINGS.ADMISSION_QUEUE_TIMEOUT_SECONDS,
+        poll_interval_seconds: float = CHAT_SETTINGS.ADMISSION_POLL_INTERVAL_SECONDS,
+        lease_ttl_seconds: int = CHAT_SETTINGS.ADMISSION_LEASE_TTL_SECONDS,
+        retry_after_seconds: int = CHAT_SETTINGS.ADMISSION_RETRY_AFTER_SECONDS,
+        grace_seconds: float = CHAT_SETTINGS.TIMEOUT_GRACE_SECONDS,
+    ) -> None:
+        self.enabled = enabled
+        self.global_limit = global_limit
+        self.partition_limit = partition_limit
+        self.queue_size = queue_size
+        self.queue_timeout_seconds = queue_timeout_seconds
+        self.poll_interval_seconds = poll_interval_seconds
+        self.lease_ttl_seconds = lease_ttl_seconds
+        self.retry_after_seconds = retry_after_seconds
+        self.grace_seconds = grace_seconds
+        self._renew_tasks: Dict[str, asyncio.Task[None]] = {}
+
+    @staticmethod
+    def _get_keys(partition_id: str) -> Tuple[str, str, str, str]:
+        key = PARTITION_ADMISSION_KEY.format(partition_id=partition_id)
+        return (
+            f"{CHAT_ADMISSION_KEY}:leases",
+            f"{key}:leases",
+            f"{key}:queue",
+            f"{CHAT_ADMISSION_KEY}:queue",
+        )
+
+    async def get_queue_depth(self) -> int:
+        """Requests waiting for a run slot, across every partition"""
+        return await redis_manager.get_client().zcard(f"{CHAT_ADMISSION_KEY}:queue")
+
+    async def acquire(
+        self, partition_id: Union[uuid.UUID, str]
+    ) -> Optional[AdmissionTicket]:
+        """Waits for a run slot on the partition, raises TooManyRequestsError
+        when none frees up in time. Returns None when admission is disabled.
+        """
+        if not self.enabled:
+            return None
+
+        ticket = AdmissionTicket(partition_id=str(partition_id), token=uuid.uuid4().hex)
+        client = redis_manager.get_client()
+        keys = self._get_keys(ticket.partition_id)
+        deadline = asyncio.get_running_loop().time() + self.queue_timeout_seconds
+        request_deadline = get_deadline()
+        if request_deadline is not None:
+            deadline = min(deadline, request_deadline)
+
+        try:
+            while True:
+                admitted: int = await client.eval(  # type: ignore[misc]
+                    ADMIT_SCRIPT,
+                    len(keys),
+                    *keys,
+                    ticket.token,
+                    self.global_limit,
+                    self.partition_limit,
+                    self.lease_ttl_seconds,
+                    self.queue_size,
+                    self.queue_timeout_seconds,
+                )
+                if admitted == 1:
+                    # Tickets of a request are never held past its deadline,
+                    # one abandoned past it lets its lease expire
+                    renew_until = (
+                        None
+                        if request_deadline is None
+                        else request_deadline + self.grace_seconds
+                    )
+                    self._renew_tasks[ticket.token] = asyncio.create_task(
+                        self._renew(ticket, renew_until)
+                    )
+                    return ticket
+                if admitted == -1:
+                    raise TooManyRequestsError(
+                        "Too many chat requests queued, retry later",
+                        self.retry_after_seconds,
+                    )
+                if asyncio.get_running_loop().time() >= deadline:
+                    raise TooManyRequestsError(
+                        "Timed out waiting for a chat slot, retry later",
+                        self.retry_after_seconds,
+                    )
+                await asyncio.sleep(self.poll_interval_seconds)
+        except BaseException:
+            # Leaves the queue, or frees a slot taken by a cancelled call
+            await asyncio.shield(self.release(ticket))
+            raise
+
+    async def _renew(
+        self, ticket: AdmissionTicket, renew_until: Optional[float]
+    ) -> None:
+        """Keeps the slot of a run for as long as its ticket is held, up to
+        renew_until in loop time
+        """
+        client = redis_manager.get_client()
+        keys = self._get_keys(ticket.partition_id)
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                await asyncio.sleep(self.lease_ttl_seconds / 3)
+                if renew_until is not None and loop.time() >= renew_until:
+                    return
+                renewed: int = await client.eval(  # type: ignore[misc]
+                    RENEW_LEASE_SCRIPT,
+                    2,
+                    keys[0],
+                    keys[1],
+                    ticket.token,
+                    self.lease_ttl_seconds,
+                )
+                if not renewed:
+                    return
+        finally:
+            self._renew_tasks.pop(ticket.token, None)
+
+    async def release(self, ticket: Optional[AdmissionTicket]) -> None:
+        if ticket is None:
+            return
+
+        renew_task = self._renew_tasks.pop(ticket.token, None)
+        if renew_task is not None:
+            renew_task.cancel()
+
+        async with redis_manager.get_client().pipeline(transaction=False) as pipe:
+            for key in self._get_keys(ticket.partition_id):
+                pipe.zrem(key, ticket.token)
+            await pipe.execute()
+
+    @asynccontextmanager
+    async def admit(self, partition_id: Union[uuid.UUID, str]) -> AsyncIterator[None]:
+        """Holds a run slot on the partition for the duration of the block.
+
+        Blocks nested in it, and the tasks it spawns, share its slot.
+        """
+        if _admission_ticket.get() is not None:
+            yield
+            return
+
+        ticket = await self.acquire(partition_id)
+        token = _admission_ticket.set(ticket)
+        try:
+            yield
+        finally:
+            _admission_ticket.reset(token)
+            await asyncio.shield(self.release(ticket))
+
+
+admission_controller = AdmissionController()
@@ -0,0 +1,123 @@
+import base64
+import json
+import time
+import uuid
+from typing import List, Optional, Union
+
+import numpy as np
+from pydantic import BaseModel
+
+from src.chat.config import CHAT_SETTINGS
+from src.chat.constant import ANSWER_CACHE_KEY
+from src.database import redis_manager
+from src.tools.cache import get_partition_version
+
+
+class CachedAnswer(BaseModel):
+    query: str
+    response: str
+    similarity: float
+
+
+def _normalize(embedding: List[float]) -> np.ndarray:
+    vector = np.asarray(embedding, dtype=np.float32)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+def _encode_embedding(embedding: List[float]) -> str:
+    return base64.b64encode(_normalize(embedding).tobytes()).decode("ascii")
+
+
+def _decode_embedding(encoded: str) -> np.ndarray:
+    return np.frombuffer(base64.b64decode(encoded), dtype=np.float32)
+
+
+class SemanticAnswerCache:
+    """Redis cache of agent answers per (partition_id, tool_group), looked up by
+    cosine similarity of the query embedding.
+
+    The partition version is part of the key, so any change to the partition's
+    files or tools leaves older answers unreachable until they expire.
+    """
+
+    def __init__(
+        self,
+        threshold: float = CHAT_SETTINGS.ANSWER_CACHE_THRESHOLD,
+        ttl_seconds: int = CHAT_SETTINGS.ANSWER_CACHE_TTL_SECONDS,
+        max_entries: int = CHAT_SETTINGS.ANSWER_CACHE_MAX_ENTRIES,
+    ) -> None:
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+
+    async def _get_key(
+        self, partition_id: Union[uuid.UUID, str], tool_group: str
+    ) -> str:
+        version = await get_partition_version(partition_id)
+        return ANSWER_CACHE_KEY.format(
+            partition_id=partition_id, tool_group=tool_group, version=version
+        )
+
+    async def get(
+        self,
+        partition_id: Union[uuid.UUID, str],
+        tool_group: str,
+        query_embedding: List[float],
+    ) -> Optional[CachedAnswer]:
+        key = await self._get_key(partition_id, tool_group)
+        raw_entries: List[str] = await redis_manager.get_client().lrange(key, 0, -1)
+        if not raw_entries:
+            return None
+
+        current_time = time.time()
+        entries = [
+            entry
+            for entry in map(json.loads, raw_entries)
+            if current_time - entry["created_at"] <= self.ttl_seconds
+        ]
+        if not entries:
+            return None
+
+        query_vector = _normalize(query_embedding)
+        matrix = np.stack([_decode_embedding(entry["embedding"]) for entry in entries])
+        if matrix.shape[1] != query_vector.shape[0]:
+            return None
+
+        similarities = matrix @ query_vector
+        best = int(np.argmax(similarities))
+        if similarities[best] < self.threshold:
+            return None
+
+        return CachedAnswer(
+            query=entries[best]["query"],
+            response=entries[best]["response"],
+            similarity=float(similarities[best]),
+        )
+
+    async def set(
+        self,
+        partition_id: Union[uuid.UUID, str],
+        tool_group: str,
+        query: str,
+        query_embedding: List[float],
+        response: str,
+    ) -> None:
+        key = await self._get_key(partition_id, tool_group)
+        entry = json.dumps(
+            {
+                "query": query,
+                "response": response,
+                "embedding": _encode_embedding(query_embedding),
+                "created_at": time.time(),
+            }
+        )
+
+        async with redis_manager.get_client().pipeline(transaction=False) as pipe:
+            pipe.lpush(key, entry)
+            pipe.ltrim(key, 0, self.max_entries - 1)
+            pipe.expire(key, self.ttl_seconds)
+            await pipe.execute()
+
+
+answer_cache = SemanticAnswerCache()
@@ -0,0 +1,122 @@
+import asyncio
+import hashlib
+import json
+import uuid
+from typing import Any, Awaitable, Callable, Dict, Optional, Union
+
+from fastapi.encoders import jsonable_encoder
+
+from src.chat.config import CHAT_SETTINGS
+from src.chat.constant import (
+    CHAT_INFLIGHT_KEY,
+    RELEASE_LOCK_SCRIPT,
+    RENEW_LOCK_SCRIPT,
+)
+from src.database import redis_manager
+
+ChatLoader = Callable[[], Awaitable[Dict[str, Any]]]
+
+
+def normalize_message(message: str) -> str:
+    return " ".join(message.lower().split())
+
+
+class RequestCoalescer:
+    """Runs identical chat requests once, across every worker.
+
+    Requests are coalesced in process first, then through a Redis lock: the
+    request holding the lock runs the agent and publishes its result, the
+    others poll for it. The lock is renewed while its run goes on, if the
+    holder fails or its worker is lost, the next waiter takes the lock and
+    runs the agent itself.
+    """
+
+    def __init__(
+        self,
+        lock_ttl_seconds: int = CHAT_SETTINGS.COALESCE_LOCK_TTL_SECONDS,
+        result_ttl_seconds: int = CHAT_SETTINGS.COALESCE_RESULT_TTL_SECONDS,
+        poll_interval_seconds: float = CHAT_SETTINGS.COALESCE_POLL_INTERVAL_SECONDS,
+    ) -> None:
+        self._running: Dict[str, asyncio.Task[Dict[str, Any]]] = {}
+        self.lock_ttl_seconds = lock_ttl_seconds
+        self.result_ttl_seconds = result_ttl_seconds
+        self.poll_interval_seconds = poll_interval_seconds
+
+    @staticmethod
+    def _get_key(
+        partition_id: Union[uuid.UUID, str],
+        tool_group: str,
+        message: str,
+        mode: str,
+        timeout_seconds: float,
+    ) -> str:
+        # Runs only answer requests expecting the same path and time budget
+        request_hash = hashlib.sha256(
+            json.dumps([normalize_message(message), mode, timeout_seconds]).encode(
+                "utf-8"
+            )
+        ).hexdigest()
+        return CHAT_INFLIGHT_KEY.format(
+            partition_id=partition_id, tool_group=tool_group, request_hash=request_hash
+        )
+
+    async def run(
+        self,
+        partition_id: Union[uuid.UUID, str],
+        tool_group: str,
+        message: str,
+        mode: str,
+        timeout_seconds: float,
+        loader: ChatLoader,
+    ) -> Dict[str, Any]:
+        key = self._get_key(partition_id, tool_group, message, mode, timeout_seconds)
+
+        task = self._running.get(key)
+        if task is None:
+            task = asyncio.create_task(self._run(key, loader))
+            self._running[key] = task
+            task.add_done_callback(lambda _: self._running.pop(key, None))
+
+        # Shielded so one cancelled waiter doesn't cancel the run for the rest
+        return await asyncio.shield(task)
+
+    async def _run(self, key: str, loader: ChatLoader) -> Dict[str, Any]:
+        client = redis_manager.get_client()
+        lock_key = f"{key}:lock"
+        result_key = f"{key}:result"
+        token = uuid.uuid4().hex
+
+        while True:
+            result: Optional[str] = await client.get(result_key)
+            if result is not None:
+                return json.loads(result)
+
+            if await client.set(lock_key, token, nx=True, ex=self.lock_ttl_seconds):
+                break
+
+            await asyncio.sleep(self.poll_interval_seconds)
+
+        renew_task = asyncio.create_task(self._renew(lock_key, token))
+        try:
+            response = jsonable_encoder(await loader())
+            await client.set(
+                result_key, json.dumps(response), ex=self.result_ttl_seconds
+            )
+            return response
+        finally:
+            renew_task.cancel()
+            await client.eval(RELEASE_LOCK_SCRIPT, 1, lock_key, token)  # type: ignore[misc]
+
+    async def _renew(self, lock_key: str, token: str) -> None:
+        """Keeps the lock of a run for as long as it runs"""
+        client = redis_manager.get_client()
+        while True:
+            await asyncio.sleep(self.lock_ttl_seconds / 3)
+            renewed: int = await client.eval(  # type: ignore[misc]
+                RENEW_LOCK_SCRIPT, 1, lock_key, token, self.lock_ttl_seconds
+            )
+            if not renewed:
+                return
+
+
+request_coalescer = RequestCoalescer()
@@ -0,0 +1,190 @@
+from typing import List
+
+from pydantic import Field
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+from src.chat.constant import LLMRole
+from src.constants import Provider
+from src.model import ProviderModel
+
+
+class ChatConfig(BaseSettings):
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        case_sensitive=True,
+        env_prefix="CHAT_",
+        extra="ignore",
+    )
+
+    LLM_PROVIDER: Provider = Field(
+        default=Provider.OPENROUTER, description="Provider of the answering LLM"
+    )
+    LLM_MODEL: str = Field(
+        default="openrouter/horizon-beta", description="Model of the answering LLM"
+    )
+    LLM_MAX_TOKENS: int = Field(default=512, description="Answering LLM max tokens")
+    LLM_FALLBACKS: List[ProviderModel] = Field(
+        default=[], description="Providers the answering LLM hedges and fails over to"
+    )
+    TOOL_LLM_PROVIDER: Provider = Field(
+        default=Provider.OPENROUTER, description="Provider of the in-tool LLM"
+    )
+    TOOL_LLM_MODEL: str = Field(
+        default="openrouter/horizon-beta", description="Model of the in-tool LLM"
+    )
+    TOOL_LLM_MAX_TOKENS: int = Field(default=1028, description="In-tool LLM max tokens")
+    TOOL_LLM_FALLBACKS: List[ProviderModel] = Field(
+        default=[], description="Providers the in-tool LLM hedges and fails over to"
+    )
+    SELECTION_STEP_LLM: LLMRole = Field(
+        default=LLMRole.ANSWER, description="LLM picking the tools to call"
+    )
+    SYNTHESIS_STEP_LLM: LLMRole = Field(
+        default=LLMRole.TOOL, description="LLM answering from chunks inside tools"
+    )
+    ANSWER_STEP_LLM: LLMRole = Field(
+        default=LLMRole.ANSWER, description="LLM writing the final answer"
+    )
+    SELECTION_PREAMBLE_MAX_CHARS: int = Field(
+        default=200,
+        description="Text a split agent's selection turn may write before calling "
+        "a tool, past it without one the turn is cut and answered by the answer LLM",
+    )
+    PROMPT_CACHE_CONTROL: bool = Field(
+        default=True,
+        description="Mark the system prompt as a cache breakpoint on OpenRouter",
+    )
+    ANSWER_CACHE_ENABLED: bool = Field(
+        default=True, description="Reuse answers of semantically similar queries"
+    )
+    ANSWER_CACHE_THRESHOLD: float = Field(
+        default=0.95, description="Minimum cosine similarity of a cache hit"
+    )
+    ANSWER_CACHE_TTL_SECONDS: int = Field(
+        default=86400, description="Lifetime of a cached answer"
+    )
+    ANSWER_CACHE_MAX_ENTRIES: int = Field(
+        default=256, description="Cached answers kept per partition and tool group"
+    )
+
+    COALESCE_ENABLED: bool = Field(
+        default=True, description="Share one agent run between identical requests"
+    )
+    COALESCE_LOCK_TTL_SECONDS: int = Field(
+        default=30,
+        description="Lifetime of the lock held by the running request, renewed "
+        "while it runs so only a lost worker lets it expire",
+    )
+    COALESCE_RESULT_TTL_SECONDS: int = Field(
+        default=10, description="Time waiting requests have to pick up the result"
+    )
+    COALESCE_POLL_INTERVAL_SECONDS: float = Field(
+        default=0.1, description="Interval between result checks of waiting requests"
+    )
+
+    PLAN_MAX_TOOL_CALLS: int = Field(
+        default=3, description="Tool calls kept from the planning turn of plan mode"
+    )
+
+    FAST_PATH_ENABLED: bool = Field(
+        default=True, description="Skip the agent when one vector tool dominates"
+    )
+    FAST_PATH_MIN_SCORE: float = Field(
+        default=0.75, description="Default minimum score of the fast path tool"
+    )
+    FAST_PATH_MIN_MARGIN: float = Field(
+        default=0.1, description="Default minimum score lead over the next tool"
+    )
+
+    PREFETCH_ENABLED: bool = Field(
+        default=True, description="Prefetch vector searches of the raw message"
+    )
+    PREFETCH_MAX_TOOLS: int = Field(
+        default=2, description="Top retrieved vector tools prefetched per request"
+    )
+
+    CONVERSATION_TTL_SECONDS: int = Field(
+        default=86400, description="Lifetime of an idle conversation history"
+    )
+    CONVERSATION_MAX_TURNS: int = Field(
+        default=8, description="Turns kept verbatim before older ones are summarized"
+    )
+    CONVERSATION_KEEP_TURNS: int = Field(
+        default=4, description="Most recent turns left verbatim by a summarization"
+    )
+
+    BATCH_MAX_MESSAGES: int = Field(
+        default=500, description="Messages accepted by one batch request"
+    )
+    BATCH_CONCURRENCY: int = Field(
+        default=8, description="Messages of a batch answered concurrently"
+    )
+
+    TIMEOUT_SECONDS: float = Field(
+        default=60.0, description="Time budget of a chat request without its own"
+    )
+    MAX_TIMEOUT_SECONDS: float = Field(
+        default=300.0, description="Longest time budget a chat request can ask for"
+    )
+    TIMEOUT_GRACE_SECONDS: float = Field(
+        default=2.0,
+        description="Time past the deadline left to wrap up a partial answer",
+    )
+    DISCONNECT_POLL_INTERVAL_SECONDS: float = Field(
+        default=0.5, description="Interval between client disconnect checks"
+    )
+
+    ADMISSION_ENABLED: bool = Field(
+        default=True, description="Limit the chat runs in progress across workers"
+    )
+    ADMISSION_GLOBAL_LIMIT: int = Field(
+        default=64, description="Chat runs in progress across every partition"
+    )
+    ADMISSION_PARTITION_LIMIT: int = Field(
+        default=8, description="Chat runs in progress on one partition"
+    )
+    ADMISSION_QUEUE_SIZE: int = Field(
+        default=32, description="Requests of a partition waiting for a run slot"
+    )
+    ADMISSION_QUEUE_TIMEOUT_SECONDS: float = Field(
+        default=10.0, description="Time a request waits for a run slot"
+    )
+    ADMISSION_POLL_INTERVAL_SECONDS: float = Field(
+        default=0.1, description="Interval between run slot checks of waiting requests"
+    )
+    ADMISSION_LEASE_TTL_SECONDS: int = Field(
+        default=60,
+        description="Time after which the slot of a lost run is freed, slots are "
+        "renewed while their run goes on",
+    )
+    ADMISSION_RETRY_AFTER_SECONDS: int = Field(
+        default=5, description="Retry-After sent with rejected requests"
+    )
+
+    DEGRADED_MODE_ENABLED: bool = Field(
+        default=True, description="Switch to cheaper plans while overloaded"
+    )
+    DEGRADED_QUEUE_DEPTH: int = Field(
+        default=16, description="Queued requests across workers that degrade chat"
+    )
+    DEGRADED_PROVIDER_LATENCY_SECONDS: float = Field(
+        default=8.0, description="Provider time to first token that degrades chat"
+    )
+    DEGRADED_LATENCY_QUANTILE: float = Field(
+        default=0.5, description="Quantile of provider latency compared to it"
+    )
+    DEGRADED_CHECK_INTERVAL_SECONDS: float = Field(
+        default=2.0, description="Interval between load checks"
+    )
+    DEGRADED_MIN_SECONDS: float = Field(
+        default=30.0, description="Time load stays under thresholds before recovering"
+    )
+    DEGRADED_MAX_TOOLS: int = Field(
+        default=2, description="Retrieved tools given to a degraded run"
+    )
+    DEGRADED_MAX_ITERATIONS: int = Field(
+        default=2, description="Agent iterations of a degraded run"
+    )
+
+
+CHAT_SETTINGS = ChatConfig()
@@ -1,3 +1,5 @@
+from enum import StrEnum
+
 SYSTEM_PROMPT = """
 ***GUIDE***
 - You are a helpful support chatbot for a Pokemon (Cobblemon) Minecraft Server Cobblemon Delta
@@ -27,3 +29,177 @@ Tool calling rules:
 Suggestions:
 - When the user asks a broad question its much more effective to go from a summary tool to gain a broad overview into more detailed answers with vector tools
 """
+
+PLAN_PROMPT = """
+Planning rules:
+- You get exactly ONE turn to call tools, request every tool call you need at once
+- You will not see any tool output before that turn ends
+- If no tools match the user's query, answer directly without calling any tools
+"""
+
+FAST_PATH_PROMPT_TMPL = (
+    "Context retrieved for the question:\n"
+    "---------------------\n"
+    "{context_str}\n"
+    "---------------------\n"
+    "Answer the question using only the context. If the context does not "
+    "answer it, say you are unable to answer.\n"
+    "Question: {query_str}"
+)
+
+CONVERSATION_SUMMARY_PROMPT_TMPL = (
+    "Summarize the conversation between a user and a support chatbot below. "
+    "Keep the facts, names and open questions a follow-up question may refer "
+    "to, in at most 150 words of plain text.\n"
+    "Earlier summary: {summary_str}\n"
+    "---------------------\n"
+    "{turns_str}\n"
+    "---------------------\n"
+    "Summary:"
+)
+
+
+# Answer of a run cut off at its deadline before streaming any of its answer
+DEADLINE_RESPONSE = (
+    "Sorry, I ran out of time before I could answer this. Please try again."
+)
+
+
+# Status of requests whose client went away before they were answered
+CLIENT_CLOSED_REQUEST = 499
+
+
+class ChatMode(StrEnum):
+    # Agent loop, one tool call decision per iteration
+    AGENT = "agent"
+    # All tool calls selected in one turn and run concurrently
+    PLAN = "plan"
+
+
+class ChatPath(StrEnum):
+    CACHED = "cached"
+    FAST = "fast"
+    AGENT = "agent"
+    PLAN = "plan"
+
+
+class LLMRole(StrEnum):
+    # CHAT_LLM_* model
+    ANSWER = "answer"
+    # CHAT_TOOL_LLM_* model
+    TOOL = "tool"
+
+
+class LLMStep(StrEnum):
+    # Picking the tools to call
+    SELECTION = "selection"
+    # Answering from the retrieved chunks inside tools
+    SYNTHESIS = "synthesis"
+    # Writing the final answer
+    ANSWER = "answer"
+    # Agent turns, both selecting tools and answering
+    AGENT = "agent"
+    OTHER = "other"
+
+
+class ExecutionMode(StrEnum):
+    NORMAL = "normal"
+    # Cheaper plans, while queues or provider latency are over their thresholds
+    DEGRADED = "degraded"
+
+
+class StreamEvent(StrEnum):
+    TOOL_CALL = "tool_call"
+    TOOL_RESULT = "tool_result"
+    DELTA = "delta"
+    DONE = "done"
+    ERROR = "error"
+
+
+# Scoped by partition version, so stale answers are never read after a change
+ANSWER_CACHE_KEY = "partition:{partition_id}:answers:{tool_group}:{version}"
+
+# Lock and result of an in-flight agent run, shared by identical requests
+CHAT_INFLIGHT_KEY = "partition:{partition_id}:inflight:{tool_group}:{request_hash}"
+
+# Prefix of the summary, turns and compaction lock keys of a conversation
+CONVERSATION_KEY = "partition:{partition_id}:conversation:{conversation_id}"
+
+# Prefix of the run slots in use and the queue of requests across partitions
+CHAT_ADMISSION_KEY = "chat:admission"
+
+# Prefix of the run slots in use and the queue of requests of a partition
+PARTITION_ADMISSION_KEY = "partition:{partition_id}:admission"
+
+# Takes a run slot for ARGV[1] if both the global KEYS[1] and partition KEYS[2]
+# have one free for it, queued requests of KEYS[3] going first. Queued requests
+# are also counted globally in KEYS[4]. Returns 1 once admitted, 0 while
+# queued, -1 when the queue is full
+ADMIT_SCRIPT = """
+local time = redis.call("time")
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+local lease_ttl = tonumber(ARGV[4])
+local queue_timeout = tonumber(ARGV[6])
+redis.call("zremrangebyscore", KEYS[1], "-inf", now - lease_ttl)
+redis.call("zremrangebyscore", KEYS[2], "-inf", now - lease_ttl)
+redis.call("zremrangebyscore", KEYS[3], "-inf", now - queue_timeout)
+redis.call("zremrangebyscore", KEYS[4], "-inf", now - queue_timeout)
+
+local free = math.min(
+    tonumber(ARGV[2]) - redis.call("zcard", KEYS[1]),
+    tonumber(ARGV[3]) - redis.call("zcard", KEYS[2])
+)
+local rank = redis.call("zrank", KEYS[3], ARGV[1])
+local queued = rank ~= false
+if not queued then
+    rank = redis.call("zcard", KEYS[3])
+end
+
+if rank < free then
+    redis.call("zrem", KEYS[3], ARGV[1])
+    redis.call("zrem", KEYS[4], ARGV[1])
+    redis.call("zadd", KEYS[1], now, ARGV[1])
+    redis.call("zadd", KEYS[2], now, ARGV[1])
+    redis.call("expire", KEYS[1], lease_ttl)
+    redis.call("expire", KEYS[2], lease_ttl)
+    return 1
+end
+if queued then
+    return 0
+end
+if rank >= tonumber(ARGV[5]) then
+    return -1
+end
+redis.call("zadd", KEYS[3], now, ARGV[1])
+redis.call("zadd", KEYS[4], now, ARGV[1])
+redis.call("expire", KEYS[3], math.ceil(queue_timeout))
+redis.call("expire", KEYS[4], math.ceil(queue_timeout))
+return 0
+"""
+
+# Renews the run slot of ARGV[1] in the global KEYS[1] and partition KEYS[2]
+# leases, returns 0 once the slot was lost
+RENEW_LEASE_SCRIPT = """
+local time = redis.call("time")
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+local renewed = redis.call("zadd", KEYS[1], "XX", "CH", now, ARGV[1])
+renewed = renewed + redis.call("zadd", KEYS[2], "XX", "CH", now, ARGV[1])
+redis.call("expire", KEYS[1], ARGV[2])
+redis.call("expire", KEYS[2], ARGV[2])
+return renewed
+"""
+
+RELEASE_LOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+# Extends lock KEYS[1] to ARGV[2] seconds if it is still held by token ARGV[1]
+RENEW_LOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("expire", KEYS[1], ARGV[2])
+end
+return 0
+"""
@@ -0,0 +1,152 @@
+import asyncio
+import logging
+import uuid
+from typing import List, Optional, Set, Union
+
+from llama_index.core.base.llms.types import ChatMessage, MessageRole
+from llama_index.core.llms import LLM
+from llama_index.core.prompts import PromptTemplate
+from pydantic import BaseModel
+
+from src.chat.config import CHAT_SETTINGS
+from src.chat.constant import (
+    CONVERSATION_KEY,
+    CONVERSATION_SUMMARY_PROMPT_TMPL,
+    RELEASE_LOCK_SCRIPT,
+)
+from src.database import redis_manager
+from src.deadline import set_deadline
+
+logger = logging.getLogger(__name__)
+
+
+class ConversationTurn(BaseModel):
+    user: str
+    assistant: str
+
+
+class Conversation(BaseModel):
+    summary: Optional[str] = None
+    turns: List[ConversationTurn] = []
+
+    def to_chat_history(self) -> List[ChatMessage]:
+        """History placed after the system prompt, which stays the same on
+        every turn so providers can cache the prompt prefix
+        """
+        chat_history: List[ChatMessage] = []
+        if self.summary:
+            chat_history.append(
+                ChatMessage(
+                    role=MessageRole.SYSTEM,
+                    content=f"Summary of the earlier conversation:\n{self.summary}",
+                )
+            )
+        for turn in self.turns:
+            chat_history.append(ChatMessage(role=MessageRole.USER, content=turn.user))
+            chat_history.append(
+                ChatMessage(role=MessageRole.ASSISTANT, content=turn.assistant)
+            )
+        return chat_history
+
+
+class ConversationStore:
+    """Multi-turn conversation history kept in Redis per partition.
+
+    Turns are appended to a Redis list. Once it grows past max_turns, every
+    turn but the last keep_turns is folded into a running summary in the
+    background, so history sent to the LLM stays bounded.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: int = CHAT_SETTINGS.CONVERSATION_TTL_SECONDS,
+        max_turns: int = CHAT_SETTINGS.CONVERSATION_MAX_TURNS,
+        keep_turns: int = CHAT_SETTINGS.CONVERSATION_KEEP_TURNS,
+    ) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.max_turns = max_turns
+        self.keep_turns = keep_turns
+        self._compaction_tasks: Set[asyncio.Task[None]] = set()
+
+    @staticmethod
+    def _get_key(
+        partition_id: Union[uuid.UUID, str], conversation_id: Union[uuid.UUID, str]
+    ) -> str:
+        return CONVERSATION_KEY.format(
+            partition_id=partition_id, conversation_id=conversation_id
+        )
+
+    async def load(
+        self,
+        partition_id: Union[uuid.UUID, str],
+        conversation_id: Union[uuid.UUID, str],
+    ) -> Conversation:
+        key = self._get_key(partition_id, conversation_id)
+        async with redis_manager.get_client().pipeline(transaction=False) as pipe:
+            pipe.get(f"{key}:summary")
+            pipe.lrange(f"{key}:turns", 0, -1)
+            summary, raw_turns = await pipe.execute()
+
+        return Conversation(
+            summary=summary,
+            turns=[ConversationTurn.model_validate_json(turn) for turn in raw_turns],
+        )
+
+    async def append(
+        self,
+        partition_id: Union[uuid.UUID, str],
+        conversation_id: Union[uuid.UUID, str],
+        turn: ConversationTurn,
+        llm: LLM,
+    ) -> None:
+        key = self._get_key(partition_id, conversation_id)
+        async with redis_manager.get_client().pipeline(transaction=False) as pipe:
+            pipe.rpush(f"{key}:turns", turn.model_dump_json())
+            pipe.expire(f"{key}:turns", self.ttl_seconds)
+            pipe.expire(f"{key}:summary", self.ttl_seconds)
+            turn_count, _, _ = await pipe.execute()
+
+        if turn_count > self.max_turns:
+            task = asyncio.create_task(self._compact(key, llm))
+            self._compaction_tasks.add(task)
+            task.add_done_callback(self._compaction_tasks.discard)
+
+    async def _compact(self, key: str, llm: LLM) -> None:
+        """Folds all but the last keep_turns turns into the summary"""
+        # Outlives the request that appended the turn, and its deadline
+        set_deadline(None)
+        client = redis_manager.get_client()
+        lock_key = f"{key}:lock"
+        token = uuid.uuid4().hex
+        if not await client.set(lock_key, token, nx=True, ex=60):
+            return
+
+        try:
+            async with client.pipeline(transaction=False) as pipe:
+                pipe.get(f"{key}:summary")
+                pipe.lrange(f"{key}:turns", 0, -(self.keep_turns + 1))
+                summary, raw_turns = await pipe.execute()
+            if not raw_turns:
+                return
+
+            turns = [ConversationTurn.model_validate_json(turn) for turn in raw_turns]
+            summary = await llm.apredict(
+                PromptTemplate(CONVERSATION_SUMMARY_PROMPT_TMPL),
+                summary_str=summary or "None",
+                turns_str="\n\n".join(
+                    f"User: {turn.user}\nAssistant: {turn.assistant}" for turn in turns
+                ),
+            )
+
+            # Turns appended meanwhile sit at the tail, only the head is dropped
+            async with client.pipeline(transaction=True) as pipe:
+                pipe.set(f"{key}:summary", summary, ex=self.ttl_seconds)
+                pipe.ltrim(f"{key}:turns", len(raw_turns), -1)
+                await pipe.execute()
+        except Exception:
+            logger.exception("Conversation compaction failed")
+        finally:
+            await client.eval(RELEASE_LOCK_SCRIPT, 1, lock_key, token)  # type: ignore[misc]
+
+
+conversation_store = ConversationStore()
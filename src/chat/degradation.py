@@ -0,0 +1,115 @@
+import logging
+import time
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Optional
+
+from pydantic import BaseModel
+
+from src.chat.admission import admission_controller
+from src.chat.config import CHAT_SETTINGS
+from src.chat.constant import ExecutionMode
+from src.provider_router import ProviderRouter, provider_router
+
+logger = logging.getLogger(__name__)
+
+
+class LoadStatus(BaseModel):
+    mode: ExecutionMode = ExecutionMode.NORMAL
+    queue_depth: int = 0
+    provider_latency_seconds: Optional[float] = None
+    degraded_since: Optional[datetime] = None
+
+
+class LoadMonitor:
+    """Switches chat to cheaper plans while the service is overloaded.
+
+    Load is the admission queue depth across workers and the time to first
+    token of provider streams, checked at most every check_interval_seconds.
+    Chat degrades as soon as either crosses its threshold, and recovers once
+    both stayed under them for min_seconds.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = CHAT_SETTINGS.DEGRADED_MODE_ENABLED,
+        queue_depth: int = CHAT_SETTINGS.DEGRADED_QUEUE_DEPTH,
+        provider_latency_seconds: float = CHAT_SETTINGS.DEGRADED_PROVIDER_LATENCY_SECONDS,
+        latency_quantile: float = CHAT_SETTINGS.DEGRADED_LATENCY_QUANTILE,
+        check_interval_seconds: float = CHAT_SETTINGS.DEGRADED_CHECK_INTERVAL_SECONDS,
+        min_seconds: float = CHAT_SETTINGS.DEGRADED_MIN_SECONDS,
+        router: ProviderRouter = provider_router,
+    ) -> None:
+        self.enabled = enabled
+        self.queue_depth = queue_depth
+        self.provider_latency_seconds = provider_latency_seconds
+        self.latency_quantile = latency_quantile
+        self.check_interval_seconds = check_interval_seconds
+        self.min_seconds = min_seconds
+        self.router = router
+        self._status = LoadStatus()
+        self._checked_at = float("-inf")
+        self._degraded_until = float("-inf")
+
+    async def get_status(self) -> LoadStatus:
+        now = time.monotonic()
+        if not self.enabled or now - self._checked_at < self.check_interval_seconds:
+            return self._status
+        # Set first, so concurrent requests don't all check at once
+        self._checked_at = now
+
+        try:
+            queue_depth = await admission_controller.get_queue_depth()
+        except Exception:
+            logger.warning("Load check failed, keeping the current mode", exc_info=True)
+            return self._status
+        latency = self.router.get_stream_latency(self.latency_quantile)
+
+        overloaded = queue_depth >= self.queue_depth or (
+            latency is not None and latency >= self.provider_latency_seconds
+        )
+        degraded_since = self._status.degraded_since
+        if overloaded:
+            self._degraded_until = now + self.min_seconds
+            if degraded_since is None:
+                degraded_since = datetime.now(timezone.utc)
+                logger.warning(
+                    "Chat degraded, queue depth %s, provider latency %s",
+                    queue_depth,
+                    latency,
+                )
+        elif degraded_since is not None and now >= self._degraded_until:
+            degraded_since = None
+            logger.info("Chat recovered from degraded mode")
+
+        self._status = LoadStatus(
+            mode=(
+                ExecutionMode.NORMAL
+                if degraded_since is None
+                else ExecutionMode.DEGRADED
+            ),
+            queue_depth=queue_depth,
+            provider_latency_seconds=latency,
+            degraded_since=degraded_since,
+        )
+        return self._status
+
+    async def get_mode(self) -> ExecutionMode:
+        return (await self.get_status()).mode
+
+
+load_monitor = LoadMonitor()
+
+
+_execution_mode: ContextVar[ExecutionMode] = ContextVar(
+    "execution_mode", default=ExecutionMode.NORMAL
+)
+
+
+def get_execution_mode() -> ExecutionMode:
+    return _execution_mode.get()
+
+
+def set_execution_mode(mode: ExecutionMode) -> None:
+    """Scopes the mode to the current context, and the tasks it spawns"""
+    _execution_mode.set(mode)
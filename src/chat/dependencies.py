@@ -1,55 +1,80 @@
-from typing import Annotated
+from typing import Annotated, Optional
+from uuid import UUID
 
-from fastapi import Depends
+from fastapi import Depends, Header
 from llama_index.llms.openai_like import OpenAILike
-from llama_index.llms.openrouter import OpenRouter
 
+from src.chat.config import CHAT_SETTINGS
+from src.chat.schemas.partition import ChatPartition
 from src.chat.service import ChatService
-from src.config import SETTINGS
-from src.dependencies import PostgresDep
+from src.database import postgres_manager
+from src.embedding.dependencies import EmbedModelDep
+from src.exceptions import EntityNotFoundError
+from src.factory import get_id_from_path_factory
+from src.manager import client_registry
+from src.partitions.models.partition import Partition
 from src.tools.dependencies import ToolServiceDep
 
 
-def _get_llm() -> OpenRouter:
-    return OpenRouter(
-        model="openrouter/horizon-beta",
-        # model="google/gemini-2.5-flash-lite",
-        temperature=0.0,
-        api_key=SETTINGS.OPENROUTER_API_KEY,
-        is_function_calling_model=True,
-        verbose=True,
-        max_tokens=512,
-        # additional_kwargs={"extra_body": {"provider": {"order": ["deepinfra", "together"]}}},
+def _get_llm() -> OpenAILike:
+    return client_registry.get_llm(
+        CHAT_SETTINGS.LLM_PROVIDER,
+        CHAT_SETTINGS.LLM_MODEL,
+        CHAT_SETTINGS.LLM_MAX_TOKENS,
+        CHAT_SETTINGS.LLM_FALLBACKS,
     )
 
 
-def _get_tool_llm() -> OpenRouter:
-    return OpenRouter(
-        model="openrouter/horizon-beta",
-        # model="google/gemini-2.5-flash-lite",
-        temperature=0.0,
-        api_key=SETTINGS.OPENROUTER_API_KEY,
-        is_function_calling_model=True,
-        verbose=True,
-        max_tokens=1028,
-        # additional_kwargs={"extra_body": {"provider": {"order": ["deepinfra", "together"]}}},
+def _get_tool_llm() -> OpenAILike:
+    return client_registry.get_llm(
+        CHAT_SETTINGS.TOOL_LLM_PROVIDER,
+        CHAT_SETTINGS.TOOL_LLM_MODEL,
+        CHAT_SETTINGS.TOOL_LLM_MAX_TOKENS,
+        CHAT_SETTINGS.TOOL_LLM_FALLBACKS,
     )
 
 
+async def _get_chat_partition(
+    partition_id: UUID = Depends(get_id_from_path_factory("partition_id")),
+) -> ChatPartition:
+    # Read on a session of its own, so no connection is held through the
+    # embedding and LLM calls of the chat
+    async with postgres_manager.session() as session:
+        partition = await session.get(Partition, partition_id)
+        if partition is None:
+            raise EntityNotFoundError(Partition, str(partition_id))
+        return ChatPartition.model_validate(partition)
+
+
 def _get_chat_service(
     llm: "LlmDep",
     tool_llm: "ToolLlmDep",
     tool_service: ToolServiceDep,
-    session: PostgresDep,
+    embed_model: EmbedModelDep,
 ) -> ChatService:
     return ChatService(
         llm=llm,
         tool_llm=tool_llm,
         tool_service=tool_service,
-        session=session,
+        embed_model=embed_model,
     )
 
 
+def _get_request_timeout(
+    x_request_timeout: Annotated[
+        Optional[float],
+        Header(
+            gt=0,
+            le=CHAT_SETTINGS.MAX_TIMEOUT_SECONDS,
+            description="Time budget of the request, in seconds",
+        ),
+    ] = None,
+) -> Optional[float]:
+    return x_request_timeout
+
+
 LlmDep = Annotated[OpenAILike, Depends(_get_llm)]
 ToolLlmDep = Annotated[OpenAILike, Depends(_get_tool_llm)]
+ChatPartitionDep = Annotated[ChatPartition, Depends(_get_chat_partition)]
 ChatServiceDep = Annotated[ChatService, Depends(_get_chat_service)]
+RequestTimeoutDep = Annotated[Optional[float], Depends(_get_request_timeout)]
@@ -0,0 +1,339 @@
+import asyncio
+import uuid
+from typing import (
+    Any,
+    AsyncGenerator,
+    AsyncIterator,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+    cast,
+)
+
+from llama_index.core.agent.workflow import (
+    AgentOutput,
+    AgentStream,
+    ToolCall,
+    ToolCallResult,
+)
+from llama_index.core.base.llms.types import ChatMessage, MessageRole
+from llama_index.core.llms.function_calling import FunctionCallingLLM
+from llama_index.core.llms.llm import ToolSelection
+from llama_index.core.tools import BaseTool, ToolOutput
+from llama_index.core.tools.calling import acall_tool
+
+from src.chat.constant import DEADLINE_RESPONSE, FAST_PATH_PROMPT_TMPL, LLMStep
+from src.chat.usage import llm_step
+from src.tools.context import get_context_retriever
+
+PlanEvent = Union[ToolCall, ToolCallResult, AgentStream, AgentOutput]
+
+
+async def run_to_output(events: AsyncIterator[PlanEvent]) -> AgentOutput:
+    """Drains the events of a run, returning its final output"""
+    output: Optional[AgentOutput] = None
+    async for event in events:
+        if isinstance(event, AgentOutput):
+            output = event
+    if output is None:
+        raise RuntimeError("Chat run finished without an answer")
+    return output
+
+
+class PartialAgentOutput(AgentOutput):
+    """Output of a run cut off at its deadline, with the answer streamed so far"""
+
+
+async def stream_until_deadline(
+    events: AsyncGenerator[PlanEvent, None],
+    deadline: Optional[float],
+    name: str,
+) -> AsyncGenerator[PlanEvent, None]:
+    """Passes on the events of a run until the deadline. A run still going by
+    then is stopped, and ends with a PartialAgentOutput instead.
+    """
+    response = ""
+    tool_selections: List[ToolSelection] = []
+    try:
+        while True:
+            timeout = asyncio.timeout_at(deadline)
+            try:
+                async with timeout:
+                    event = await anext(events)
+            except StopAsyncIteration:
+                return
+            except TimeoutError:
+                if not timeout.expired():
+                    raise
+                break
+
+            if isinstance(event, AgentStream):
+                response = event.response
+            elif isinstance(event, ToolCall):
+                tool_selections.append(
+                    ToolSelection(
+                        tool_id=event.tool_id,
+                        tool_name=event.tool_name,
+                        tool_kwargs=event.tool_kwargs,
+                    )
+                )
+            yield event
+    finally:
+        # Cancels the LLM, embedding and vector store calls still running
+        await events.aclose()
+
+    yield PartialAgentOutput(
+        response=ChatMessage(
+            role=MessageRole.ASSISTANT, content=response or DEADLINE_RESPONSE
+        ),
+        tool_calls=tool_selections,
+        current_agent_name=name,
+    )
+
+
+def _get_tool_call_id(tool_call: Any) -> Optional[str]:
+    if isinstance(tool_call, dict):
+        return cast(Dict[str, Any], tool_call).get("id")
+    return getattr(tool_call, "id", None)
+
+
+def _keep_tool_calls(
+    message: ChatMessage, tool_selections: Sequence[ToolSelection]
+) -> ChatMessage:
+    """Copy of an assistant message holding only the given tool calls.
+
+    Every tool call sent back to the provider needs a tool message answering
+    it, so calls dropped past the cap are removed from the message too.
+    """
+    tool_ids = {tool_selection.tool_id for tool_selection in tool_selections}
+    additional_kwargs = dict(message.additional_kwargs)
+    if "tool_calls" in additional_kwargs:
+        additional_kwargs["tool_calls"] = [
+            tool_call
+            for tool_call in additional_kwargs["tool_calls"]
+            if _get_tool_call_id(tool_call) in tool_ids
+        ]
+    # Newer releases also carry the calls as ToolCallBlocks
+    blocks = [
+        block
+        for block in message.blocks
+        if getattr(block, "tool_call_id", None) is None
+        or getattr(block, "tool_call_id") in tool_ids
+    ]
+    return message.model_copy(
+        update={"additional_kwargs": additional_kwargs, "blocks": blocks}
+    )
+
+
+async def stream_answer(
+    llm: FunctionCallingLLM,
+    messages: List[ChatMessage],
+    name: str,
+    tool_selections: List[ToolSelection],
+) -> AsyncGenerator[PlanEvent, None]:
+    """Streams the final answer over messages, ending with its AgentOutput"""
+    response = ChatMessage(role=MessageRole.ASSISTANT, content="")
+    raw: Any = None
+    with llm_step(LLMStep.ANSWER):
+        chunks = await llm.astream_chat(messages)
+    async for chunk in chunks:
+        response = chunk.message
+        raw = chunk.raw
+        yield AgentStream(
+            delta=chunk.delta or "",
+            response=chunk.message.content or "",
+            current_agent_name=name,
+            raw=raw,
+        )
+
+    yield AgentOutput(
+        response=response,
+        tool_calls=tool_selections,
+        current_agent_name=name,
+        raw=raw,
+    )
+
+
+class PlanExecutor:
+    """Answers in two LLM round trips: one turn of llm that selects every tool
+    call, then one final answer of answer_llm over their outputs.
+
+    The selected tool calls run concurrently. Events mirror the ones of a
+    FunctionAgent run, with a single AgentOutput holding the final answer.
+    """
+
+    name = "plan_executor"
+
+    def __init__(
+        self,
+        llm: FunctionCallingLLM,
+        tools: Sequence[BaseTool],
+        system_prompt: str,
+        max_tool_calls: int,
+        answer_llm: Optional[FunctionCallingLLM] = None,
+    ) -> None:
+        self.llm = llm
+        self.tools = tools
+        self.system_prompt = system_prompt
+        self.max_tool_calls = max_tool_calls
+        self.answer_llm = answer_llm or llm
+
+    async def stream_events(
+        self, message: str, chat_history: Sequence[ChatMessage] = ()
+    ) -> AsyncGenerator[PlanEvent, None]:
+        messages = [
+            ChatMessage(role=MessageRole.SYSTEM, content=self.system_prompt),
+            *chat_history,
+            ChatMessage(role=MessageRole.USER, content=message),
+        ]
+
+        with llm_step(LLMStep.SELECTION):
+            plan = await self.llm.achat_with_tools(
+                self.tools, chat_history=messages, allow_parallel_tool_calls=True
+            )
+        tool_selections = self.llm.get_tool_calls_from_response(
+            plan, error_on_no_tool_call=False
+        )[: self.max_tool_calls]
+
+        # Nothing to look up, the planning turn already is the answer
+        if not tool_selections:
+            yield AgentOutput(
+                response=plan.message,
+                current_agent_name=self.name,
+                raw=plan.raw,
+            )
+            return
+
+        for tool_selection in tool_selections:
+            yield ToolCall(
+                tool_name=tool_selection.tool_name,
+                tool_kwargs=tool_selection.tool_kwargs,
+                tool_id=tool_selection.tool_id,
+            )
+
+        messages.append(_keep_tool_calls(plan.message, tool_selections))
+        tool_messages: Dict[str, ChatMessage] = {}
+        tools_by_name = {tool.metadata.name: tool for tool in self.tools}
+
+        for pending in asyncio.as_completed(
+            [
+                self._call_tool(tools_by_name, tool_selection)
+                for tool_selection in tool_selections
+            ]
+        ):
+            tool_selection, tool_output = await pending
+            tool_messages[tool_selection.tool_id] = ChatMessage(
+                role=MessageRole.TOOL,
+                content=str(tool_output),
+                additional_kwargs={
+                    "tool_call_id": tool_selection.tool_id,
+                    "name": tool_selection.tool_name,
+                },
+            )
+            yield ToolCallResult(
+                tool_name=tool_selection.tool_name,
+                tool_kwargs=tool_selection.tool_kwargs,
+                tool_id=tool_selection.tool_id,
+                tool_output=tool_output,
+                return_direct=False,
+            )
+
+        # Tool messages follow the order of the calls that produced them
+        messages.extend(
+            tool_messages[tool_selection.tool_id] for tool_selection in tool_selections
+        )
+
+        async for event in stream_answer(
+            self.answer_llm, messages, self.name, tool_selections
+        ):
+            yield event
+
+    @staticmethod
+    async def _call_tool(
+        tools_by_name: Dict[str, BaseTool], tool_selection: ToolSelection
+    ) -> Tuple[ToolSelection, ToolOutput]:
+        tool = tools_by_name.get(tool_selection.tool_name)
+        if tool is None:
+            return tool_selection, ToolOutput(
+                content=f"Tool {tool_selection.tool_name} does not exist",
+                tool_name=tool_selection.tool_name,
+                raw_input=tool_selection.tool_kwargs,
+                raw_output=None,
+                is_error=True,
+            )
+
+        return tool_selection, await acall_tool(tool, tool_selection.tool_kwargs)
+
+
+class SingleToolExecutor:
+    """Answers without an agent: the message goes straight to one tool, and its
+    output into a single answer call. Tools able to return their raw chunks
+    are only retrieved from, never asked for an answer of their own.
+
+    Meant for questions whose tool retrieval has one clearly dominant tool.
+    """
+
+    name = "single_tool_executor"
+
+    def __init__(
+        self,
+        llm: FunctionCallingLLM,
+        tool: BaseTool,
+        system_prompt: str,
+    ) -> None:
+        self.llm = llm
+        self.tool = tool
+        self.system_prompt = system_prompt
+
+    async def stream_events(
+        self, message: str, chat_history: Sequence[ChatMessage] = ()
+    ) -> AsyncGenerator[PlanEvent, None]:
+        tool_selection = ToolSelection(
+            tool_id=uuid.uuid4().hex,
+            tool_name=self.tool.metadata.name or "",
+            tool_kwargs={"query": message},
+        )
+        yield ToolCall(
+            tool_name=tool_selection.tool_name,
+            tool_kwargs=tool_selection.tool_kwargs,
+            tool_id=tool_selection.tool_id,
+        )
+
+        retrieve_context = get_context_retriever(self.tool)
+        if retrieve_context is None:
+            tool_output = await acall_tool(self.tool, tool_selection.tool_kwargs)
+        else:
+            # Raw chunks rather than the tool's own answer, so the answer call
+            # below is the only LLM round trip
+            context = await retrieve_context(message)
+            tool_output = ToolOutput(
+                content=context,
+                tool_name=tool_selection.tool_name,
+                raw_input=tool_selection.tool_kwargs,
+                raw_output=context,
+            )
+        yield ToolCallResult(
+            tool_name=tool_selection.tool_name,
+            tool_kwargs=tool_selection.tool_kwargs,
+            tool_id=tool_selection.tool_id,
+            tool_output=tool_output,
+            return_direct=False,
+        )
+
+        messages = [
+            ChatMessage(role=MessageRole.SYSTEM, content=self.system_prompt),
+            *chat_history,
+            ChatMessage(
+                role=MessageRole.USER,
+                content=FAST_PATH_PROMPT_TMPL.format(
+                    context_str=str(tool_output), query_str=message
+                ),
+            ),
+        ]
+        async for event in stream_answer(
+            self.llm, messages, self.name, [tool_selection]
+        ):
+            yield event
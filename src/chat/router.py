@@ -1,16 +1,69 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Request, Response
+from fastapi.responses import StreamingResponse
 
-from src.chat.dependencies import ChatServiceDep
-from src.chat.schemas.request import ChatRequest
-from src.partitions.dependencies import ValidPartitionLoadedDep
+from src.chat.config import CHAT_SETTINGS
+from src.chat.constant import CLIENT_CLOSED_REQUEST
+from src.chat.dependencies import (
+    ChatPartitionDep,
+    ChatServiceDep,
+    RequestTimeoutDep,
+)
+from src.chat.schemas.request import ChatBatchRequest, ChatRequest
+from src.chat.utils import run_until_disconnect
 
 router = APIRouter(prefix="/chat", tags=["chat"])
 
 
 @router.post("/{partition_id}")
 async def chat(
+    request: Request,
     chat_request: ChatRequest,
-    partition: ValidPartitionLoadedDep,
+    partition: ChatPartitionDep,
     chat_service: ChatServiceDep,
+    timeout: RequestTimeoutDep,
 ):
-    return await chat_service.basic_query(chat_request, partition)
+    # The tighter of the header and body budgets applies
+    if timeout is not None:
+        chat_request.timeout_seconds = min(
+            timeout, chat_request.timeout_seconds or timeout
+        )
+
+    if chat_request.stream:
+        events = await run_until_disconnect(
+            request,
+            chat_service.stream_query(chat_request, partition, request.is_disconnected),
+            CHAT_SETTINGS.DISCONNECT_POLL_INTERVAL_SECONDS,
+        )
+        if events is None:
+            return Response(status_code=CLIENT_CLOSED_REQUEST)
+        return StreamingResponse(
+            events,
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+
+    result = await run_until_disconnect(
+        request,
+        chat_service.basic_query(chat_request, partition),
+        CHAT_SETTINGS.DISCONNECT_POLL_INTERVAL_SECONDS,
+    )
+    if result is None:
+        return Response(status_code=CLIENT_CLOSED_REQUEST)
+    return result
+
+
+@router.post("/{partition_id}/batch")
+async def chat_batch(
+    request: Request,
+    batch_request: ChatBatchRequest,
+    partition: ChatPartitionDep,
+    chat_service: ChatServiceDep,
+):
+    result = await run_until_disconnect(
+        request,
+        chat_service.batch_query(batch_request, partition),
+        CHAT_SETTINGS.DISCONNECT_POLL_INTERVAL_SECONDS,
+    )
+    if result is None:
+        return Response(status_code=CLIENT_CLOSED_REQUEST)
+    return result
@@ -0,0 +1,19 @@
+import uuid
+from typing import Optional
+
+from pydantic import BaseModel, ConfigDict
+
+
+class ChatPartition(BaseModel):
+    """Detached read of the partition a chat runs against, nothing past the
+    dependencies touches the database through it
+    """
+
+    id: uuid.UUID
+    collection_id: uuid.UUID
+    fast_path_min_score: Optional[float]
+    fast_path_min_margin: Optional[float]
+
+    model_config = ConfigDict(
+        from_attributes=True,
+    )
@@ -1,6 +1,39 @@
-from pydantic import BaseModel
+import uuid
+from typing import List, Optional
+
+from pydantic import BaseModel, Field
+
+from src.chat.config import CHAT_SETTINGS
+from src.chat.constant import ChatMode
 
 
 class ChatRequest(BaseModel):
     message: str
     tool_group: str
+    stream: bool = False
+    mode: ChatMode = ChatMode.AGENT
+    conversation_id: Optional[uuid.UUID] = Field(
+        default=None,
+        description="Client generated id, continues the history stored under it",
+    )
+    timeout_seconds: Optional[float] = Field(
+        default=None,
+        gt=0,
+        le=CHAT_SETTINGS.MAX_TIMEOUT_SECONDS,
+        description="Time budget of the request, a partial answer is returned "
+        "once it runs out",
+    )
+
+
+class ChatBatchRequest(BaseModel):
+    messages: List[str] = Field(
+        min_length=1, max_length=CHAT_SETTINGS.BATCH_MAX_MESSAGES
+    )
+    tool_group: str
+    mode: ChatMode = ChatMode.AGENT
+    timeout_seconds: Optional[float] = Field(
+        default=None,
+        gt=0,
+        le=CHAT_SETTINGS.MAX_TIMEOUT_SECONDS,
+        description="Time budget of each message of the batch",
+    )
@@ -1,24 +1,91 @@
+import asyncio
 import logging
 import time
-from typing import Any, Dict, List
+from functools import partial
+from typing import (
+    Any,
+    AsyncGenerator,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
 
-from llama_index.core.agent.workflow import FunctionAgent
-from llama_index.core.objects import ObjectRetriever
+from llama_index.core.agent.workflow import (
+    AgentInput,
+    AgentOutput,
+    AgentStream,
+    FunctionAgent,
+    ToolCall,
+    ToolCallResult,
+)
+from llama_index.core.base.llms.types import ChatMessage
+from llama_index.core.embeddings import BaseEmbedding
+from llama_index.core.schema import NodeWithScore
 from llama_index.core.tools import BaseTool
 from llama_index.llms.openai_like import OpenAILike
-from sqlalchemy import select
-from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
-
-from src.chat.constant import SYSTEM_PROMPT
-from src.chat.schemas.request import ChatRequest
-from src.partitions.models.partition import Partition
-from src.partitions.models.partition_file import PartitionFile
-from src.partitions.models.partition_file_tool import PartitionFileTool
+
+from src.chat.admission import AdmissionTicket, admission_controller
+from src.chat.cache import CachedAnswer, answer_cache
+from src.chat.coalescer import request_coalescer
+from src.chat.config import CHAT_SETTINGS
+from src.chat.constant import (
+    PLAN_PROMPT,
+    SYSTEM_PROMPT,
+    ChatMode,
+    ChatPath,
+    ExecutionMode,
+    LLMRole,
+    LLMStep,
+    StreamEvent,
+)
+from src.chat.conversation import ConversationTurn, conversation_store
+from src.chat.degradation import (
+    get_execution_mode,
+    load_monitor,
+    set_execution_mode,
+)
+from src.chat.planner import (
+    PartialAgentOutput,
+    PlanEvent,
+    PlanExecutor,
+    SingleToolExecutor,
+    run_to_output,
+    stream_answer,
+    stream_until_deadline,
+)
+from src.chat.schemas.partition import ChatPartition
+from src.chat.schemas.request import ChatBatchRequest, ChatRequest
+from src.chat.usage import LLMUsage, llm_step, set_llm_usage, start_llm_usage
+from src.chat.utils import cancel_on_disconnect, format_sse
+from src.deadline import get_deadline, set_deadline, start_deadline, within_deadline
+from src.embedding.memo import (
+    QueryEmbeddingMemo,
+    set_query_embedding_memo,
+    start_query_embedding_memo,
+)
+from src.llamaindex_patch.retrievers.lazy_object_retriever import LazyObjectRetriever
+from src.partitions.constants import PartitionFileToolType
+from src.tools.cache import CachedToolSet, tool_cache
+from src.tools.context import start_context_assembler
+from src.tools.prefetch import (
+    get_retrieval_prefetch,
+    prefetch_tools,
+    start_retrieval_prefetch,
+)
 from src.tools.service import ToolService
+from src.tools.tool_handler import FileToolTypeHandler
 
 logger = logging.getLogger(__name__)
 
+# Streamed runs in progress, referenced until done
+_stream_runs: Set["asyncio.Task[None]"] = set()
+
 
 class ChatService:
     def __init__(
@@ -26,61 +93,586 @@ class ChatService:
         llm: OpenAILike,
         tool_llm: OpenAILike,
         tool_service: ToolService,
-        session: AsyncSession,
+        embed_model: BaseEmbedding,
     ) -> None:
         self.llm = llm
         self.tool_llm = tool_llm
         self.tool_service = tool_service
-        self.session = session
+        self.embed_model = embed_model
 
     async def basic_query(
         self,
         chat_request: ChatRequest,
-        partition: Partition,  # Must have partition_files, partition_file_tools, eager loaded
+        partition: ChatPartition,
+        tool_retriever: Optional[LazyObjectRetriever] = None,
     ) -> Dict[str, Any]:
+        self._start_deadline(chat_request)
+        # Runs past the deadline stop with a partial answer, this is the backstop
+        async with within_deadline(CHAT_SETTINGS.TIMEOUT_GRACE_SECONDS):
+            # Turns are stored per conversation, so those runs are never shared
+            if not CHAT_SETTINGS.COALESCE_ENABLED or chat_request.conversation_id:
+                return await self._answer(chat_request, partition, tool_retriever)
+
+            return await request_coalescer.run(
+                partition.id,
+                chat_request.tool_group,
+                chat_request.message,
+                chat_request.mode,
+                chat_request.timeout_seconds or CHAT_SETTINGS.TIMEOUT_SECONDS,
+                lambda: self._answer(chat_request, partition, tool_retriever),
+            )
 
-        partition_file_ids = [pf.id for pf in partition.partition_files]
-
-        if partition_file_ids:
-            await self.session.execute(
-                select(PartitionFile)
-                .where(PartitionFile.id.in_(partition_file_ids))
-                .options(
-                    selectinload(
-                        PartitionFile.partition_file_tools.and_(
-                            PartitionFileTool.tool_group == chat_request.tool_group
-                        )
+    async def batch_query(
+        self,
+        batch_request: ChatBatchRequest,
+        partition: ChatPartition,
+    ) -> Dict[str, Any]:
+        """Answers every message of a batch over a single tool retriever, at
+        most CHAT_BATCH_CONCURRENCY at a time. A failed message doesn't fail
+        the batch, its result holds the error instead.
+        """
+        chat_requests = [
+            ChatRequest(
+                message=message,
+                tool_group=batch_request.tool_group,
+                mode=batch_request.mode,
+                timeout_seconds=batch_request.timeout_seconds,
+            )
+            for message in batch_request.messages
+        ]
+        semaphore = asyncio.Semaphore(CHAT_SETTINGS.BATCH_CONCURRENCY)
+
+        async def answer(chat_request: ChatRequest) -> Dict[str, Any]:
+            async with semaphore:
+                try:
+                    result = await self.basic_query(
+                        chat_request, partition, tool_retriever
                     )
-                    .selectinload(PartitionFileTool.partition_file)
-                    .selectinload(PartitionFile.file)
+                except Exception as e:
+                    logger.exception("Batch chat message failed")
+                    return {"message": chat_request.message, "error": str(e)}
+
+            # Debug output of hundreds of runs would dwarf their answers
+            return {
+                "message": chat_request.message,
+                **{key: value for key, value in result.items() if key != "debug"},
+            }
+
+        # The batch takes a single run slot, shared by all of its messages
+        async with admission_controller.admit(partition.id):
+            # Loaded once before fanning out, every message shares it
+            tool_retriever = await self._get_tool_retriever(chat_requests[0], partition)
+            # Each message runs in its own task, with its own memo and usage
+            results = await asyncio.gather(
+                *(answer(chat_request) for chat_request in chat_requests)
+            )
+        return {"results": results}
+
+    async def _answer(
+        self,
+        chat_request: ChatRequest,
+        partition: ChatPartition,
+        tool_retriever: Optional[LazyObjectRetriever] = None,
+    ) -> Dict[str, Any]:
+        # Shared by the answer cache, the tool retriever and every tool call
+        start_query_embedding_memo()
+        usage = start_llm_usage()
+        chat_history = await self._load_chat_history(chat_request, partition)
+        query_embedding = await self._embed_query(chat_request, chat_history)
+        if query_embedding is not None:
+            cached = await answer_cache.get(
+                partition.id, chat_request.tool_group, query_embedding
+            )
+            if cached:
+                await self._save_turn(chat_request, partition, cached.response)
+                return {
+                    "response": cached.response,
+                    "path": ChatPath.CACHED,
+                    "conversation_id": chat_request.conversation_id,
+                    "usage": usage,
+                    "debug": cached.model_dump(),
+                }
+
+        # Cached answers are cheap, only runs wait for a slot
+        async with admission_controller.admit(partition.id):
+            if tool_retriever is None:
+                tool_retriever = await self._get_tool_retriever(chat_request, partition)
+            path, events = await self._route(
+                chat_request, partition, tool_retriever, chat_history
+            )
+            try:
+                response = await run_to_output(
+                    stream_until_deadline(events, get_deadline(), path)
                 )
+            finally:
+                self._cancel_prefetch()
+
+        partial = isinstance(response, PartialAgentOutput)
+        if query_embedding is not None and not partial:
+            await answer_cache.set(
+                partition.id,
+                chat_request.tool_group,
+                chat_request.message,
+                query_embedding,
+                str(response),
             )
+        await self._save_turn(chat_request, partition, str(response))
+        logger.info("Chat answered through %s path, LLM usage %s", path, usage)
+
+        return {
+            "response": str(response),
+            "path": path,
+            "partial": partial,
+            "conversation_id": chat_request.conversation_id,
+            "usage": usage,
+            "debug": response,
+        }
 
-        partition_files: List[PartitionFile] = partition.partition_files
+    async def stream_query(
+        self,
+        chat_request: ChatRequest,
+        partition: ChatPartition,
+        is_disconnected: Optional[Callable[[], Awaitable[bool]]] = None,
+    ) -> AsyncIterator[str]:
+        """Loads the tools up front, so the returned iterator only streams the
+        events of the run. The run is stopped once is_disconnected says the
+        client has gone
+        """
+        deadline = self._start_deadline(chat_request)
+        memo = start_query_embedding_memo()
+        usage = start_llm_usage()
+        async with within_deadline(CHAT_SETTINGS.TIMEOUT_GRACE_SECONDS):
+            chat_history = await self._load_chat_history(chat_request, partition)
+            query_embedding = await self._embed_query(chat_request, chat_history)
+            if query_embedding is not None:
+                cached = await answer_cache.get(
+                    partition.id, chat_request.tool_group, query_embedding
+                )
+                if cached:
+                    await self._save_turn(chat_request, partition, cached.response)
+                    return self._stream_cached(chat_request, cached)
+
+            # Held until the stream ends, released by it
+            ticket = await admission_controller.acquire(partition.id)
+            try:
+                tool_retriever = await self._get_tool_retriever(chat_request, partition)
+            except BaseException:
+                await admission_controller.release(ticket)
+                raise
+        # The run streams from a task of its own, which owns the ticket from
+        # here on. It ends, and frees its slot, whether or not the response is
+        # ever read
+        queue: "asyncio.Queue[Optional[str]]" = asyncio.Queue()
+        run = asyncio.create_task(
+            self._run_stream(
+                self._stream_events(
+                    tool_retriever,
+                    chat_request,
+                    partition,
+                    chat_history,
+                    query_embedding,
+                    memo,
+                    usage,
+                    deadline,
+                ),
+                queue,
+                ticket,
+                is_disconnected,
+            )
+        )
+        _stream_runs.add(run)
+        run.add_done_callback(_stream_runs.discard)
+        return self._read_stream(run, queue)
+
+    @staticmethod
+    async def _run_stream(
+        events: AsyncGenerator[str, None],
+        queue: "asyncio.Queue[Optional[str]]",
+        ticket: Optional[AdmissionTicket],
+        is_disconnected: Optional[Callable[[], Awaitable[bool]]],
+    ) -> None:
+        watcher: Optional["asyncio.Task[None]"] = None
+        if is_disconnected is not None:
+            watcher = asyncio.create_task(
+                cancel_on_disconnect(
+                    is_disconnected,
+                    asyncio.current_task(),  # type: ignore[arg-type]
+                    CHAT_SETTINGS.DISCONNECT_POLL_INTERVAL_SECONDS,
+                )
+            )
+        try:
+            async for event in events:
+                queue.put_nowait(event)
+        finally:
+            if watcher is not None:
+                watcher.cancel()
+            try:
+                await asyncio.shield(admission_controller.release(ticket))
+            finally:
+                queue.put_nowait(None)
+                await events.aclose()
+
+    @staticmethod
+    async def _read_stream(
+        run: "asyncio.Task[None]", queue: "asyncio.Queue[Optional[str]]"
+    ) -> AsyncIterator[str]:
+        try:
+            while (event := await queue.get()) is not None:
+                yield event
+        finally:
+            run.cancel()
+
+    async def _stream_cached(
+        self, chat_request: ChatRequest, cached: CachedAnswer
+    ) -> AsyncIterator[str]:
+        yield format_sse(
+            StreamEvent.DONE,
+            {
+                "response": cached.response,
+                "path": ChatPath.CACHED,
+                "conversation_id": chat_request.conversation_id,
+                "cached": cached.model_dump(),
+            },
+        )
+
+    async def _stream_events(
+        self,
+        tool_retriever: LazyObjectRetriever,
+        chat_request: ChatRequest,
+        partition: ChatPartition,
+        chat_history: List[ChatMessage],
+        query_embedding: Optional[List[float]],
+        memo: QueryEmbeddingMemo,
+        usage: LLMUsage,
+        deadline: float,
+    ) -> AsyncGenerator[str, None]:
+        # Events are streamed from another task, so the memo is set again here
+        set_query_embedding_memo(memo)
+        set_llm_usage(usage)
+        set_deadline(deadline)
+        events: Optional[AsyncGenerator[PlanEvent, None]] = None
+        response: Optional[AgentOutput] = None
+        try:
+            async with within_deadline(CHAT_SETTINGS.TIMEOUT_GRACE_SECONDS):
+                path, events = await self._route(
+                    chat_request, partition, tool_retriever, chat_history
+                )
+            # Disconnects cancel the task streaming this, which stops the run
+            events = stream_until_deadline(events, deadline, path)
+            async for event in events:
+                if isinstance(event, AgentOutput):
+                    response = event
+                elif isinstance(event, AgentStream):
+                    if event.delta:
+                        yield format_sse(StreamEvent.DELTA, {"delta": event.delta})
+                elif isinstance(event, ToolCallResult):
+                    yield format_sse(
+                        StreamEvent.TOOL_RESULT,
+                        {
+                            "tool_id": event.tool_id,
+                            "tool_name": event.tool_name,
+                            "is_error": event.tool_output.is_error,
+                            "output": event.tool_output.content,
+                        },
+                    )
+                elif isinstance(event, ToolCall):
+                    yield format_sse(
+                        StreamEvent.TOOL_CALL,
+                        {
+                            "tool_id": event.tool_id,
+                            "tool_name": event.tool_name,
+                            "tool_kwargs": event.tool_kwargs,
+                        },
+                    )
+
+            if response is None:
+                raise RuntimeError("Chat run finished without an answer")
+            partial = isinstance(response, PartialAgentOutput)
+            # Saved first, so a follow-up sent right after DONE sees this turn
+            await self._save_turn(chat_request, partition, str(response))
+            logger.info("Chat streamed through %s path, LLM usage %s", path, usage)
+            yield format_sse(
+                StreamEvent.DONE,
+                {
+                    "response": str(response),
+                    "path": path,
+                    "partial": partial,
+                    "conversation_id": chat_request.conversation_id,
+                    "usage": usage.model_dump(),
+                },
+            )
+
+            if query_embedding is not None and not partial:
+                await answer_cache.set(
+                    partition.id,
+                    chat_request.tool_group,
+                    chat_request.message,
+                    query_embedding,
+                    str(response),
+                )
+        except Exception as e:
+            logger.exception("Chat stream failed")
+            yield format_sse(StreamEvent.ERROR, {"detail": str(e)})
+        finally:
+            self._cancel_prefetch()
+            if events is not None:
+                await events.aclose()
 
+    async def _stream_agent_events(
+        self,
+        tools: Sequence[BaseTool],
+        message: str,
+        chat_history: List[ChatMessage],
+    ) -> AsyncGenerator[PlanEvent, None]:
+        """Streams the events of an agent run, ending with its final output.
+
+        When tool selection and the final answer are routed to different LLMs,
+        the agent only picks the tools. Its run is cut at the first turn that
+        starts answering instead of calling a tool, and the answer LLM writes
+        the answer from that turn's input.
+        """
+        selection_llm = self._get_step_llm(CHAT_SETTINGS.SELECTION_STEP_LLM)
+        answer_llm = self._get_step_llm(CHAT_SETTINGS.ANSWER_STEP_LLM)
+        split = selection_llm is not answer_llm
+
+        # Workflow tasks are spawned by run, and inherit the step set here
+        with llm_step(LLMStep.SELECTION if split else LLMStep.AGENT):
+            handler = self._get_agent(tools, selection_llm).run(
+                message,
+                chat_history=chat_history,
+                max_iterations=(
+                    CHAT_SETTINGS.DEGRADED_MAX_ITERATIONS
+                    if get_execution_mode() == ExecutionMode.DEGRADED
+                    else 4
+                ),
+            )
+        last_input: Optional[AgentInput] = None
+        answering: Optional[AgentStream] = None
+        try:
+            async for event in handler.stream_events():
+                if isinstance(event, AgentInput):
+                    last_input = event
+                # Every step emits an output, only the final one is passed on
+                elif isinstance(event, AgentOutput):
+                    continue
+                elif split and isinstance(event, AgentStream):
+                    # Tool calls can follow a short preamble, a turn writing
+                    # past it without one is answering
+                    if (
+                        not event.tool_calls
+                        and len(event.response)
+                        > CHAT_SETTINGS.SELECTION_PREAMBLE_MAX_CHARS
+                    ):
+                        answering = event
+                        break
+                    continue
+                yield event
+
+            if answering is not None:
+                # Stops the selection LLM before it writes the rest of its answer
+                await handler.cancel_run()
+                name = answering.current_agent_name
+            else:
+                output: AgentOutput = await handler
+                if not split or last_input is None:
+                    yield output
+                    return
+                name = output.current_agent_name
+
+            assert last_input is not None
+            async for event in stream_answer(
+                answer_llm, list(last_input.input), name, []
+            ):
+                yield event
+        finally:
+            # Client went away mid-stream, stop spending tokens on the answer
+            if not handler.done():
+                await handler.cancel_run()
+
+    @staticmethod
+    def _start_deadline(chat_request: ChatRequest) -> float:
+        return start_deadline(
+            chat_request.timeout_seconds or CHAT_SETTINGS.TIMEOUT_SECONDS
+        )
+
+    async def _embed_query(
+        self, chat_request: ChatRequest, chat_history: List[ChatMessage]
+    ) -> Optional[List[float]]:
+        # Follow-ups depend on the history, so their answers are never cached
+        if not CHAT_SETTINGS.ANSWER_CACHE_ENABLED or chat_history:
+            return None
+        return await self.embed_model.aget_query_embedding(chat_request.message)
+
+    @staticmethod
+    async def _load_chat_history(
+        chat_request: ChatRequest, partition: ChatPartition
+    ) -> List[ChatMessage]:
+        if chat_request.conversation_id is None:
+            return []
+        conversation = await conversation_store.load(
+            partition.id, chat_request.conversation_id
+        )
+        return conversation.to_chat_history()
+
+    async def _save_turn(
+        self, chat_request: ChatRequest, partition: ChatPartition, response: str
+    ) -> None:
+        if chat_request.conversation_id is None:
+            return
+        await conversation_store.append(
+            partition.id,
+            chat_request.conversation_id,
+            ConversationTurn(user=chat_request.message, assistant=response),
+            self.tool_llm,
+        )
+
+    async def _get_tool_retriever(
+        self,
+        chat_request: ChatRequest,
+        partition: ChatPartition,
+    ) -> LazyObjectRetriever:
         start_time = time.perf_counter()
-        tools: List[BaseTool] = await self.tool_service.get_file_tools(
-            partition_files, self.tool_llm
+        cached_tools: CachedToolSet = await tool_cache.get_or_load(
+            partition.id,
+            chat_request.tool_group,
+            lambda: self._load_tools(chat_request, partition),
+        )
+        logger.debug(
+            "Tool retriever for partition %s loaded in %.4f seconds",
+            partition.id,
+            time.perf_counter() - start_time,
         )
-        end_time = time.perf_counter()
-        execution_time = end_time - start_time
-        print("-----------")
-        print(f"get_file_tools took {execution_time:.4f} seconds")
-
-        object_retriever: ObjectRetriever[Any] = (
-            await self.tool_service.get_object_retriever(
-                chat_request.tool_group, partition, tools
+
+        return cached_tools.object_retriever
+
+    async def _route(
+        self,
+        chat_request: ChatRequest,
+        partition: ChatPartition,
+        tool_retriever: LazyObjectRetriever,
+        chat_history: List[ChatMessage],
+    ) -> Tuple[ChatPath, AsyncGenerator[PlanEvent, None]]:
+        """Retrieves the tools once, then picks how the question is answered.
+
+        The system prompt always comes first and the history after it, so the
+        prompt prefix stays identical across the turns of a conversation.
+        """
+        # Tools and LLM calls of the run read the mode from the context
+        mode = await load_monitor.get_mode()
+        set_execution_mode(mode)
+        nodes = await tool_retriever.aretrieve_nodes(chat_request.message)
+        if mode == ExecutionMode.DEGRADED:
+            # Summary tools are the most expensive, fewer tools a shorter prompt
+            nodes = [
+                node
+                for node in nodes
+                if FileToolTypeHandler.get_tool_type(node.node.metadata.get("name", ""))
+                != PartitionFileToolType.SUMMARY
+            ][: CHAT_SETTINGS.DEGRADED_MAX_TOOLS]
+        # Tool calls of every path share the request's context budget
+        start_context_assembler()
+
+        # Follow-ups need the LLM to turn them into standalone tool queries
+        if not chat_history and self._is_fast_path(nodes, partition):
+            tool = (await tool_retriever.aget_tools(nodes[:1]))[0]
+            executor = SingleToolExecutor(
+                llm=self._get_step_llm(CHAT_SETTINGS.ANSWER_STEP_LLM),
+                tool=tool,
+                system_prompt=SYSTEM_PROMPT,
+            )
+            return ChatPath.FAST, executor.stream_events(chat_request.message)
+
+        tools = await tool_retriever.aget_tools(nodes)
+        if CHAT_SETTINGS.PREFETCH_ENABLED:
+            # Overlaps the likely vector searches with the LLM picking its tools
+            start_retrieval_prefetch()
+            prefetch_tools(
+                tools, chat_request.message, CHAT_SETTINGS.PREFETCH_MAX_TOOLS
+            )
+        # Ordered by name rather than score, so the same tools always give the
+        # same prompt prefix and hit the provider's prompt cache
+        tools = sorted(tools, key=lambda tool: tool.metadata.name or "")
+        if chat_request.mode == ChatMode.PLAN:
+            executor = PlanExecutor(
+                llm=self._get_step_llm(CHAT_SETTINGS.SELECTION_STEP_LLM),
+                tools=tools,
+                system_prompt=SYSTEM_PROMPT + PLAN_PROMPT,
+                max_tool_calls=CHAT_SETTINGS.PLAN_MAX_TOOL_CALLS,
+                answer_llm=self._get_step_llm(CHAT_SETTINGS.ANSWER_STEP_LLM),
             )
+            return ChatPath.PLAN, executor.stream_events(
+                chat_request.message, chat_history
+            )
+
+        return ChatPath.AGENT, self._stream_agent_events(
+            tools, chat_request.message, chat_history
         )
-        # In your basic_query method:
-        agent = FunctionAgent(
-            tool_retriever=object_retriever,
-            llm=self.llm,
+
+    @staticmethod
+    def _cancel_prefetch() -> None:
+        retrieval_prefetch = get_retrieval_prefetch()
+        if retrieval_prefetch is not None:
+            retrieval_prefetch.cancel()
+
+    @staticmethod
+    def _is_fast_path(nodes: List[NodeWithScore], partition: ChatPartition) -> bool:
+        """Whether a single vector tool clearly dominates the tool retrieval"""
+        if not CHAT_SETTINGS.FAST_PATH_ENABLED or not nodes:
+            return False
+
+        top_node = nodes[0]
+        tool_type = FileToolTypeHandler.get_tool_type(
+            top_node.node.metadata.get("name", "")
+        )
+        if tool_type != PartitionFileToolType.VECTOR:
+            return False
+
+        min_score = partition.fast_path_min_score
+        if min_score is None:
+            min_score = CHAT_SETTINGS.FAST_PATH_MIN_SCORE
+        min_margin = partition.fast_path_min_margin
+        if min_margin is None:
+            min_margin = CHAT_SETTINGS.FAST_PATH_MIN_MARGIN
+
+        top_score = top_node.score or 0.0
+        next_score = (nodes[1].score or 0.0) if len(nodes) > 1 else 0.0
+        return top_score >= min_score and top_score - next_score >= min_margin
+
+    def _get_step_llm(self, role: LLMRole) -> OpenAILike:
+        # Degraded runs take the in-tool LLM, the faster model, for every step
+        if role == LLMRole.TOOL or get_execution_mode() == ExecutionMode.DEGRADED:
+            return self.tool_llm
+        return self.llm
+
+    def _get_agent(self, tools: Sequence[BaseTool], llm: OpenAILike) -> FunctionAgent:
+        return FunctionAgent(
+            tools=list(tools),
+            llm=llm,
             system_prompt=SYSTEM_PROMPT,
             verbose=True,
-            # callback_manager=callback_manager,  # Add this
         )
 
-        response: Dict[str, Any] = await agent.run(chat_request.message, max_iterations=4)  # type: ignore[misc]
+    async def _load_tools(
+        self,
+        chat_request: ChatRequest,
+        partition: ChatPartition,
+    ) -> LazyObjectRetriever:
+        # Tools are only built once the tool retriever selects them
+        partition_file_tools = await self.tool_service.get_partition_file_tools(
+            partition.id, chat_request.tool_group
+        )
+        tool_loader = self.tool_service.get_tool_loader(
+            partition_file_tools,
+            # Resolved per tool call, tools are cached across execution modes
+            partial(self._get_step_llm, CHAT_SETTINGS.SYNTHESIS_STEP_LLM),
+        )
 
-        return {"response": str(response), "debug": response}  # type: ignore
+        return await self.tool_service.get_object_retriever(
+            chat_request.tool_group,
+            partition.id,
+            tool_loader=tool_loader,
+            tool_ids=[
+                str(partition_file_tool.id)
+                for partition_file_tool in partition_file_tools
+            ],
+        )
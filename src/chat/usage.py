@@ -0,0 +1,70 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, Optional
+
+from pydantic import BaseModel
+
+from src.chat.constant import LLMStep
+
+
+class LLMStepUsage(BaseModel):
+    calls: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    # Prompt tokens served from the provider's prompt cache
+    cached_tokens: int = 0
+    # Summed over calls, concurrent calls overlap
+    latency_seconds: float = 0.0
+
+
+class LLMUsage(LLMStepUsage):
+    """Token usage and latency of every LLM call made while answering one
+    request, in total and per step
+    """
+
+    steps: Dict[LLMStep, LLMStepUsage] = {}
+
+    def record(
+        self, step: LLMStep, latency: float, token_counts: Dict[str, Any]
+    ) -> None:
+        step_usage = self.steps.setdefault(step, LLMStepUsage())
+        for usage in (self, step_usage):
+            usage.calls += 1
+            usage.latency_seconds += latency
+            usage.prompt_tokens += token_counts.get("prompt_tokens") or 0
+            usage.completion_tokens += token_counts.get("completion_tokens") or 0
+            usage.cached_tokens += token_counts.get("cached_tokens") or 0
+
+
+_llm_usage: ContextVar[Optional[LLMUsage]] = ContextVar("llm_usage", default=None)
+_llm_step: ContextVar[LLMStep] = ContextVar("llm_step", default=LLMStep.OTHER)
+
+
+def get_llm_usage() -> Optional[LLMUsage]:
+    return _llm_usage.get()
+
+
+def set_llm_usage(usage: LLMUsage) -> None:
+    _llm_usage.set(usage)
+
+
+def start_llm_usage() -> LLMUsage:
+    usage = LLMUsage()
+    set_llm_usage(usage)
+    return usage
+
+
+def get_llm_step() -> LLMStep:
+    return _llm_step.get()
+
+
+@contextmanager
+def llm_step(step: LLMStep) -> Iterator[None]:
+    """Attributes the LLM calls started within to step, including those of
+    tasks spawned meanwhile
+    """
+    token = _llm_step.set(step)
+    try:
+        yield
+    finally:
+        _llm_step.reset(token)
@@ -0,0 +1,50 @@
+import asyncio
+import json
+from typing import Any, Awaitable, Callable, Dict, Optional, TypeVar
+
+from fastapi import Request
+
+from src.chat.constant import StreamEvent
+
+T = TypeVar("T")
+
+
+def format_sse(event: StreamEvent, data: Dict[str, Any]) -> str:
+    """Formats a single server-sent event"""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+async def run_until_disconnect(
+    request: Request, awaitable: Awaitable[T], poll_interval_seconds: float
+) -> Optional[T]:
+    """Awaits awaitable, cancelling it once the client disconnects. Returns
+    None when cancelled that way.
+    """
+    task = asyncio.ensure_future(awaitable)
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=poll_interval_seconds)
+            if done:
+                return task.result()
+            if await request.is_disconnected():
+                task.cancel()
+                # Lets the run release its slot and stop its calls first
+                await asyncio.gather(task, return_exceptions=True)
+                return None
+    finally:
+        task.cancel()
+
+
+async def cancel_on_disconnect(
+    is_disconnected: Callable[[], Awaitable[bool]],
+    task: "asyncio.Future[Any]",
+    poll_interval_seconds: float,
+) -> None:
+    """Cancels task once the client disconnects. Streamed responses are not
+    closed on disconnect under every ASGI server, so they are polled for it
+    """
+    while not task.done():
+        await asyncio.sleep(poll_interval_seconds)
+        if await is_disconnected():
+            task.cancel()
+            return
@@ -8,6 +8,7 @@ from src.collections.repository import CollectionSqlRepository
 from src.collections.schemas.request import CreateCollectionRequest
 from src.collections.schemas.response import CollectionResponse
 from src.collections.utils import CollectionMapper
+from src.manager import client_registry
 from src.partitions.utils import get_tool_collection
 
 
@@ -103,6 +104,7 @@ class CollectionService:
             raise Exception("PLACEHOLDER")
 
         await session.commit()
+        client_registry.evict_collection(collection.id)
 
         return CollectionMapper.db_to_response(collection)
 
@@ -57,6 +57,29 @@ class Config(BaseSettings):
     NOVITA_API_KEY: str = Field(description="Novita API Key")
     DEEPINFRA_API_KEY: str = Field(description="DeepInfra API Key")
 
+    # Provider router
+    PROVIDER_HEDGE_ENABLED: bool = Field(
+        default=True, description="Hedge slow LLM and embedding calls"
+    )
+    PROVIDER_HEDGE_QUANTILE: float = Field(
+        default=0.95, description="Latency quantile after which a call is hedged"
+    )
+    PROVIDER_HEDGE_MIN_DELAY_SECONDS: float = Field(
+        default=0.5, description="Lower bound of the hedge delay"
+    )
+    PROVIDER_HEDGE_DEFAULT_DELAY_SECONDS: float = Field(
+        default=10.0, description="Hedge delay of endpoints without enough samples"
+    )
+    PROVIDER_STATS_WINDOW: int = Field(
+        default=200, description="Recent calls kept per provider endpoint"
+    )
+    PROVIDER_STATS_MIN_SAMPLES: int = Field(
+        default=20, description="Calls needed before stats of an endpoint are used"
+    )
+    PROVIDER_MAX_ERROR_RATE: float = Field(
+        default=0.5, description="Error rate above which an endpoint is tried last"
+    )
+
     CORS_ORIGINS: list[str] = ["*"]
     CORS_HEADERS: list[str] = ["*"]
 
@@ -104,7 +127,7 @@ class Config(BaseSettings):
 
 
 # Type ignore because I cba dealing with this pydnatic bullshit
-SETTINGS = Config()  # type:ignore
+SETTINGS = Config()  # type: ignore
 
 # @lru_cache
 # def get_settings():
@@ -1,7 +1,22 @@
 from enum import StrEnum
+from typing import Dict
 
 
 class Environment(StrEnum):
     DEVELOPMENT = "development"
     STAGING = "staging"
     PRODUCTION = "production"
+
+
+class Provider(StrEnum):
+    OPENROUTER = "openrouter"
+    NOVITA = "novita"
+    DEEPINFRA = "deepinfra"
+
+
+# OpenAI compatible endpoints of each provider
+PROVIDER_API_BASES: Dict[Provider, str] = {
+    Provider.OPENROUTER: "https://openrouter.ai/api/v1",
+    Provider.NOVITA: "https://api.novita.ai/v3/openai",
+    Provider.DEEPINFRA: "https://api.deepinfra.com/v1/openai",
+}
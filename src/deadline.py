@@ -0,0 +1,53 @@
+import asyncio
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import AsyncIterator, Optional
+
+from src.exceptions import DeadlineExceededError
+
+# Event loop time by which the current request must be answered
+_deadline: ContextVar[Optional[float]] = ContextVar("deadline", default=None)
+
+
+def get_deadline() -> Optional[float]:
+    return _deadline.get()
+
+
+def set_deadline(deadline: Optional[float]) -> None:
+    _deadline.set(deadline)
+
+
+def start_deadline(timeout_seconds: float) -> float:
+    """Scopes a deadline timeout_seconds from now to the current context, and
+    the tasks it spawns. An earlier deadline already in scope is kept.
+    """
+    deadline = asyncio.get_running_loop().time() + timeout_seconds
+    current = _deadline.get()
+    if current is not None:
+        deadline = min(deadline, current)
+    _deadline.set(deadline)
+    return deadline
+
+
+def get_remaining_seconds() -> Optional[float]:
+    """Time left until the deadline in scope, None without one"""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return deadline - asyncio.get_running_loop().time()
+
+
+@asynccontextmanager
+async def within_deadline(grace_seconds: float = 0.0) -> AsyncIterator[None]:
+    """Cancels the block once grace_seconds past the deadline in scope,
+    raising DeadlineExceededError instead
+    """
+    deadline = get_deadline()
+    timeout = asyncio.timeout_at(None if deadline is None else deadline + grace_seconds)
+    try:
+        async with timeout:
+            yield
+    except TimeoutError as e:
+        if not timeout.expired():
+            raise
+        raise DeadlineExceededError() from e
@@ -1,9 +1,10 @@
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 from src.config import SETTINGS
+from src.model import ProviderModel
 from src.partitions.constants import PartitionFileToolType
 
 # TODO A lot of this will be a dynamic logic in the future.
@@ -27,6 +28,10 @@ class EmbeddingConfig(BaseSettings):
     TIMEOUT: float = Field(default=60.0, description="")
     REUSE_CLIENT: bool = Field(default=True, description="")
     NUM_WORKERS: int = Field(default=6)
+    # Fallbacks must serve the same model, their vectors are searched together
+    FALLBACKS: Dict[str, List[ProviderModel]] = Field(
+        default={}, description="Providers each embedding model fails over to"
+    )
     DEFAULT_FILE_TOOLS: List[PartitionFileToolType] = Field(
         default=[PartitionFileToolType.SUMMARY, PartitionFileToolType.VECTOR],
         description="Default tools to be embedded",
@@ -4,3 +4,10 @@ from enum import Enum
 
 class EmbeddingModel(str, Enum):
     QWEN3_8B = "Qwen/Qwen3-Embedding-8B"
+
+
+# Node metadata key of the chunk token count, computed once at ingestion
+TOKEN_COUNT_KEY = "token_count"
+
+# Tokens per chunk ingested files are split into
+CHUNK_SIZE = 1024
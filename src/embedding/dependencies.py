@@ -1,4 +1,3 @@
-import time
 from typing import Annotated
 
 from fastapi import Depends
@@ -10,35 +9,21 @@ from llama_index.vector_stores.qdrant import QdrantVectorStore
 from llama_index.vector_stores.qdrant.utils import SparseEncoderCallable
 
 from src.config import SETTINGS
-from src.dependencies import QdrantDep
 from src.embedding.config import EMBEDDING_SETTINGS
 from src.embedding.service import EmbeddingService
-from src.llamaindex_patch.stores.qdrant_vector_store import QdrantVectorStoreAsync
-from src.manager import fast_embed_manager
+from src.manager import client_registry, fast_embed_manager
 from src.partitions.dependencies import (
     PartitionFileToolRepositoryDep,
     ValidPartitionDep,
     ValidPartitionLoadedDep,
 )
-from src.partitions.utils import get_tool_collection
 
 
-# Only supports deepinfra for now, no point branching out currently
 def _get_embed_model(partition: ValidPartitionLoadedDep) -> OpenAILikeEmbedding:
     collection = partition.collection
 
-    return OpenAILikeEmbedding(
-        model_name=collection.embedding_model,
-        api_base=EMBEDDING_SETTINGS.API_BASE,
-        api_key=EMBEDDING_SETTINGS.API_KEY,
-        api_version=EMBEDDING_SETTINGS.API_VERSION,
-        embed_batch_size=EMBEDDING_SETTINGS.EMBED_BATCH_SIZE,
-        max_retries=EMBEDDING_SETTINGS.MAX_RETIRES,
-        timeout=EMBEDDING_SETTINGS.TIMEOUT,
-        dimensions=collection.vector_dimension,
-        reuse_client=EMBEDDING_SETTINGS.REUSE_CLIENT,
-        num_workers=EMBEDDING_SETTINGS.NUM_WORKERS,
-        additional_kwargs={"encoding_format": "float"},
+    return client_registry.get_embed_model(
+        collection.embedding_model, collection.vector_dimension
     )
 
 
@@ -54,57 +39,12 @@ def _get_embedding_service(
     )
 
 
-def _get_vector_store(
-    partition: ValidPartitionDep,
-    qdrant_client: QdrantDep,
-    fastembed_model: "FastEmbedModelDep",
-) -> QdrantVectorStore:
-    start_time = time.perf_counter()
-
-    result = QdrantVectorStoreAsync(
-        collection_name=str(partition.collection_id),
-        enable_hybrid=True,
-        fastembed_sparse_model=EMBEDDING_SETTINGS.DEFAULT_FAST_EMBED_MODE,
-        batch_size=64,
-        parallel=6,
-        max_retries=5,
-        aclient=qdrant_client,
-        sparse_doc_fn=fastembed_model,
-        sparse_query_fn=fastembed_model,
-    )
-
-    end_time = time.perf_counter()
-    duration = end_time - start_time
-    print(
-        f"get_vector_store (with fastembed_model dep) took {duration:.4f}s for collection {partition.collection_id}"
-    )
+def _get_vector_store(partition: ValidPartitionDep) -> QdrantVectorStore:
+    return client_registry.get_vector_store(partition.collection_id)
 
-    return result
-
-
-def _get_tool_vector_store(
-    partition: ValidPartitionDep,
-    qdrant_client: QdrantDep,
-    fastembed_model: "FastEmbedModelDep",
-) -> QdrantVectorStore:
-    start_time = time.perf_counter()
-    result = QdrantVectorStoreAsync(
-        collection_name=get_tool_collection(partition.collection_id),
-        enable_hybrid=True,
-        fastembed_sparse_model=EMBEDDING_SETTINGS.DEFAULT_FAST_EMBED_MODE,
-        batch_size=64,
-        aclient=qdrant_client,
-        sparse_doc_fn=fastembed_model,
-        sparse_query_fn=fastembed_model,
-    )
-
-    end_time = time.perf_counter()
-    duration = end_time - start_time
-    print(
-        f"get_vector_store (with fastembed_model dep) took {duration:.4f}s for collection {partition.collection_id}"
-    )
 
-    return result
+def _get_tool_vector_store(partition: ValidPartitionDep) -> QdrantVectorStore:
+    return client_registry.get_tool_vector_store(partition.collection_id)
 
 
 def _get_doc_store(partiton: ValidPartitionDep) -> PostgresDocumentStore:
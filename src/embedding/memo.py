@@ -0,0 +1,112 @@
+import asyncio
+from contextvars import ContextVar
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from llama_index.vector_stores.qdrant.utils import (
+    BatchSparseEncoding,
+    SparseEncoderCallable,
+)
+
+SparseEncoding = Tuple[List[int], List[float]]
+
+
+class QueryEmbeddingMemo:
+    """Dense and sparse query embeddings computed while answering one request,
+    keyed by (model, query)
+    """
+
+    def __init__(self) -> None:
+        self._dense: Dict[Tuple[str, str], List[float]] = {}
+        self._pending: Dict[Tuple[str, str], asyncio.Task[List[float]]] = {}
+        self._sparse: Dict[Tuple[str, str], SparseEncoding] = {}
+
+    async def aget_dense(
+        self,
+        model_key: str,
+        query: str,
+        embed: Callable[[], Awaitable[List[float]]],
+    ) -> List[float]:
+        key = (model_key, query)
+        embedding = self._dense.get(key)
+        if embedding is not None:
+            return embedding
+
+        # Concurrent tool calls embedding the same query share one request
+        task = self._pending.get(key)
+        if task is None:
+            task = asyncio.ensure_future(embed())
+            self._pending[key] = task
+            task.add_done_callback(lambda _: self._pending.pop(key, None))
+
+        embedding = await asyncio.shield(task)
+        self._dense[key] = embedding
+        return embedding
+
+    def get_dense(
+        self,
+        model_key: str,
+        query: str,
+        embed: Callable[[], List[float]],
+    ) -> List[float]:
+        key = (model_key, query)
+        embedding = self._dense.get(key)
+        if embedding is None:
+            embedding = embed()
+            self._dense[key] = embedding
+        return embedding
+
+    def get_sparse(
+        self,
+        model_key: str,
+        queries: List[str],
+        encode: SparseEncoderCallable,
+    ) -> BatchSparseEncoding:
+        missing = [
+            query
+            for query in dict.fromkeys(queries)
+            if (model_key, query) not in self._sparse
+        ]
+        if missing:
+            indices, values = encode(missing)
+            for query, query_indices, query_values in zip(missing, indices, values):
+                self._sparse[(model_key, query)] = (query_indices, query_values)
+
+        encodings = [self._sparse[(model_key, query)] for query in queries]
+        return (
+            [query_indices for query_indices, _ in encodings],
+            [query_values for _, query_values in encodings],
+        )
+
+
+_query_embedding_memo: ContextVar[Optional[QueryEmbeddingMemo]] = ContextVar(
+    "query_embedding_memo", default=None
+)
+
+
+def get_query_embedding_memo() -> Optional[QueryEmbeddingMemo]:
+    return _query_embedding_memo.get()
+
+
+def set_query_embedding_memo(memo: QueryEmbeddingMemo) -> None:
+    """Scopes the memo to the current context, and the tasks it spawns"""
+    _query_embedding_memo.set(memo)
+
+
+def start_query_embedding_memo() -> QueryEmbeddingMemo:
+    memo = QueryEmbeddingMemo()
+    set_query_embedding_memo(memo)
+    return memo
+
+
+def memoize_sparse_query_encoder(
+    model_key: str, encoder: SparseEncoderCallable
+) -> SparseEncoderCallable:
+    """Wraps a sparse query encoder to reuse encodings of the current request"""
+
+    def encode(queries: List[str]) -> BatchSparseEncoding:
+        memo = get_query_embedding_memo()
+        if memo is None:
+            return encoder(queries)
+        return memo.get_sparse(model_key, queries, encoder)
+
+    return encode
@@ -1,6 +1,6 @@
 import os
 import tempfile
-from typing import Any, List
+from typing import Any, List, Optional
 
 import aiofiles
 from fastapi import HTTPException
@@ -15,10 +15,13 @@ from llama_index.core.node_parser import SentenceSplitter
 from llama_index.core.objects import ObjectIndex
 from llama_index.core.schema import BaseNode, TextNode
 from llama_index.core.tools import BaseTool
+from llama_index.core.utils import get_tokenizer
 from types_aiobotocore_s3 import S3Client
 
+from src.embedding.constants import CHUNK_SIZE, TOKEN_COUNT_KEY
 from src.llamaindex_patch.node_mapping.id_tool_mapping import (
     IdToolMapping,
+    ToolLoader,
     create_tool_node_with_id,
 )
 from src.partitions.models.partition_file import PartitionFile
@@ -64,9 +67,10 @@ class EmbeddingService:
         self,
         tools: List[BaseTool],
         tool_storage_context: StorageContext,
+        tool_loader: Optional[ToolLoader] = None,
         **kwargs: Any,
     ) -> ObjectIndex[VectorStoreIndex]:
-        id_tool_mapping = IdToolMapping(tools)
+        id_tool_mapping = IdToolMapping(tools, tool_loader=tool_loader)
         vector_index = VectorStoreIndex.from_vector_store(  # pyright: ignore[reportUnknownMemberType]
             vector_store=tool_storage_context.vector_store,
             embed_model=self.embed_model,
@@ -160,10 +164,17 @@ class EmbeddingService:
         Returns:
             List[BaseNode]: List of basenodes
         """
-        splitter = SentenceSplitter(chunk_size=1024)
+        splitter = SentenceSplitter(chunk_size=CHUNK_SIZE)
 
         nodes = await splitter.aget_nodes_from_documents(documents)
 
+        # Stored in the Qdrant payload, tools budget context without re-tokenizing
+        tokenizer = get_tokenizer()
+        for node in nodes:
+            node.metadata[TOKEN_COUNT_KEY] = len(tokenizer(node.get_content()))
+            node.excluded_embed_metadata_keys.append(TOKEN_COUNT_KEY)
+            node.excluded_llm_metadata_keys.append(TOKEN_COUNT_KEY)
+
         return nodes
 
     async def embed_tool(
@@ -201,12 +212,14 @@ class EmbeddingService:
                 partition_file_tool.partition_file_id
             ),  # Deletion by partition_file_id
             "partition_file_tool_id": str(partition_file_tool.id),
+            "tool_group": partition_file_tool.tool_group,
         }
         exclude_keys = [
             "file_id",
             "partition_id",
             "partition_file_id",
             "file_mime_type",
+            "tool_group",
         ]
         tool_node.excluded_embed_metadata_keys.extend(exclude_keys)
         tool_node.excluded_llm_metadata_keys.extend(exclude_keys)
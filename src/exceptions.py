@@ -37,3 +37,20 @@ class ValidationHTTPException(HTTPException):
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"{entity_type} was not of expected type: {expected_type}",
         )
+
+
+class TooManyRequestsError(HTTPException):
+    def __init__(self, detail: str, retry_after: int) -> None:
+        super().__init__(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=detail,
+            headers={"Retry-After": str(retry_after)},
+        )
+
+
+class DeadlineExceededError(HTTPException):
+    def __init__(self) -> None:
+        super().__init__(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail="Request deadline exceeded",
+        )
@@ -12,6 +12,7 @@ from src.files.repository import FileSqlRepository
 from src.files.schemas.requests import CreatePresignedUrlRequest, FileCreate
 from src.files.schemas.responses import GetFileResponse
 from src.partitions.models.partition_file import PartitionFile
+from src.tools.cache import tool_cache
 
 
 class FileService:
@@ -113,6 +114,10 @@ class FileService:
         s3_client: S3Client,
     ):
         """Deletes file from postgres DB"""
+        partition_ids = {
+            partition_file.partition_id
+            for partition_file in await file.awaitable_attrs.partition_files
+        }
         await session.delete(file)
         await session.flush()
 
@@ -122,6 +127,8 @@ class FileService:
         await s3_client.delete_object(Bucket=file.bucket_name, Key=file.object_key)
 
         await session.commit()
+        for partition_id in partition_ids:
+            await tool_cache.invalidate_partition(partition_id)
         return {"message": "File deleted successfully", "file_id": file.id}
 
     async def delete_partition_file(
@@ -130,7 +137,8 @@ class FileService:
         session: AsyncSession,
     ):
         await session.delete(partition_file)
-        await session.flush()
+        await session.commit()
+        await tool_cache.invalidate_partition(partition_file.partition_id)
         # TODO Handle node cleanup
         # TODO Cleanup PartitionFilTool (Call delete_partition_file_tool)
 
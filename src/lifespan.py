@@ -6,6 +6,8 @@ from typing import AsyncGenerator, Dict, Tuple
 from fastapi import FastAPI
 
 from src.database import postgres_manager, qdrant_manager, redis_manager, s3_manager
+from src.manager import client_registry
+from src.tools.reranker import reranker
 
 logger = logging.getLogger(__name__)
 
@@ -29,6 +31,9 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
                 logger.error(f"Failed to initialize {service_names[i]}: {result}")
                 raise result
 
+        # Registry depends on the Qdrant client
+        await _init_registry()
+
         logger.info("All services initialized successfully")
 
         app.state.services_ready = True
@@ -50,6 +55,8 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
             _shutdown_redis(),
             _shutdown_qdrant(),
             _shutdown_s3(),
+            _shutdown_registry(),
+            _shutdown_reranker(),
             return_exceptions=True,
         )
 
@@ -67,6 +74,8 @@ async def _cleanup_on_startup_failure() -> None:
         _shutdown_database(),
         _shutdown_redis(),
         _shutdown_qdrant(),
+        _shutdown_registry(),
+        _shutdown_reranker(),
     ]
 
     await asyncio.gather(*cleanup_tasks, return_exceptions=True)
@@ -141,6 +150,16 @@ async def _init_s3() -> None:
         raise
 
 
+async def _init_registry() -> None:
+    """Initialize client registry with error handling"""
+    try:
+        await client_registry.init_registry()
+        logger.info("Client registry initialized")
+    except Exception as e:
+        logger.error(f"Client registry initialization failed: {e}")
+        raise
+
+
 async def _shutdown_database() -> None:
     """Shutdown database with error handling"""
     try:
@@ -175,3 +194,21 @@ async def _shutdown_s3() -> None:
         logger.info("S3 disconnected")
     except Exception as e:
         logger.warning(f"S3 shutdown warning: {e}")
+
+
+async def _shutdown_registry() -> None:
+    """Shutdown client registry with error handling"""
+    try:
+        await client_registry.close_registry()
+        logger.info("Client registry cleared")
+    except Exception as e:
+        logger.warning(f"Client registry shutdown warning: {e}")
+
+
+async def _shutdown_reranker() -> None:
+    """Shutdown reranker thread pool with error handling"""
+    try:
+        reranker.close()
+        logger.info("Reranker stopped")
+    except Exception as e:
+        logger.warning(f"Reranker shutdown warning: {e}")
@@ -0,0 +1,36 @@
+from functools import partial
+
+from llama_index.core.base.embeddings.base import Embedding
+from llama_index.embeddings.openai_like import OpenAILikeEmbedding
+
+from src.embedding.memo import get_query_embedding_memo
+
+
+class MemoizedOpenAILikeEmbedding(OpenAILikeEmbedding):
+    """OpenAILikeEmbedding that embeds each query once per request.
+
+    Query embeddings go through the memo of the current request when one is
+    set, text embeddings are never memoized.
+    """
+
+    @property
+    def _model_key(self) -> str:
+        return f"{self.model_name}:{self.dimensions}"
+
+    async def _aget_query_embedding(self, query: str) -> Embedding:
+        memo = get_query_embedding_memo()
+        if memo is None:
+            return await super()._aget_query_embedding(query)
+
+        return await memo.aget_dense(
+            self._model_key, query, partial(super()._aget_query_embedding, query)
+        )
+
+    def _get_query_embedding(self, query: str) -> Embedding:
+        memo = get_query_embedding_memo()
+        if memo is None:
+            return super()._get_query_embedding(query)
+
+        return memo.get_dense(
+            self._model_key, query, partial(super()._get_query_embedding, query)
+        )
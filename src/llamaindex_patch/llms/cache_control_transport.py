@@ -0,0 +1,55 @@
+import json
+
+import httpx
+
+from src.constants import PROVIDER_API_BASES, Provider
+
+OPENROUTER_HOST = httpx.URL(PROVIDER_API_BASES[Provider.OPENROUTER]).host
+
+
+class CacheControlTransport(httpx.AsyncHTTPTransport):
+    """Marks the end of the first system message of OpenRouter chat
+    completions as a prompt cache breakpoint.
+
+    Providers with explicit caching behind OpenRouter, such as Anthropic and
+    Gemini, then cache the tool specs and the system prompt preceding it.
+    Done on the request body, as llama-index messages can't carry
+    cache_control.
+    """
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if (
+            request.method == "POST"
+            and request.url.host == OPENROUTER_HOST
+            and request.url.path.endswith("/chat/completions")
+        ):
+            request = self._with_cache_control(request)
+        return await super().handle_async_request(request)
+
+    @staticmethod
+    def _with_cache_control(request: httpx.Request) -> httpx.Request:
+        body = json.loads(request.content)
+        for message in body.get("messages", []):
+            if message.get("role") != "system":
+                continue
+            if isinstance(message.get("content"), str):
+                message["content"] = [
+                    {
+                        "type": "text",
+                        "text": message["content"],
+                        "cache_control": {"type": "ephemeral"},
+                    }
+                ]
+            break
+        else:
+            return request
+
+        headers = request.headers.copy()
+        del headers["Content-Length"]
+        return httpx.Request(
+            request.method,
+            request.url,
+            headers=headers,
+            content=json.dumps(body).encode(),
+            extensions=request.extensions,
+        )
@@ -0,0 +1,91 @@
+import time
+from typing import Any, Dict, Sequence
+
+from llama_index.core.base.llms.types import (
+    ChatMessage,
+    ChatResponse,
+    ChatResponseAsyncGen,
+)
+from llama_index.llms.openai_like import OpenAILike
+from llama_index.llms.openrouter import OpenRouter
+
+from src.chat.usage import get_llm_step, get_llm_usage
+
+
+def get_cached_tokens(usage: Any) -> int:
+    """Cached prompt tokens of an OpenAI style usage, 0 when not reported"""
+    details = getattr(usage, "prompt_tokens_details", None)
+    cached_tokens = getattr(details, "cached_tokens", None)
+    if cached_tokens is None:
+        # DeepSeek style providers report cache hits at the top level
+        cached_tokens = getattr(usage, "prompt_cache_hit_tokens", None)
+    return cached_tokens or 0
+
+
+class UsageTrackingMixin:
+    """Records the latency and token counts, cached tokens included, of every
+    chat call in the LLM usage of the current request, under the step the
+    call was started in.
+
+    Streams only carry usage on their last chunk, which requires the
+    stream_options include_usage kwarg.
+    """
+
+    def _get_response_token_counts(self, raw_response: Any) -> Dict[str, Any]:
+        token_counts: Dict[str, Any] = super()._get_response_token_counts(  # type: ignore[misc]
+            raw_response
+        )
+        usage = getattr(raw_response, "usage", None)
+        if usage is not None and token_counts:
+            token_counts["cached_tokens"] = get_cached_tokens(usage)
+        return token_counts
+
+    async def _achat(
+        self, messages: Sequence[ChatMessage], **kwargs: Any
+    ) -> ChatResponse:
+        step = get_llm_step()
+        start_time = time.perf_counter()
+        response: ChatResponse = await super()._achat(  # type: ignore[misc]
+            messages, **kwargs
+        )
+
+        llm_usage = get_llm_usage()
+        if llm_usage is not None:
+            llm_usage.record(
+                step, time.perf_counter() - start_time, response.additional_kwargs
+            )
+        return response
+
+    async def _astream_chat(
+        self, messages: Sequence[ChatMessage], **kwargs: Any
+    ) -> ChatResponseAsyncGen:
+        # Captured now, the stream is consumed outside of the calling step
+        step = get_llm_step()
+        llm_usage = get_llm_usage()
+        start_time = time.perf_counter()
+        responses: ChatResponseAsyncGen = await super()._astream_chat(  # type: ignore[misc]
+            messages, **kwargs
+        )
+
+        async def gen() -> ChatResponseAsyncGen:
+            token_counts: Dict[str, Any] = {}
+            try:
+                async for response in responses:
+                    if response.additional_kwargs.get("prompt_tokens") is not None:
+                        token_counts = response.additional_kwargs
+                    yield response
+            finally:
+                if llm_usage is not None:
+                    llm_usage.record(
+                        step, time.perf_counter() - start_time, token_counts
+                    )
+
+        return gen()
+
+
+class UsageTrackingOpenAILike(UsageTrackingMixin, OpenAILike):
+    pass
+
+
+class UsageTrackingOpenRouter(UsageTrackingMixin, OpenRouter):
+    pass
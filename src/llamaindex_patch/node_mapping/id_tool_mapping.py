@@ -1,5 +1,6 @@
+import asyncio
 import uuid
-from typing import Any, Dict, Optional, Sequence, Type, Union
+from typing import Any, Awaitable, Callable, Dict, Optional, Sequence, Type, Union
 
 from llama_index.core.objects.base_node_mapping import BaseObjectNodeMapping
 from llama_index.core.schema import BaseNode, TextNode
@@ -8,6 +9,9 @@ from pydantic import BaseModel
 
 from src.utils import get_instance_var
 
+# Builds the tool of a PartitionFileTool id
+ToolLoader = Callable[[str], Awaitable[BaseTool]]
+
 
 def create_tool_node_with_id(
     tool_name: str,
@@ -71,11 +75,18 @@ class IdToolMapping(BaseObjectNodeMapping[Any]):
     """Custom tool mapping that is used to sync Postgres
     PartitionFileTool to Qdrant.
 
+    Tools can either be passed up front or built on demand by a tool loader,
+    in which case only the tools of retrieved nodes are ever materialized.
+
     Args:
         BaseObjectNodeMapping (Generic[OT]): Base Llamaindex Class
     """
 
-    def __init__(self, objs: Optional[Sequence[BaseTool]] = None) -> None:
+    def __init__(
+        self,
+        objs: Optional[Sequence[BaseTool]] = None,
+        tool_loader: Optional[ToolLoader] = None,
+    ) -> None:
         objs = objs or []
         try:
             self._tools: Dict[str, BaseTool] = {
@@ -83,6 +94,8 @@ class IdToolMapping(BaseObjectNodeMapping[Any]):
             }
         except AttributeError as e:
             raise Exception(f"Tool missing 'id' attribute: {e}")
+        self._tool_loader = tool_loader
+        self._loading: Dict[str, asyncio.Task[BaseTool]] = {}
 
     @classmethod
     def from_objects(
@@ -101,5 +114,29 @@ class IdToolMapping(BaseObjectNodeMapping[Any]):
         raise NotImplementedError("Class was not intended for this use")
 
     def _from_node(self, node: BaseNode) -> BaseTool:
-        """From node."""
+        """From node, only covers tools that are already materialized."""
         return self._tools[node.node_id]
+
+    async def afrom_node(self, node: BaseNode) -> BaseTool:
+        """From node, materializing the tool through the tool loader if needed."""
+        tool = self._tools.get(node.node_id)
+        if tool is not None or self._tool_loader is None:
+            return self._from_node(node)
+
+        task = self._loading.get(node.node_id)
+        if task is None:
+            task = asyncio.create_task(self._load_tool(node.node_id))
+            self._loading[node.node_id] = task
+
+        return await asyncio.shield(task)
+
+    async def _load_tool(self, tool_id: str) -> BaseTool:
+        if self._tool_loader is None:
+            raise Exception("IdToolMapping has no tool loader")
+
+        try:
+            tool = await self._tool_loader(tool_id)
+            self._add_object(tool)
+            return tool
+        finally:
+            self._loading.pop(tool_id, None)
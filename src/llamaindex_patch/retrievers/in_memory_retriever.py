@@ -0,0 +1,67 @@
+from typing import List, Sequence
+
+import numpy as np
+from llama_index.core.base.base_retriever import BaseRetriever
+from llama_index.core.base.embeddings.base import BaseEmbedding, Embedding
+from llama_index.core.schema import BaseNode, NodeWithScore, QueryBundle
+
+
+def normalize_rows(embeddings: Sequence[Embedding]) -> np.ndarray:
+    matrix = np.asarray(embeddings, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    return matrix / np.where(norms == 0, 1.0, norms)
+
+
+class InMemoryRetriever(BaseRetriever):
+    """Dense retriever over nodes held in process.
+
+    Node embeddings are kept as one normalized matrix, so a query is scored
+    against every node with a single matrix product. Scores are cosine
+    similarities, the same as the Qdrant collections they are loaded from.
+
+    Args:
+        nodes (Sequence[BaseNode]): Nodes, in the order of the embeddings rows
+        embeddings (np.ndarray): Normalized embeddings, one row per node
+    """
+
+    def __init__(
+        self,
+        nodes: Sequence[BaseNode],
+        embeddings: np.ndarray,
+        embed_model: BaseEmbedding,
+        similarity_top_k: int = 5,
+    ) -> None:
+        super().__init__()
+        if len(nodes) != len(embeddings):
+            raise ValueError("Every node needs exactly one embedding")
+        self._nodes = list(nodes)
+        self._embeddings = embeddings
+        self._embed_model = embed_model
+        self._similarity_top_k = similarity_top_k
+
+    def _retrieve(self, query_bundle: QueryBundle) -> List[NodeWithScore]:
+        if query_bundle.embedding is None:
+            query_bundle.embedding = self._embed_model.get_query_embedding(
+                query_bundle.query_str
+            )
+        return self._search(query_bundle.embedding)
+
+    async def _aretrieve(self, query_bundle: QueryBundle) -> List[NodeWithScore]:
+        if query_bundle.embedding is None:
+            query_bundle.embedding = await self._embed_model.aget_query_embedding(
+                query_bundle.query_str
+            )
+        return self._search(query_bundle.embedding)
+
+    def _search(self, query_embedding: Embedding) -> List[NodeWithScore]:
+        if not self._nodes:
+            return []
+
+        scores = self._embeddings @ normalize_rows(query_embedding)
+        top_k = min(self._similarity_top_k, len(self._nodes))
+        # Partial sort, only the top k end up ordered
+        indexes = np.argpartition(-scores, top_k - 1)[:top_k]
+        indexes = indexes[np.argsort(-scores[indexes])]
+        return [
+            NodeWithScore(node=self._nodes[i], score=float(scores[i])) for i in indexes
+        ]
@@ -0,0 +1,58 @@
+import asyncio
+from typing import Any, List, Optional
+
+from llama_index.core.base.base_retriever import BaseRetriever
+from llama_index.core.objects import ObjectRetriever
+from llama_index.core.postprocessor.types import BaseNodePostprocessor
+from llama_index.core.schema import NodeWithScore, QueryBundle, QueryType
+from llama_index.core.tools import BaseTool
+
+from src.llamaindex_patch.node_mapping.id_tool_mapping import IdToolMapping
+
+
+class LazyObjectRetriever(ObjectRetriever[Any]):
+    """Object retriever that only materializes the tools of retrieved nodes.
+
+    Args:
+        ObjectRetriever (Generic[OT]): Base Llamaindex Class
+    """
+
+    def __init__(
+        self,
+        retriever: BaseRetriever,
+        object_node_mapping: IdToolMapping,
+        node_postprocessors: Optional[List[BaseNodePostprocessor]] = None,
+    ) -> None:
+        super().__init__(
+            retriever=retriever,
+            object_node_mapping=object_node_mapping,
+            node_postprocessors=node_postprocessors,
+        )
+        self._id_tool_mapping = object_node_mapping
+
+    async def aretrieve(self, str_or_query_bundle: QueryType) -> List[BaseTool]:
+        nodes = await self.aretrieve_nodes(str_or_query_bundle)
+        return await self.aget_tools(nodes)
+
+    async def aretrieve_nodes(
+        self, str_or_query_bundle: QueryType
+    ) -> List[NodeWithScore]:
+        """Retrieves the scored tool nodes without materializing their tools"""
+        if isinstance(str_or_query_bundle, str):
+            query_bundle = QueryBundle(query_str=str_or_query_bundle)
+        else:
+            query_bundle = str_or_query_bundle
+
+        nodes = await self._retriever.aretrieve(query_bundle)
+        for node_postprocessor in self._node_postprocessors:
+            nodes = node_postprocessor.postprocess_nodes(
+                nodes, query_bundle=query_bundle
+            )
+        return nodes
+
+    async def aget_tools(self, nodes: List[NodeWithScore]) -> List[BaseTool]:
+        return list(
+            await asyncio.gather(
+                *(self._id_tool_mapping.afrom_node(node.node) for node in nodes)
+            )
+        )
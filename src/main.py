@@ -36,6 +36,7 @@ async def root():
 
 @app.get("/health")
 async def health_check():
+    from src.chat.degradation import load_monitor
     from src.lifespan import check_services_health
 
     services_status = await check_services_health()
@@ -44,6 +45,7 @@ async def health_check():
     return {
         "status": "healthy" if all_healthy else "unhealthy",
         "services": services_status,
+        "chat": await load_monitor.get_status(),
     }
 
 
@@ -1,12 +1,35 @@
 import time
-from typing import Dict
+import uuid
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
 
+import httpx
+from llama_index.embeddings.openai_like import OpenAILikeEmbedding
+from llama_index.llms.openai_like import OpenAILike
+from llama_index.vector_stores.qdrant import QdrantVectorStore
 from llama_index.vector_stores.qdrant.utils import (
     SparseEncoderCallable,
     fastembed_sparse_encoder,
 )
+from openai import DefaultAsyncHttpxClient
 
-from src.model import CachedFastEmbedModel
+from src.chat.config import CHAT_SETTINGS
+from src.config import SETTINGS
+from src.constants import PROVIDER_API_BASES, Provider
+from src.database import qdrant_manager
+from src.embedding.config import EMBEDDING_SETTINGS
+from src.embedding.memo import memoize_sparse_query_encoder
+from src.llamaindex_patch.embeddings.memoized_embedding import (
+    MemoizedOpenAILikeEmbedding,
+)
+from src.llamaindex_patch.llms.cache_control_transport import CacheControlTransport
+from src.llamaindex_patch.llms.usage_tracking_llm import (
+    UsageTrackingOpenAILike,
+    UsageTrackingOpenRouter,
+)
+from src.llamaindex_patch.stores.qdrant_vector_store import QdrantVectorStoreAsync
+from src.model import CachedFastEmbedModel, ProviderModel
+from src.partitions.utils import get_tool_collection
+from src.provider_router import ProviderEndpoint, ProviderRoutingTransport
 
 
 class FastEmbedManager:
@@ -46,3 +69,218 @@ class FastEmbedManager:
 
 
 fast_embed_manager = FastEmbedManager()
+
+
+def get_provider_api_key(provider: Provider) -> str:
+    api_keys: Dict[Provider, str] = {
+        Provider.OPENROUTER: SETTINGS.OPENROUTER_API_KEY,
+        Provider.NOVITA: SETTINGS.NOVITA_API_KEY,
+        Provider.DEEPINFRA: SETTINGS.DEEPINFRA_API_KEY,
+    }
+    return api_keys[provider]
+
+
+def get_provider_endpoint(provider_model: ProviderModel) -> ProviderEndpoint:
+    return ProviderEndpoint(
+        api_base=PROVIDER_API_BASES[provider_model.provider],
+        api_key=get_provider_api_key(provider_model.provider),
+        model=provider_model.model,
+    )
+
+
+class ClientRegistry:
+    """Process-wide registry of long-lived LLM clients, embedding models and
+    Qdrant vector stores. Clients are kept alive between requests so their
+    connection pools are reused.
+    """
+
+    def __init__(self) -> None:
+        self._llms: Dict[
+            Tuple[Provider, str, int, Tuple[Tuple[Provider, str], ...]], OpenAILike
+        ] = {}
+        self._embed_models: Dict[Tuple[str, Optional[int]], OpenAILikeEmbedding] = {}
+        self._vector_stores: Dict[str, QdrantVectorStore] = {}
+        self._http_clients: List[httpx.AsyncClient] = []
+
+    async def init_registry(self) -> None:
+        """Warms the default clients, Qdrant must already be initialized"""
+        self.get_llm(
+            CHAT_SETTINGS.LLM_PROVIDER,
+            CHAT_SETTINGS.LLM_MODEL,
+            CHAT_SETTINGS.LLM_MAX_TOKENS,
+            CHAT_SETTINGS.LLM_FALLBACKS,
+        )
+        self.get_llm(
+            CHAT_SETTINGS.TOOL_LLM_PROVIDER,
+            CHAT_SETTINGS.TOOL_LLM_MODEL,
+            CHAT_SETTINGS.TOOL_LLM_MAX_TOKENS,
+            CHAT_SETTINGS.TOOL_LLM_FALLBACKS,
+        )
+        fast_embed_manager.get_fastembed_model(
+            EMBEDDING_SETTINGS.DEFAULT_FAST_EMBED_MODE
+        )
+
+    async def close_registry(self) -> None:
+        for http_client in self._http_clients:
+            await http_client.aclose()
+        self._http_clients.clear()
+        self._llms.clear()
+        self._embed_models.clear()
+        self._vector_stores.clear()
+
+    def get_llm(
+        self,
+        provider: Provider,
+        model: str,
+        max_tokens: int,
+        fallbacks: Sequence[ProviderModel] = (),
+    ) -> OpenAILike:
+        key = (
+            provider,
+            model,
+            max_tokens,
+            tuple((fallback.provider, fallback.model) for fallback in fallbacks),
+        )
+        llm = self._llms.get(key)
+        if llm is None:
+            llm = self._create_llm(provider, model, max_tokens, fallbacks)
+            self._llms[key] = llm
+        return llm
+
+    # Only supports deepinfra for now, no point branching out currently
+    def get_embed_model(
+        self, model_name: str, dimension: Optional[int]
+    ) -> OpenAILikeEmbedding:
+        key = (model_name, dimension)
+        embed_model = self._embed_models.get(key)
+        if embed_model is None:
+            embed_model = MemoizedOpenAILikeEmbedding(
+                model_name=model_name,
+                api_base=EMBEDDING_SETTINGS.API_BASE,
+                api_key=EMBEDDING_SETTINGS.API_KEY,
+                api_version=EMBEDDING_SETTINGS.API_VERSION,
+                embed_batch_size=EMBEDDING_SETTINGS.EMBED_BATCH_SIZE,
+                max_retries=EMBEDDING_SETTINGS.MAX_RETIRES,
+                timeout=EMBEDDING_SETTINGS.TIMEOUT,
+                dimensions=dimension,
+                reuse_client=EMBEDDING_SETTINGS.REUSE_CLIENT,
+                num_workers=EMBEDDING_SETTINGS.NUM_WORKERS,
+                additional_kwargs={"encoding_format": "float"},
+                async_http_client=self._create_http_client(
+                    EMBEDDING_SETTINGS.FALLBACKS.get(model_name, [])
+                ),
+            )
+            self._embed_models[key] = embed_model
+        return embed_model
+
+    def get_vector_store(
+        self, collection_id: Union[uuid.UUID, str]
+    ) -> QdrantVectorStore:
+        collection_name = str(collection_id)
+        vector_store = self._vector_stores.get(collection_name)
+        if vector_store is None:
+            fastembed_model = fast_embed_manager.get_fastembed_model(
+                EMBEDDING_SETTINGS.DEFAULT_FAST_EMBED_MODE
+            )
+            vector_store = QdrantVectorStoreAsync(
+                collection_name=collection_name,
+                enable_hybrid=True,
+                fastembed_sparse_model=EMBEDDING_SETTINGS.DEFAULT_FAST_EMBED_MODE,
+                batch_size=64,
+                parallel=6,
+                max_retries=5,
+                aclient=qdrant_manager.get_client(),
+                sparse_doc_fn=fastembed_model,
+                sparse_query_fn=memoize_sparse_query_encoder(
+                    EMBEDDING_SETTINGS.DEFAULT_FAST_EMBED_MODE, fastembed_model
+                ),
+            )
+            self._vector_stores[collection_name] = vector_store
+        return vector_store
+
+    def get_tool_vector_store(
+        self, collection_id: Union[uuid.UUID, str]
+    ) -> QdrantVectorStore:
+        collection_name = get_tool_collection(collection_id)
+        vector_store = self._vector_stores.get(collection_name)
+        if vector_store is None:
+            fastembed_model = fast_embed_manager.get_fastembed_model(
+                EMBEDDING_SETTINGS.DEFAULT_FAST_EMBED_MODE
+            )
+            vector_store = QdrantVectorStoreAsync(
+                collection_name=collection_name,
+                enable_hybrid=True,
+                fastembed_sparse_model=EMBEDDING_SETTINGS.DEFAULT_FAST_EMBED_MODE,
+                batch_size=64,
+                aclient=qdrant_manager.get_client(),
+                sparse_doc_fn=fastembed_model,
+                sparse_query_fn=memoize_sparse_query_encoder(
+                    EMBEDDING_SETTINGS.DEFAULT_FAST_EMBED_MODE, fastembed_model
+                ),
+            )
+            self._vector_stores[collection_name] = vector_store
+        return vector_store
+
+    def evict_collection(self, collection_id: Union[uuid.UUID, str]) -> None:
+        """Drops the vector stores of a deleted collection"""
+        self._vector_stores.pop(str(collection_id), None)
+        self._vector_stores.pop(get_tool_collection(collection_id), None)
+
+    def _create_http_client(
+        self, fallbacks: Sequence[ProviderModel]
+    ) -> httpx.AsyncClient:
+        """Client routing calls through the provider router, so they are hedged
+        and failed over to the fallbacks
+        """
+        transport: httpx.AsyncBaseTransport = (
+            CacheControlTransport()
+            if CHAT_SETTINGS.PROMPT_CACHE_CONTROL
+            else httpx.AsyncHTTPTransport()
+        )
+        http_client = DefaultAsyncHttpxClient(
+            transport=ProviderRoutingTransport(
+                [get_provider_endpoint(fallback) for fallback in fallbacks],
+                transport,
+            )
+        )
+        self._http_clients.append(http_client)
+        return http_client
+
+    def _create_llm(
+        self,
+        provider: Provider,
+        model: str,
+        max_tokens: int,
+        fallbacks: Sequence[ProviderModel],
+    ) -> OpenAILike:
+        # Streams only report their usage, cached tokens included, when asked
+        additional_kwargs: Dict[str, Any] = {"stream_options": {"include_usage": True}}
+        async_http_client = self._create_http_client(fallbacks)
+
+        if provider == Provider.OPENROUTER:
+            return UsageTrackingOpenRouter(
+                model=model,
+                temperature=0.0,
+                api_key=get_provider_api_key(provider),
+                is_function_calling_model=True,
+                verbose=True,
+                max_tokens=max_tokens,
+                additional_kwargs=additional_kwargs,
+                async_http_client=async_http_client,
+            )
+
+        # Other providers cache identical prompt prefixes automatically
+        return UsageTrackingOpenAILike(
+            model=model,
+            api_base=PROVIDER_API_BASES[provider],
+            api_key=get_provider_api_key(provider),
+            temperature=0.0,
+            is_chat_model=True,
+            is_function_calling_model=True,
+            max_tokens=max_tokens,
+            additional_kwargs=additional_kwargs,
+            async_http_client=async_http_client,
+        )
+
+
+client_registry = ClientRegistry()
@@ -7,6 +7,8 @@ from sqlalchemy import DateTime, MetaData, func
 from sqlalchemy.ext.asyncio import AsyncAttrs
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
 
+from src.constants import Provider
+
 # from typing import TypeVar
 
 
@@ -49,3 +51,8 @@ class CachedFastEmbedModel(BaseModel):
     model: SparseEncoderCallable
     last_accessed: float
     created_at: float
+
+
+class ProviderModel(BaseModel):
+    provider: Provider
+    model: str
@@ -10,6 +10,7 @@ from src.factory import get_id_from_path_factory, validate_entity_exists_factory
 from src.partitions.models.partition import Partition
 from src.partitions.repository import (
     PartitionFileSqlRepository,
+    PartitionFileSummarySqlRepository,
     PartitionFileToolSqlRepository,
     PartitionSqlRepository,
 )
@@ -31,6 +32,12 @@ def _get_partition_file_tool_repository(
     return PartitionFileToolSqlRepository(session)
 
 
+def _get_partition_file_summary_repository(
+    session: PostgresDep,
+) -> PartitionFileSummarySqlRepository:
+    return PartitionFileSummarySqlRepository(session)
+
+
 # Entities
 async def _get_partition_with_collection(
     session: PostgresDep,
@@ -67,6 +74,9 @@ PartitionFileRepositoryDep = Annotated[
 PartitionFileToolRepositoryDep = Annotated[
     PartitionFileToolSqlRepository, Depends(_get_partition_file_tool_repository)
 ]
+PartitionFileSummaryRepositoryDep = Annotated[
+    PartitionFileSummarySqlRepository, Depends(_get_partition_file_summary_repository)
+]
 ValidPartitionLoadedDep = Annotated[Partition, Depends(_get_partition_with_collection)]
 ValidPartitionDep = Annotated[
     Partition,
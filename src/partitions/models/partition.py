@@ -1,7 +1,7 @@
 import uuid
 from typing import TYPE_CHECKING, List, Optional
 
-from sqlalchemy import UUID, ForeignKey, Index, String, Text
+from sqlalchemy import UUID, Float, ForeignKey, Index, String, Text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from src.model import TrackedBase
@@ -27,6 +27,11 @@ class Partition(TrackedBase):
         String(128), nullable=False, default=PartitionDbStatus.ACTIVE
     )
     systemPrompt: Mapped[str] = mapped_column(Text(), nullable=True)
+    # Tool retrieval scores that let a question skip the agent, None for defaults
+    fast_path_min_score: Mapped[Optional[float]] = mapped_column(Float(), nullable=True)
+    fast_path_min_margin: Mapped[Optional[float]] = mapped_column(
+        Float(), nullable=True
+    )
 
     collection: Mapped["Collection"] = relationship(
         "Collection", back_populates="partitions"
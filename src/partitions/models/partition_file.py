@@ -9,6 +9,7 @@ from src.model import TrackedBase
 if TYPE_CHECKING:
     from src.files.models.file import File
     from src.partitions.models.partition import Partition
+    from src.partitions.models.partition_file_summary import PartitionFileSummary
     from src.partitions.models.partition_file_tool import PartitionFileTool
 
 
@@ -41,6 +42,12 @@ class PartitionFile(TrackedBase):
         cascade="all, delete-orphan",
     )
 
+    partition_file_summaries: Mapped[List["PartitionFileSummary"]] = relationship(
+        "PartitionFileSummary",
+        back_populates="partition_file",
+        cascade="all, delete-orphan",
+    )
+
     __table_args__ = (
         UniqueConstraint("partition_id", "file_id"),
         Index(None, "partition_id"),
@@ -0,0 +1,34 @@
+import uuid
+from typing import TYPE_CHECKING
+
+from sqlalchemy import UUID, ForeignKey, Index, Integer, Text
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+
+from src.model import TrackedBase
+
+if TYPE_CHECKING:
+    from src.partitions.models.partition_file import PartitionFile
+
+
+class PartitionFileSummary(TrackedBase):
+    __tablename__ = "partition_file_summaries"
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
+    )
+
+    partition_file_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("partition_files.id"), nullable=False
+    )
+
+    # Level 1 summarizes groups of chunks, the highest level is the file abstract
+    level: Mapped[int] = mapped_column(Integer(), nullable=False)
+    position: Mapped[int] = mapped_column(Integer(), nullable=False)
+    text: Mapped[str] = mapped_column(Text(), nullable=False)
+
+    # Relationships
+    partition_file: Mapped["PartitionFile"] = relationship(
+        "PartitionFile", back_populates="partition_file_summaries"
+    )
+
+    __table_args__ = (Index(None, "partition_file_id"),)
@@ -18,6 +18,12 @@ class PartitionCreate(RepositoryBaseModel):
     )
     collection_id: uuid.UUID
     status: PartitionDbStatus = Field(description="", default=PartitionDbStatus.ACTIVE)
+    fast_path_min_score: Optional[float] = Field(
+        None, ge=0, le=1, description="Minimum score of the fast path tool"
+    )
+    fast_path_min_margin: Optional[float] = Field(
+        None, ge=0, le=1, description="Minimum score lead over the next tool"
+    )
 
 
 class PartitionUpdate(RepositoryBaseModel):
@@ -26,6 +32,12 @@ class PartitionUpdate(RepositoryBaseModel):
         None, min_length=4, description="Partition description"
     )
     status: PartitionDbStatus
+    fast_path_min_score: Optional[float] = Field(
+        None, ge=0, le=1, description="Minimum score of the fast path tool"
+    )
+    fast_path_min_margin: Optional[float] = Field(
+        None, ge=0, le=1, description="Minimum score lead over the next tool"
+    )
 
 
 # String annotations due to circular improt
@@ -64,3 +76,14 @@ class PartitionFileToolCreate(RepositoryBaseModel):
 
 class PartitionFileToolUpdate(RepositoryBaseModel):
     tool_group: str
+
+
+class PartitionFileSummaryCreate(RepositoryBaseModel):
+    partition_file_id: uuid.UUID
+    level: int
+    position: int
+    text: str
+
+
+class PartitionFileSummaryUpdate(RepositoryBaseModel):
+    text: str
@@ -1,15 +1,20 @@
 import uuid
-from typing import Optional
+from typing import Optional, Sequence
 
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import contains_eager, joinedload
 
 from src.partitions.constants import PartitionDbStatus
 from src.partitions.models.partition import Partition
 from src.partitions.models.partition_file import PartitionFile
+from src.partitions.models.partition_file_summary import PartitionFileSummary
 from src.partitions.models.partition_file_tool import PartitionFileTool
 from src.partitions.models.repository import (
     PartitionCreate,
     PartitionFileCreate,
+    PartitionFileSummaryCreate,
+    PartitionFileSummaryUpdate,
     PartitionFileToolCreate,
     PartitionFileToolUpdate,
     PartitionFileUpdate,
@@ -54,3 +59,44 @@ class PartitionFileToolSqlRepository(
             postgres_session,
             PartitionFileTool,
         )
+
+    async def get_partition_tools(
+        self, partition_id: uuid.UUID, tool_group: str
+    ) -> Sequence[PartitionFileTool]:
+        """Gets tools of a partition and tool group, with partition_file and
+        file eager loaded"""
+        query = self._query_builder(
+            PartitionFile.partition_id == partition_id,
+            PartitionFileTool.tool_group == tool_group,
+            query=select(PartitionFileTool)
+            .join(PartitionFileTool.partition_file)
+            .options(
+                contains_eager(PartitionFileTool.partition_file).joinedload(
+                    PartitionFile.file
+                )
+            ),
+        )
+        result = await self.session.scalars(query)
+        return result.all()
+
+
+class PartitionFileSummarySqlRepository(
+    SqlRepository[
+        PartitionFileSummary, PartitionFileSummaryCreate, PartitionFileSummaryUpdate
+    ]
+):
+    def __init__(self, postgres_session: AsyncSession) -> None:
+        super().__init__(
+            postgres_session,
+            PartitionFileSummary,
+        )
+
+    async def get_file_summaries(
+        self, partition_file_id: uuid.UUID
+    ) -> Sequence[PartitionFileSummary]:
+        """Gets the summary tree of a partition file, from the abstract down"""
+        query = self._query_builder(
+            PartitionFileSummary.partition_file_id == partition_file_id
+        ).order_by(PartitionFileSummary.level.desc(), PartitionFileSummary.position)
+        result = await self.session.scalars(query)
+        return result.all()
@@ -12,6 +12,12 @@ class CreatePartitionRequest(BaseModel):
         None, min_length=4, description="Partition description"
     )
     collection_id: uuid.UUID
+    fast_path_min_score: Optional[float] = Field(
+        None, ge=0, le=1, description="Minimum score of the fast path tool"
+    )
+    fast_path_min_margin: Optional[float] = Field(
+        None, ge=0, le=1, description="Minimum score lead over the next tool"
+    )
 
 
 class UpdatePartitionRequest(BaseModel):
@@ -20,3 +26,9 @@ class UpdatePartitionRequest(BaseModel):
         None, min_length=4, description="Partition description"
     )
     status: PartitionDbStatus
+    fast_path_min_score: Optional[float] = Field(
+        None, ge=0, le=1, description="Minimum score of the fast path tool"
+    )
+    fast_path_min_margin: Optional[float] = Field(
+        None, ge=0, le=1, description="Minimum score lead over the next tool"
+    )
@@ -12,6 +12,8 @@ class PartitionResponse(BaseModel):
     description: Optional[str]
     collection_id: uuid.UUID
     status: PartitionDbStatus
+    fast_path_min_score: Optional[float]
+    fast_path_min_margin: Optional[float]
 
     model_config = ConfigDict(
         from_attributes=True,
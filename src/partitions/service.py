@@ -15,6 +15,7 @@ from src.partitions.repository import PartitionFileSqlRepository, PartitionSqlRe
 from src.partitions.schemas.request import CreatePartitionRequest
 from src.partitions.schemas.response import PartitionResponse
 from src.partitions.utils import PartitionMapper
+from src.tools.cache import tool_cache
 from src.tools.service import ToolService
 
 
@@ -55,6 +56,7 @@ class PartitionService:
             raise Exception("Placeholder")
 
         await session.commit()
+        await tool_cache.invalidate_partition(partition_id)
         return PartitionMapper.db_to_response(partition)
 
     async def add_partition_file(
@@ -96,4 +98,8 @@ class PartitionService:
             nodes=file_nodes,
         )
 
+        # Commit before invalidating so reloads can't cache the old tool set
+        await self.partition_file_repository.session.commit()
+        await tool_cache.invalidate_partition(partition.id)
+
         return PartitionMapper.db_to_response(partition)
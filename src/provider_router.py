@@ -0,0 +1,351 @@
+import asyncio
+import json
+import logging
+import time
+from collections import deque
+from typing import AsyncIterator, Deque, Dict, List, Optional, Sequence, Set
+
+import httpx
+from pydantic import BaseModel
+
+from src.config import SETTINGS
+from src.deadline import get_remaining_seconds
+
+logger = logging.getLogger(__name__)
+
+# Statuses worth retrying on another provider, others are the caller's fault
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+
+# OpenAI compatible endpoints a call can be routed to another provider on
+ROUTED_ENDPOINTS = ("/chat/completions", "/embeddings")
+
+
+class ProviderEndpoint(BaseModel):
+    """OpenAI compatible API a call can be sent to"""
+
+    api_base: str
+    api_key: str
+    model: str
+
+
+class ProviderStats:
+    """Latencies and outcomes of the recent calls made to one endpoint"""
+
+    def __init__(self, window: int) -> None:
+        self.latencies: Deque[float] = deque(maxlen=window)
+        self.errors: Deque[bool] = deque(maxlen=window)
+
+    def record_success(self, latency: float) -> None:
+        self.latencies.append(latency)
+        self.errors.append(False)
+
+    def record_error(self) -> None:
+        self.errors.append(True)
+
+    @property
+    def error_rate(self) -> float:
+        if not self.errors:
+            return 0.0
+        return sum(self.errors) / len(self.errors)
+
+    def quantile(self, q: float) -> Optional[float]:
+        if not self.latencies:
+            return None
+        latencies = sorted(self.latencies)
+        return latencies[int(q * (len(latencies) - 1))]
+
+
+class ProviderRouter:
+    """Live latency and error rates of every provider endpoint called, keyed
+    by host, model and whether the call streams
+    """
+
+    def __init__(
+        self,
+        hedge_enabled: bool = SETTINGS.PROVIDER_HEDGE_ENABLED,
+        hedge_quantile: float = SETTINGS.PROVIDER_HEDGE_QUANTILE,
+        hedge_min_delay: float = SETTINGS.PROVIDER_HEDGE_MIN_DELAY_SECONDS,
+        hedge_default_delay: float = SETTINGS.PROVIDER_HEDGE_DEFAULT_DELAY_SECONDS,
+        window: int = SETTINGS.PROVIDER_STATS_WINDOW,
+        min_samples: int = SETTINGS.PROVIDER_STATS_MIN_SAMPLES,
+        max_error_rate: float = SETTINGS.PROVIDER_MAX_ERROR_RATE,
+    ) -> None:
+        self.hedge_enabled = hedge_enabled
+        self.hedge_quantile = hedge_quantile
+        self.hedge_min_delay = hedge_min_delay
+        self.hedge_default_delay = hedge_default_delay
+        self.window = window
+        self.min_samples = min_samples
+        self.max_error_rate = max_error_rate
+        self._stats: Dict[str, ProviderStats] = {}
+
+    def get_stats(self, key: str) -> ProviderStats:
+        stats = self._stats.get(key)
+        if stats is None:
+            stats = ProviderStats(self.window)
+            self._stats[key] = stats
+        return stats
+
+    def is_healthy(self, key: str) -> bool:
+        stats = self.get_stats(key)
+        if len(stats.errors) < self.min_samples:
+            return True
+        return stats.error_rate <= self.max_error_rate
+
+    def order(self, keys: Sequence[str]) -> List[int]:
+        """Indexes of keys in the order to try them, unhealthy ones last"""
+        return sorted(range(len(keys)), key=lambda i: not self.is_healthy(keys[i]))
+
+    def get_stream_latency(self, q: float) -> Optional[float]:
+        """Slowest quantile q time to first chunk across streamed endpoints,
+        None until one has enough samples
+        """
+        latencies = [
+            stats.quantile(q)
+            for key, stats in self._stats.items()
+            if key.endswith("/stream") and len(stats.latencies) >= self.min_samples
+        ]
+        return max(
+            (latency for latency in latencies if latency is not None), default=None
+        )
+
+    def get_hedge_delay(self, key: str) -> Optional[float]:
+        """Seconds to wait on a call before hedging it, None to never hedge"""
+        if not self.hedge_enabled:
+            return None
+
+        stats = self.get_stats(key)
+        if len(stats.latencies) < self.min_samples:
+            return self.hedge_default_delay
+        latency = stats.quantile(self.hedge_quantile) or 0.0
+        return max(latency, self.hedge_min_delay)
+
+
+provider_router = ProviderRouter()
+
+
+class RetryableStatusError(Exception):
+    def __init__(self, response: httpx.Response) -> None:
+        super().__init__(f"Provider returned status {response.status_code}")
+        self.response = response
+
+
+class _PeekedStream(httpx.AsyncByteStream):
+    """Response stream whose first chunk was already read"""
+
+    def __init__(
+        self,
+        first_chunk: bytes,
+        chunks: AsyncIterator[bytes],
+        stream: httpx.AsyncByteStream,
+    ) -> None:
+        self._first_chunk = first_chunk
+        self._chunks = chunks
+        self._stream = stream
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        yield self._first_chunk
+        async for chunk in self._chunks:
+            yield chunk
+
+    async def aclose(self) -> None:
+        await self._stream.aclose()
+
+
+class ProviderRoutingTransport(httpx.AsyncBaseTransport):
+    """Sends OpenAI compatible calls to the requested endpoint, then to its
+    fallbacks.
+
+    A call still running after the hedge delay of its endpoint is raced
+    against the next one, the first to answer wins. Failed calls move on to
+    the next endpoint straight away. Streams are timed to their first chunk,
+    other calls to their full body.
+    """
+
+    def __init__(
+        self,
+        fallbacks: Sequence[ProviderEndpoint],
+        transport: httpx.AsyncBaseTransport,
+        router: ProviderRouter = provider_router,
+    ) -> None:
+        self.fallbacks = fallbacks
+        self.router = router
+        self._transport = transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        endpoint = next(
+            (e for e in ROUTED_ENDPOINTS if request.url.path.endswith(e)), None
+        )
+        if request.method != "POST" or endpoint is None:
+            return await self._transport.handle_async_request(request)
+
+        remaining = get_remaining_seconds()
+        if remaining is not None:
+            # Calls, fallbacks included, never outlive the request they serve
+            if remaining <= 0:
+                raise httpx.TimeoutException(
+                    "Request deadline exceeded", request=request
+                )
+            self._cap_timeout(request, remaining)
+
+        body = json.loads(request.content)
+        stream = bool(body.get("stream"))
+        requests = [request]
+        keys = [self._get_key(request, str(body.get("model")), stream)]
+        for fallback in self.fallbacks:
+            fallback_request = self._for_fallback(request, body, endpoint, fallback)
+            requests.append(fallback_request)
+            keys.append(self._get_key(fallback_request, fallback.model, stream))
+
+        order = self.router.order(keys)
+        return await self._race(
+            [requests[i] for i in order], [keys[i] for i in order], stream
+        )
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+    async def _race(
+        self, requests: List[httpx.Request], keys: List[str], stream: bool
+    ) -> httpx.Response:
+        pending: Set[asyncio.Task[httpx.Response]] = set()
+        last_error: Optional[Exception] = None
+        started = 0
+
+        def start_next() -> None:
+            nonlocal started
+            task = asyncio.create_task(
+                self._send(requests[started], keys[started], stream)
+            )
+            pending.add(task)
+            started += 1
+
+        start_next()
+        try:
+            while pending:
+                hedge_delay = None
+                if started < len(requests):
+                    hedge_delay = self.router.get_hedge_delay(keys[started - 1])
+
+                done, _ = await asyncio.wait(
+                    pending, timeout=hedge_delay, return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    logger.info("Hedging slow call to %s", keys[started - 1])
+                    start_next()
+                    continue
+
+                for task in done:
+                    pending.discard(task)
+                    try:
+                        response = task.result()
+                    except Exception as e:
+                        last_error = e
+                        continue
+                    # Hedges finishing at the same time are discarded
+                    for other in done - {task}:
+                        if not other.cancelled() and other.exception() is None:
+                            await other.result().aclose()
+                    return response
+
+                if started < len(requests):
+                    logger.warning(
+                        "Call to %s failed, failing over: %s",
+                        keys[started - 1],
+                        last_error,
+                    )
+                    start_next()
+        finally:
+            for task in pending:
+                task.cancel()
+
+        # Every endpoint failed, the caller handles the last failure
+        if isinstance(last_error, RetryableStatusError):
+            return last_error.response
+        assert last_error is not None
+        raise last_error
+
+    async def _send(
+        self, request: httpx.Request, key: str, stream: bool
+    ) -> httpx.Response:
+        stats = self.router.get_stats(key)
+        start_time = time.perf_counter()
+        try:
+            response = await self._transport.handle_async_request(request)
+            if response.status_code in RETRYABLE_STATUS_CODES:
+                raise RetryableStatusError(await self._buffer(response))
+            if stream and response.status_code == 200:
+                response = await self._peek(response)
+            else:
+                response = await self._buffer(response)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            stats.record_error()
+            raise
+
+        stats.record_success(time.perf_counter() - start_time)
+        return response
+
+    @staticmethod
+    async def _buffer(response: httpx.Response) -> httpx.Response:
+        """Reads the raw body, so the call only completes once it is received"""
+        try:
+            content = b"".join([chunk async for chunk in response.stream])
+        finally:
+            await response.aclose()
+        return httpx.Response(
+            response.status_code,
+            headers=response.headers,
+            stream=httpx.ByteStream(content),
+            extensions=response.extensions,
+        )
+
+    @staticmethod
+    async def _peek(response: httpx.Response) -> httpx.Response:
+        """Waits for the first chunk of a streamed body"""
+        chunks = response.stream.__aiter__()  # type: ignore[union-attr]
+        try:
+            first_chunk = await chunks.__anext__()
+        except StopAsyncIteration:
+            first_chunk = b""
+        except BaseException:
+            await response.aclose()
+            raise
+        return httpx.Response(
+            response.status_code,
+            headers=response.headers,
+            stream=_PeekedStream(first_chunk, chunks, response.stream),  # type: ignore[arg-type]
+            extensions=response.extensions,
+        )
+
+    @staticmethod
+    def _cap_timeout(request: httpx.Request, seconds: float) -> None:
+        timeout: Dict[str, Optional[float]] = request.extensions.get("timeout", {})
+        request.extensions["timeout"] = {
+            key: seconds if timeout.get(key) is None else min(timeout[key], seconds)  # type: ignore[type-var]
+            for key in ("connect", "read", "write", "pool")
+        }
+
+    @staticmethod
+    def _get_key(request: httpx.Request, model: str, stream: bool) -> str:
+        return f"{request.url.host}/{model}" + ("/stream" if stream else "")
+
+    @staticmethod
+    def _for_fallback(
+        request: httpx.Request,
+        body: Dict[str, object],
+        endpoint: str,
+        fallback: ProviderEndpoint,
+    ) -> httpx.Request:
+        headers = request.headers.copy()
+        del headers["Host"]
+        del headers["Content-Length"]
+        headers["Authorization"] = f"Bearer {fallback.api_key}"
+        return httpx.Request(
+            request.method,
+            fallback.api_base.rstrip("/") + endpoint,
+            headers=headers,
+            content=json.dumps({**body, "model": fallback.model}).encode(),
+            extensions=request.extensions,
+        )
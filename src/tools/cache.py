@@ -0,0 +1,114 @@
+import asyncio
+import time
+import uuid
+from typing import Awaitable, Callable, Dict, Optional, Tuple, Union
+
+from pydantic import BaseModel, ConfigDict
+
+from src.database import redis_manager
+from src.llamaindex_patch.retrievers.lazy_object_retriever import LazyObjectRetriever
+from src.tools.config import TOOL_SETTINGS
+from src.tools.constants import PARTITION_VERSION_KEY
+
+ToolSetLoader = Callable[[], Awaitable[LazyObjectRetriever]]
+
+
+class CachedToolSet(BaseModel):
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    object_retriever: LazyObjectRetriever
+    version: int
+    last_accessed: float
+    created_at: float
+
+
+async def get_partition_version(partition_id: Union[uuid.UUID, str]) -> int:
+    version: Optional[str] = await redis_manager.get_client().get(
+        PARTITION_VERSION_KEY.format(partition_id=partition_id)
+    )
+    return int(version) if version else 0
+
+
+class ToolCache:
+    """In-process cache of object retrievers, and the tools they materialize,
+    per (partition_id, tool_group).
+
+    Entries are checked against a partition version kept in Redis, so a change
+    made through any worker invalidates every worker's copy. Concurrent misses
+    for the same key share a single load.
+    """
+
+    def __init__(self, ttl_seconds: int = TOOL_SETTINGS.CACHE_TTL_SECONDS) -> None:
+        self._entries: Dict[Tuple[str, str], CachedToolSet] = {}
+        self._loading: Dict[Tuple[str, str, int], asyncio.Task[CachedToolSet]] = {}
+        self.ttl_seconds = ttl_seconds
+
+    def _cleanup_expired(self) -> None:
+        current_time = time.time()
+        expired_keys = [
+            key
+            for key, cached in self._entries.items()
+            if current_time - cached.last_accessed > self.ttl_seconds
+        ]
+        for key in expired_keys:
+            del self._entries[key]
+
+    async def get_or_load(
+        self,
+        partition_id: Union[uuid.UUID, str],
+        tool_group: str,
+        loader: ToolSetLoader,
+    ) -> CachedToolSet:
+        key = (str(partition_id), tool_group)
+        version = await get_partition_version(partition_id)
+
+        self._cleanup_expired()
+        cached = self._entries.get(key)
+        if cached and cached.version == version:
+            cached.last_accessed = time.time()
+            return cached
+
+        load_key = (*key, version)
+        task = self._loading.get(load_key)
+        if task is None:
+            task = asyncio.create_task(self._load(key, version, loader))
+            self._loading[load_key] = task
+            task.add_done_callback(lambda _: self._loading.pop(load_key, None))
+
+        # Shielded so one cancelled waiter doesn't cancel the load for the rest
+        return await asyncio.shield(task)
+
+    async def _load(
+        self,
+        key: Tuple[str, str],
+        version: int,
+        loader: ToolSetLoader,
+    ) -> CachedToolSet:
+        object_retriever = await loader()
+
+        current_time = time.time()
+        cached = CachedToolSet(
+            object_retriever=object_retriever,
+            version=version,
+            last_accessed=current_time,
+            created_at=current_time,
+        )
+
+        current = self._entries.get(key)
+        if current is None or current.version <= version:
+            self._entries[key] = cached
+        return cached
+
+    async def invalidate_partition(self, partition_id: Union[uuid.UUID, str]) -> None:
+        """Bumps the partition version and drops local entries of the partition"""
+        await redis_manager.get_client().incr(
+            PARTITION_VERSION_KEY.format(partition_id=partition_id)
+        )
+
+        partition_id_str = str(partition_id)
+        stale_keys = [key for key in self._entries if key[0] == partition_id_str]
+        for key in stale_keys:
+            del self._entries[key]
+
+
+tool_cache = ToolCache()
@@ -0,0 +1,95 @@
+from typing import Optional
+
+from pydantic import Field, model_validator
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+from src.embedding.constants import CHUNK_SIZE
+from src.tools.constants import VectorToolMode
+
+
+class ToolConfig(BaseSettings):
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        case_sensitive=True,
+        env_prefix="TOOLS_",
+        extra="ignore",
+    )
+
+    CACHE_TTL_SECONDS: int = Field(
+        default=1800, description="Idle time before a cached partition tool set expires"
+    )
+    NODE_SCROLL_BATCH_SIZE: int = Field(
+        default=256, description="Page size of Qdrant scrolls loading file nodes"
+    )
+    MEMORY_INDEX_ENABLED: bool = Field(
+        default=True,
+        description="Retrieve tools from an in-process index of their embeddings",
+    )
+    MEMORY_INDEX_MAX_TOOLS: int = Field(
+        default=5000,
+        description="Tool count past which a partition retrieves its tools from Qdrant",
+    )
+    TOOL_TOP_K: int = Field(default=5, description="Tools retrieved per chat request")
+    SUMMARY_GROUP_SIZE: int = Field(
+        default=8, description="Number of chunks or summaries rolled into one summary"
+    )
+    SUMMARY_CONCURRENCY: int = Field(
+        default=4, description="Concurrent LLM calls while building a summary tree"
+    )
+
+    VECTOR_TOOL_MODE: VectorToolMode = Field(
+        default=VectorToolMode.SYNTHESIZE,
+        description="Whether vector tools synthesize an answer or return raw chunks",
+    )
+    VECTOR_TOP_K: int = Field(
+        default=5, description="Chunks retrieved per vector tool call"
+    )
+    DEGRADED_VECTOR_TOP_K: int = Field(
+        default=3, description="Chunks retrieved per vector tool call while degraded"
+    )
+    VECTOR_MAX_TOKENS: Optional[int] = Field(
+        default=None,
+        description="Token cap of the chunks one vector tool call returns, or "
+        "synthesizes from. Defaults to every retrieved chunk at full chunk size, lower "
+        "caps shorten the prompt but silently drop the lower ranked chunks",
+    )
+    CONTEXT_TOKEN_BUDGET: int = Field(
+        default=12000,
+        description="Token budget of the chunks returned across a request's tool "
+        "calls, kept above VECTOR_MAX_TOKENS so one call gets all of its chunks",
+    )
+
+    RERANK_ENABLED: bool = Field(
+        default=False, description="Rerank vector tool chunks with a cross-encoder"
+    )
+    RERANK_MODEL: str = Field(
+        default="cross-encoder/ms-marco-MiniLM-L-6-v2",
+        description="Hugging Face cross-encoder used for reranking",
+    )
+    RERANK_CANDIDATES: int = Field(
+        default=20, description="Chunks retrieved per vector tool call before reranking"
+    )
+    RERANK_TOP_N: int = Field(
+        default=3, description="Chunks kept per vector tool call after reranking"
+    )
+    RERANK_BATCH_SIZE: int = Field(
+        default=16, description="Query and chunk pairs per cross-encoder forward pass"
+    )
+    RERANK_MAX_LENGTH: int = Field(
+        default=512, description="Token limit of a query and chunk pair"
+    )
+    RERANK_WORKERS: int = Field(
+        default=1, description="Threads running cross-encoder inference"
+    )
+
+    @model_validator(mode="after")
+    def derive_vector_max_tokens(self):
+        if self.VECTOR_MAX_TOKENS is None:
+            chunk_count = (
+                self.RERANK_TOP_N if self.RERANK_ENABLED else self.VECTOR_TOP_K
+            )
+            self.VECTOR_MAX_TOKENS = chunk_count * CHUNK_SIZE
+        return self
+
+
+TOOL_SETTINGS = ToolConfig()
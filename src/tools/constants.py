@@ -0,0 +1,31 @@
+from enum import StrEnum
+
+# Bumped whenever a partition's files or tools change, shared across workers
+PARTITION_VERSION_KEY = "partition:{partition_id}:version"
+
+SUMMARY_PROMPT_TMPL = (
+    "Summarize the following excerpts of a document. Keep every concept, "
+    "feature, name and number a reader could ask about. RAW TEXT ONLY.\n"
+    "---------------------\n"
+    "{context_str}\n"
+    "---------------------\n"
+    "Summary: "
+)
+
+SUMMARY_ANSWER_PROMPT_TMPL = (
+    "Below is a hierarchical summary of a document, the abstract first, "
+    "followed by its section summaries.\n"
+    "---------------------\n"
+    "{context_str}\n"
+    "---------------------\n"
+    "Using only the summary, answer the query. RAW TEXT ONLY.\n"
+    "Query: {query_str}\n"
+    "Answer: "
+)
+
+
+class VectorToolMode(StrEnum):
+    # Answers with a nested query engine synthesis
+    SYNTHESIZE = "synthesize"
+    # Returns the top chunks to the agent as is
+    RETRIEVE = "retrieve"
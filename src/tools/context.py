@@ -0,0 +1,114 @@
+from contextvars import ContextVar
+from typing import Awaitable, Callable, List, Optional, Set
+
+from llama_index.core.schema import BaseNode, NodeWithScore
+from llama_index.core.tools import BaseTool
+from llama_index.core.utils import get_tokenizer
+
+from src.embedding.constants import TOKEN_COUNT_KEY
+from src.tools.config import TOOL_SETTINGS
+from src.tools.utils import format_retrieved_nodes
+
+# Retrieves the raw chunks a tool answers from, formatted for the LLM
+ContextRetriever = Callable[[str], Awaitable[str]]
+
+# Instance var set on tools able to return raw chunks instead of an answer
+CONTEXT_RETRIEVER_ATTR = "retrieve_context"
+
+
+def get_context_retriever(tool: BaseTool) -> Optional[ContextRetriever]:
+    return tool.__dict__.get(CONTEXT_RETRIEVER_ATTR)
+
+
+def get_token_count(node: BaseNode) -> int:
+    """Token count stored at ingestion, only chunks ingested before it was
+    stored are tokenized here
+    """
+    token_count = node.metadata.get(TOKEN_COUNT_KEY)
+    if token_count is None:
+        token_count = len(get_tokenizer()(node.get_content()))
+    return int(token_count)
+
+
+class ContextAssembler:
+    """Packs the chunks tool calls hand to the agent into the token budget of
+    one request, delivering each node at most once across every tool call
+    """
+
+    def __init__(self, token_budget: int) -> None:
+        self.remaining_tokens = token_budget
+        self._delivered: Set[str] = set()
+
+    def is_delivered(self, node: NodeWithScore) -> bool:
+        return node.node.node_id in self._delivered
+
+    def pack(self, nodes: List[NodeWithScore], max_tokens: int) -> List[NodeWithScore]:
+        """Keeps the undelivered nodes, in order, that fit within max_tokens and
+        the remaining budget
+        """
+        budget = min(max_tokens, self.remaining_tokens)
+        packed: List[NodeWithScore] = []
+
+        for node in nodes:
+            if self.is_delivered(node):
+                continue
+
+            token_count = get_token_count(node.node)
+            # Skipped rather than stopping, a smaller chunk may still fit
+            if token_count > budget:
+                continue
+
+            packed.append(node)
+            budget -= token_count
+            self.remaining_tokens -= token_count
+            self._delivered.add(node.node.node_id)
+
+        return packed
+
+
+_context_assembler: ContextVar[Optional[ContextAssembler]] = ContextVar(
+    "context_assembler", default=None
+)
+
+
+def get_context_assembler() -> Optional[ContextAssembler]:
+    return _context_assembler.get()
+
+
+def start_context_assembler(
+    token_budget: int = TOOL_SETTINGS.CONTEXT_TOKEN_BUDGET,
+) -> ContextAssembler:
+    """Scopes a new assembler to the current context, and the tasks it spawns"""
+    context_assembler = ContextAssembler(token_budget)
+    _context_assembler.set(context_assembler)
+    return context_assembler
+
+
+def pack_retrieved_nodes(
+    nodes: List[NodeWithScore], max_tokens: int
+) -> List[NodeWithScore]:
+    """Keeps the retrieved chunks of a tool call that fit the request's context"""
+    context_assembler = get_context_assembler() or ContextAssembler(max_tokens)
+    return context_assembler.pack(nodes, max_tokens)
+
+
+def describe_unpacked_nodes(nodes: List[NodeWithScore], file_name: str) -> str:
+    """Tells the agent why none of the retrieved chunks of a tool call were kept"""
+    context_assembler = get_context_assembler()
+    if not nodes:
+        return f"No relevant content was found in {file_name}."
+    if context_assembler is not None and all(
+        context_assembler.is_delivered(node) for node in nodes
+    ):
+        return f"The relevant content of {file_name} was already provided above."
+    return f"No more content of {file_name} fits in the context of this question."
+
+
+def assemble_retrieved_nodes(
+    nodes: List[NodeWithScore], file_name: str, max_tokens: int
+) -> str:
+    """Formats the retrieved chunks of a tool call that fit the request's context"""
+    packed = pack_retrieved_nodes(nodes, max_tokens)
+    if packed:
+        return format_retrieved_nodes(packed, file_name)
+    return describe_unpacked_nodes(nodes, file_name)
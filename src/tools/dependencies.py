@@ -1,28 +1,48 @@
 from typing import Annotated
 
 from fastapi import Depends
+from llama_index.llms.openai_like import OpenAILike
 
+from src.chat.config import CHAT_SETTINGS
 from src.embedding.dependencies import (
     EmbeddingServiceDep,
     StorageContextDep,
     ToolStorageContextDep,
 )
-from src.partitions.dependencies import PartitionFileToolRepositoryDep
+from src.manager import client_registry
+from src.partitions.dependencies import (
+    PartitionFileSummaryRepositoryDep,
+    PartitionFileToolRepositoryDep,
+)
 from src.tools.service import ToolService
 
 
+def _get_summary_llm() -> OpenAILike:
+    return client_registry.get_llm(
+        CHAT_SETTINGS.TOOL_LLM_PROVIDER,
+        CHAT_SETTINGS.TOOL_LLM_MODEL,
+        CHAT_SETTINGS.TOOL_LLM_MAX_TOKENS,
+        CHAT_SETTINGS.TOOL_LLM_FALLBACKS,
+    )
+
+
 def _get_tool_service(
     partition_file_tool_repository: PartitionFileToolRepositoryDep,
     storage_context: StorageContextDep,
     tool_storage_context: ToolStorageContextDep,
     embedding_service: EmbeddingServiceDep,
+    partition_file_summary_repository: PartitionFileSummaryRepositoryDep,
+    summary_llm: "SummaryLlmDep",
 ) -> ToolService:
     return ToolService(
         partition_file_tool_repository=partition_file_tool_repository,
         storage_context=storage_context,
         tool_storage_context=tool_storage_context,
         embedding_service=embedding_service,
+        partition_file_summary_repository=partition_file_summary_repository,
+        summary_llm=summary_llm,
     )
 
 
+SummaryLlmDep = Annotated[OpenAILike, Depends(_get_summary_llm)]
 ToolServiceDep = Annotated[ToolService, Depends(_get_tool_service)]
@@ -0,0 +1,96 @@
+import asyncio
+from typing import Dict, List, Optional, Set
+
+from llama_index.core.schema import BaseNode
+from llama_index.vector_stores.qdrant import QdrantVectorStore
+from qdrant_client import AsyncQdrantClient
+from qdrant_client.http import models as rest
+
+from src.tools.config import TOOL_SETTINGS
+
+
+class FileNodeLoader:
+    """Loads the nodes of partition files on demand.
+
+    Loads requested within the same event loop iteration are batched into one
+    paginated Qdrant scroll filtered on partition_file_id.
+    """
+
+    def __init__(
+        self,
+        vector_store: QdrantVectorStore,
+        qdrant_client: AsyncQdrantClient,
+        batch_size: int = TOOL_SETTINGS.NODE_SCROLL_BATCH_SIZE,
+    ) -> None:
+        self.vector_store = vector_store
+        self.qdrant_client = qdrant_client
+        self.batch_size = batch_size
+        self._pending: Dict[str, asyncio.Future[List[BaseNode]]] = {}
+        self._flush_tasks: Set[asyncio.Task[None]] = set()
+
+    async def load(self, partition_file_id: str) -> List[BaseNode]:
+        future = self._pending.get(partition_file_id)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            if not self._pending:
+                loop.call_soon(self._schedule_flush)
+            future = loop.create_future()
+            self._pending[partition_file_id] = future
+
+        # Shielded so one cancelled caller doesn't fail the rest of the batch
+        return await asyncio.shield(future)
+
+    def _schedule_flush(self) -> None:
+        pending = self._pending
+        self._pending = {}
+
+        task = asyncio.create_task(self._flush(pending))
+        self._flush_tasks.add(task)
+        task.add_done_callback(self._flush_tasks.discard)
+
+    async def _flush(self, pending: Dict[str, asyncio.Future[List[BaseNode]]]) -> None:
+        try:
+            nodes = await self.scroll_nodes(list(pending))
+        except Exception as e:
+            for future in pending.values():
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for partition_file_id, future in pending.items():
+            if not future.done():
+                future.set_result(nodes.get(partition_file_id, []))
+
+    async def scroll_nodes(
+        self, partition_file_ids: List[str]
+    ) -> Dict[str, List[BaseNode]]:
+        """Scrolls every node of the given partition files, without vectors"""
+        nodes: Dict[str, List[BaseNode]] = {
+            partition_file_id: [] for partition_file_id in partition_file_ids
+        }
+        scroll_filter = rest.Filter(
+            must=[
+                rest.FieldCondition(
+                    key="partition_file_id",
+                    match=rest.MatchAny(any=partition_file_ids),
+                )
+            ]
+        )
+
+        offset: Optional[rest.ExtendedPointId] = None
+        while True:
+            points, offset = await self.qdrant_client.scroll(
+                collection_name=self.vector_store.collection_name,
+                scroll_filter=scroll_filter,
+                limit=self.batch_size,
+                offset=offset,
+                with_payload=True,
+                with_vectors=False,
+            )
+            for node in self.vector_store.parse_to_query_result(points).nodes:
+                nodes.setdefault(node.metadata["partition_file_id"], []).append(node)
+
+            if offset is None:
+                break
+
+        return nodes
@@ -0,0 +1,94 @@
+import asyncio
+import logging
+from contextvars import ContextVar
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+from llama_index.core.schema import NodeWithScore
+from llama_index.core.tools import BaseTool
+
+logger = logging.getLogger(__name__)
+
+Retrieve = Callable[[str], Awaitable[List[NodeWithScore]]]
+Prefetch = Callable[[str], None]
+
+# Instance var set on tools able to prefetch their retrieval
+PREFETCH_ATTR = "prefetch"
+
+
+def _normalize_query(query: str) -> str:
+    return " ".join(query.lower().split())
+
+
+def _discard_exception(task: "asyncio.Task[List[NodeWithScore]]") -> None:
+    if not task.cancelled() and task.exception() is not None:
+        logger.warning("Retrieval prefetch failed", exc_info=task.exception())
+
+
+class RetrievalPrefetch:
+    """Vector retrievals started ahead of the tool calls of one request, keyed
+    by (tool_id, normalized query)
+    """
+
+    def __init__(self) -> None:
+        self._tasks: Dict[Tuple[str, str], asyncio.Task[List[NodeWithScore]]] = {}
+
+    def start(self, tool_id: str, query: str, retrieve: Retrieve) -> None:
+        key = (tool_id, _normalize_query(query))
+        if key in self._tasks:
+            return
+
+        task = asyncio.ensure_future(retrieve(query))
+        task.add_done_callback(_discard_exception)
+        self._tasks[key] = task
+
+    async def aretrieve(
+        self, tool_id: str, query: str, retrieve: Retrieve
+    ) -> List[NodeWithScore]:
+        task = self._tasks.get((tool_id, _normalize_query(query)))
+        if task is not None:
+            try:
+                return await asyncio.shield(task)
+            except Exception:
+                # Already logged, retried below as a regular retrieval
+                pass
+        return await retrieve(query)
+
+    def cancel(self) -> None:
+        """Stops the prefetches no tool call ended up using"""
+        for task in self._tasks.values():
+            task.cancel()
+        self._tasks.clear()
+
+
+_retrieval_prefetch: ContextVar[Optional[RetrievalPrefetch]] = ContextVar(
+    "retrieval_prefetch", default=None
+)
+
+
+def get_retrieval_prefetch() -> Optional[RetrievalPrefetch]:
+    return _retrieval_prefetch.get()
+
+
+def start_retrieval_prefetch() -> RetrievalPrefetch:
+    """Scopes a new prefetch to the current context, and the tasks it spawns"""
+    prefetch = RetrievalPrefetch()
+    _retrieval_prefetch.set(prefetch)
+    return prefetch
+
+
+async def aretrieve_prefetched(
+    tool_id: str, query: str, retrieve: Retrieve
+) -> List[NodeWithScore]:
+    prefetch = get_retrieval_prefetch()
+    if prefetch is None:
+        return await retrieve(query)
+    return await prefetch.aretrieve(tool_id, query, retrieve)
+
+
+def prefetch_tools(tools: Sequence[BaseTool], query: str, max_tools: int) -> None:
+    """Starts the retrieval of query on the first max_tools tools supporting it"""
+    prefetches: List[Prefetch] = [
+        tool.__dict__[PREFETCH_ATTR] for tool in tools if PREFETCH_ATTR in tool.__dict__
+    ]
+    for prefetch in prefetches[:max_tools]:
+        prefetch(query)
@@ -0,0 +1,139 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, List, Optional, Set, Tuple
+
+from llama_index.core.schema import NodeWithScore
+
+from src.tools.config import TOOL_SETTINGS
+
+# (query, chunk texts, future of their scores)
+RerankRequest = Tuple[str, List[str], "asyncio.Future[List[float]]"]
+
+
+class CrossEncoderReranker:
+    """Reranks retrieved chunks with a local cross-encoder on CPU.
+
+    The model is loaded on first use. Requests made within the same event loop
+    iteration are scored together in batches of batch_size on a dedicated
+    thread pool, so inference never blocks the event loop.
+    """
+
+    def __init__(
+        self,
+        model_name: str = TOOL_SETTINGS.RERANK_MODEL,
+        batch_size: int = TOOL_SETTINGS.RERANK_BATCH_SIZE,
+        max_length: int = TOOL_SETTINGS.RERANK_MAX_LENGTH,
+        max_workers: int = TOOL_SETTINGS.RERANK_WORKERS,
+    ) -> None:
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.max_length = max_length
+        self.max_workers = max_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._tokenizer: Any = None
+        self._model: Any = None
+        self._load_lock = threading.Lock()
+        self._pending: List[RerankRequest] = []
+        self._flush_tasks: Set[asyncio.Task[None]] = set()
+
+    async def arerank(
+        self, query: str, nodes: List[NodeWithScore], top_n: int
+    ) -> List[NodeWithScore]:
+        if not nodes:
+            return nodes
+
+        loop = asyncio.get_running_loop()
+        if not self._pending:
+            loop.call_soon(self._schedule_flush)
+        future: asyncio.Future[List[float]] = loop.create_future()
+        self._pending.append(
+            (query, [node.node.get_content() for node in nodes], future)
+        )
+
+        # Shielded so one cancelled caller doesn't fail the rest of the batch
+        scores = await asyncio.shield(future)
+        reranked = [
+            NodeWithScore(node=node.node, score=score)
+            for node, score in zip(nodes, scores)
+        ]
+        reranked.sort(key=lambda node: node.score or 0.0, reverse=True)
+        return reranked[:top_n]
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _schedule_flush(self) -> None:
+        pending = self._pending
+        self._pending = []
+
+        task = asyncio.create_task(self._flush(pending))
+        self._flush_tasks.add(task)
+        task.add_done_callback(self._flush_tasks.discard)
+
+    async def _flush(self, pending: List[RerankRequest]) -> None:
+        pairs = [(query, text) for query, texts, _ in pending for text in texts]
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="reranker"
+            )
+
+        try:
+            scores = await asyncio.get_running_loop().run_in_executor(
+                self._executor, self._score, pairs
+            )
+        except Exception as e:
+            for _, _, future in pending:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        offset = 0
+        for _, texts, future in pending:
+            if not future.done():
+                future.set_result(scores[offset : offset + len(texts)])
+            offset += len(texts)
+
+    def _load(self) -> Tuple[Any, Any]:
+        with self._load_lock:
+            if self._model is None:
+                # Imported here so torch only loads once reranking is used
+                from transformers import (
+                    AutoModelForSequenceClassification,
+                    AutoTokenizer,
+                )
+
+                self._tokenizer = AutoTokenizer.from_pretrained(self.model_name)
+                model = AutoModelForSequenceClassification.from_pretrained(
+                    self.model_name
+                )
+                model.eval()
+                self._model = model
+        return self._tokenizer, self._model
+
+    def _score(self, pairs: List[Tuple[str, str]]) -> List[float]:
+        """Scores (query, text) pairs, runs on the executor"""
+        import torch
+
+        tokenizer, model = self._load()
+        scores: List[float] = []
+        for start in range(0, len(pairs), self.batch_size):
+            batch = pairs[start : start + self.batch_size]
+            features = tokenizer(
+                [query for query, _ in batch],
+                [text for _, text in batch],
+                padding=True,
+                truncation=True,
+                max_length=self.max_length,
+                return_tensors="pt",
+            )
+            with torch.inference_mode():
+                logits = model(**features).logits
+            # Single logit models score relevance directly, else the last label
+            scores.extend(logits[:, -1].float().tolist())
+        return scores
+
+
+reranker = CrossEncoderReranker()
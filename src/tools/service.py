@@ -1,21 +1,39 @@
-from typing import Any, List, Optional
+import uuid
+from typing import Any, Dict, List, Optional, Sequence, cast
 
 from llama_index.core import StorageContext, VectorStoreIndex
-from llama_index.core.objects import ObjectIndex, ObjectRetriever
+from llama_index.core.base.base_retriever import BaseRetriever
+from llama_index.core.objects import ObjectIndex
 from llama_index.core.schema import BaseNode
 from llama_index.core.tools import BaseTool
 from llama_index.llms.openai_like import OpenAILike
+from llama_index.vector_stores.qdrant import QdrantVectorStore
 
+from src.database import postgres_manager, qdrant_manager
 from src.embedding.config import EMBEDDING_SETTINGS
 from src.embedding.service import EmbeddingService
 from src.embedding.utils import create_partition_filter, create_tool_group_filter
-from src.partitions.models.partition import Partition
+from src.exceptions import EntityNotFoundError
+from src.llamaindex_patch.node_mapping.id_tool_mapping import IdToolMapping, ToolLoader
+from src.llamaindex_patch.retrievers.in_memory_retriever import InMemoryRetriever
+from src.llamaindex_patch.retrievers.lazy_object_retriever import LazyObjectRetriever
+from src.partitions.constants import PartitionFileToolType
 from src.partitions.models.partition_file import PartitionFile
+from src.partitions.models.partition_file_summary import PartitionFileSummary
 from src.partitions.models.partition_file_tool import PartitionFileTool
-from src.partitions.models.repository import PartitionFileToolCreate
-from src.partitions.repository import PartitionFileToolSqlRepository
-from src.tools.tool_handler import FileToolTypeHandler
-from src.tools.utils import get_partition_file_llamaindex_filter
+from src.partitions.models.repository import (
+    PartitionFileSummaryCreate,
+    PartitionFileToolCreate,
+)
+from src.partitions.repository import (
+    PartitionFileSummarySqlRepository,
+    PartitionFileToolSqlRepository,
+)
+from src.tools.config import TOOL_SETTINGS
+from src.tools.node_loader import FileNodeLoader
+from src.tools.summary import build_summary_tree
+from src.tools.tool_handler import FileToolTypeHandler, LLMResolver
+from src.tools.tool_index import scroll_tool_nodes
 
 
 class ToolService:
@@ -25,11 +43,15 @@ class ToolService:
         storage_context: StorageContext,
         tool_storage_context: StorageContext,
         embedding_service: EmbeddingService,
+        partition_file_summary_repository: PartitionFileSummarySqlRepository,
+        summary_llm: OpenAILike,
     ):
         self.partition_file_tool_repository = partition_file_tool_repository
         self.storage_context = storage_context
         self.tool_storage_context = tool_storage_context
         self.embedding_service = embedding_service
+        self.partition_file_summary_repository = partition_file_summary_repository
+        self.summary_llm = summary_llm
 
     async def create_default_tools(
         self,
@@ -38,6 +60,9 @@ class ToolService:
     ) -> List[PartitionFileTool]:
         tools: List[PartitionFileTool] = []
 
+        if PartitionFileToolType.SUMMARY in EMBEDDING_SETTINGS.DEFAULT_FILE_TOOLS:
+            await self.create_file_summaries(partition_file, nodes)
+
         for tool_type in EMBEDDING_SETTINGS.DEFAULT_FILE_TOOLS:
             partition_file_tool: PartitionFileTool = (
                 await self.partition_file_tool_repository.create(
@@ -61,62 +86,140 @@ class ToolService:
 
         return tools
 
-    async def get_file_tools(
+    async def create_file_summaries(
+        self,
+        partition_file: PartitionFile,
+        nodes: List[BaseNode],
+    ) -> List[PartitionFileSummary]:
+        """Builds and stores the summary tree answered from by summary tools"""
+        levels = await build_summary_tree(nodes, self.summary_llm)
+
+        summaries: List[PartitionFileSummary] = []
+        for level, texts in enumerate(levels, start=1):
+            for position, text in enumerate(texts):
+                summaries.append(
+                    await self.partition_file_summary_repository.create(
+                        PartitionFileSummaryCreate(
+                            partition_file_id=partition_file.id,
+                            level=level,
+                            position=position,
+                            text=text,
+                        )
+                    )
+                )
+
+        await self.partition_file_summary_repository.session.flush()
+        return summaries
+
+    async def get_partition_file_tools(
         self,
-        partition_files: List[PartitionFile],
-        llm: OpenAILike,
-    ) -> List[BaseTool]:
-        tools: List[BaseTool] = []
+        partition_id: uuid.UUID,
+        tool_group: str,
+    ) -> Sequence[PartitionFileTool]:
+        # Read on a session of its own, chats release the request session
+        # before loading their tools
+        async with postgres_manager.session() as session:
+            return await PartitionFileToolSqlRepository(session).get_partition_tools(
+                partition_id, tool_group
+            )
+
+    def get_tool_loader(
+        self,
+        partition_file_tools: Sequence[PartitionFileTool],
+        get_llm: LLMResolver,
+    ) -> ToolLoader:
+        """Creates a loader that builds the tool of a PartitionFileTool id on demand"""
+        partition_file_tools_by_id: Dict[str, PartitionFileTool] = {
+            str(partition_file_tool.id): partition_file_tool
+            for partition_file_tool in partition_file_tools
+        }
         vector_index = VectorStoreIndex.from_vector_store(  # pyright: ignore[reportUnknownMemberType]
             vector_store=self.storage_context.vector_store,
             embed_model=self.embedding_service.embed_model,  # TODO: Fix this bandaid
         )
-        for partition_file in partition_files:
-            nodes: Optional[List[BaseNode]] = None
-            for partition_file_tool in partition_file.partition_file_tools:
-                handler = FileToolTypeHandler.get_handler(partition_file_tool.tool_type)
-                if handler.requiresFileNode and nodes == None:
-                    # TODO Switch to native qdrant
-                    metadata_filter = get_partition_file_llamaindex_filter(
-                        str(partition_file_tool.partition_file_id)
-                    )
-                    nodes = await self.storage_context.vector_store.aget_nodes(
-                        node_ids=None, filters=metadata_filter
-                    )
+        storage_context = self.storage_context
+        node_loader = FileNodeLoader(
+            vector_store=cast(QdrantVectorStore, storage_context.vector_store),
+            qdrant_client=qdrant_manager.get_client(),
+        )
 
-                tools.append(
-                    await handler.create_tool(
-                        partition_file_tool=partition_file_tool,
-                        llm=llm,
-                        storage_context=self.storage_context,
-                        vector_store_index=vector_index,
-                        nodes=nodes,
-                    )
-                )
+        async def load_summaries(
+            partition_file_id: uuid.UUID,
+        ) -> Sequence[PartitionFileSummary]:
+            # Tools outlive the request session, so summaries use their own
+            async with postgres_manager.session() as session:
+                return await PartitionFileSummarySqlRepository(
+                    session
+                ).get_file_summaries(partition_file_id)
 
-        return tools
+        async def load_tool(tool_id: str) -> BaseTool:
+            partition_file_tool = partition_file_tools_by_id.get(tool_id)
+            if partition_file_tool is None:
+                raise EntityNotFoundError(PartitionFileTool, tool_id)
+
+            handler = FileToolTypeHandler.get_handler(partition_file_tool.tool_type)
+            return await handler.create_tool(
+                partition_file_tool=partition_file_tool,
+                get_llm=get_llm,
+                storage_context=storage_context,
+                vector_store_index=vector_index,
+                node_loader=node_loader,
+                summary_loader=load_summaries,
+            )
+
+        return load_tool
 
     async def get_object_retriever(
         self,
         tool_group: str,
-        partition: Partition,
-        tools: List[BaseTool],
+        partition_id: uuid.UUID,
+        tools: Optional[List[BaseTool]] = None,
+        tool_loader: Optional[ToolLoader] = None,
+        tool_ids: Optional[Sequence[str]] = None,
         **kwargs: Any,
-    ):
+    ) -> LazyObjectRetriever:
+        """Retrieves tools in process when the ids of the group's tools are
+        given and fit in memory, else through a Qdrant search
+        """
         object_index: ObjectIndex[VectorStoreIndex] = (
             await self.embedding_service.get_object_index(
-                tools, self.tool_storage_context, **kwargs
+                tools or [], self.tool_storage_context, tool_loader, **kwargs
             )
         )
-        object_retriever: ObjectRetriever[Any] = object_index.as_retriever(  # type: ignore[misc]
-            similarity_top_k=5,
-            vector_store_kwargs={
-                "filter": {
-                    "must": [
-                        create_partition_filter(str(partition.id)),
-                        create_tool_group_filter(tool_group),
-                    ]
-                }
-            },
+        retriever: BaseRetriever
+        if (
+            TOOL_SETTINGS.MEMORY_INDEX_ENABLED
+            and tool_ids is not None
+            and len(tool_ids) <= TOOL_SETTINGS.MEMORY_INDEX_MAX_TOOLS
+        ):
+            nodes, embeddings = await scroll_tool_nodes(
+                vector_store=cast(
+                    QdrantVectorStore, self.tool_storage_context.vector_store
+                ),
+                qdrant_client=qdrant_manager.get_client(),
+                partition_id=str(partition_id),
+                tool_ids=tool_ids,
+            )
+            retriever = InMemoryRetriever(
+                nodes=nodes,
+                embeddings=embeddings,
+                embed_model=self.embedding_service.embed_model,
+                similarity_top_k=TOOL_SETTINGS.TOOL_TOP_K,
+            )
+        else:
+            retriever = object_index.as_node_retriever(
+                similarity_top_k=TOOL_SETTINGS.TOOL_TOP_K,
+                vector_store_kwargs={
+                    "filter": {
+                        "must": [
+                            create_partition_filter(str(partition_id)),
+                            create_tool_group_filter(tool_group),
+                        ]
+                    }
+                },
+            )
+
+        return LazyObjectRetriever(
+            retriever=retriever,
+            object_node_mapping=cast(IdToolMapping, object_index.object_node_mapping),
         )
-        return object_retriever
@@ -0,0 +1,56 @@
+import asyncio
+from typing import List, Sequence
+
+from llama_index.core.llms import LLM
+from llama_index.core.prompts import PromptTemplate
+from llama_index.core.schema import BaseNode, MetadataMode
+
+from src.partitions.models.partition_file_summary import PartitionFileSummary
+from src.tools.config import TOOL_SETTINGS
+from src.tools.constants import SUMMARY_PROMPT_TMPL
+
+
+async def build_summary_tree(
+    nodes: Sequence[BaseNode],
+    llm: LLM,
+    group_size: int = TOOL_SETTINGS.SUMMARY_GROUP_SIZE,
+    concurrency: int = TOOL_SETTINGS.SUMMARY_CONCURRENCY,
+) -> List[List[str]]:
+    """Summarizes groups of chunks, then groups of those summaries, until a
+    single file abstract remains.
+
+    Returns:
+        List[List[str]]: Summaries per level, the last level is the abstract
+    """
+    summary_prompt = PromptTemplate(SUMMARY_PROMPT_TMPL)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def summarize(texts: Sequence[str]) -> str:
+        async with semaphore:
+            return await llm.apredict(summary_prompt, context_str="\n\n".join(texts))
+
+    texts = [node.get_content(metadata_mode=MetadataMode.NONE) for node in nodes]
+    levels: List[List[str]] = []
+    while texts:
+        groups = [texts[i : i + group_size] for i in range(0, len(texts), group_size)]
+        texts = list(await asyncio.gather(*(summarize(group) for group in groups)))
+        levels.append(texts)
+        if len(texts) == 1:
+            break
+
+    return levels
+
+
+def build_summary_context(summaries: Sequence[PartitionFileSummary]) -> str:
+    """Builds the abstract and the summaries directly below it into a context"""
+    top_level = max(summary.level for summary in summaries)
+    abstract = [summary for summary in summaries if summary.level == top_level]
+    sections = sorted(
+        (summary for summary in summaries if summary.level == top_level - 1),
+        key=lambda summary: summary.position,
+    )
+
+    context = f"Abstract:\n{abstract[0].text}"
+    if sections:
+        context += "\n\nSections:\n" + "\n\n".join(section.text for section in sections)
+    return context
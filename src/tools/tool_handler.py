@@ -1,26 +1,69 @@
+import uuid
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List, Optional, Type, TypedDict, Unpack
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Type,
+    TypedDict,
+    Unpack,
+    cast,
+)
 
 from llama_index.core import StorageContext, SummaryIndex, VectorStoreIndex
 from llama_index.core.indices.base import BaseIndex
+from llama_index.core.prompts import PromptTemplate
 from llama_index.core.query_engine import BaseQueryEngine
-from llama_index.core.schema import BaseNode
-from llama_index.core.tools import BaseTool, FunctionTool, QueryEngineTool
-from llama_index.llms.openai_like import (
+from llama_index.core.response_synthesizers import get_response_synthesizer
+from llama_index.core.schema import BaseNode, NodeWithScore
+from llama_index.core.tools import BaseTool, FunctionTool
+from llama_index.llms.openai_like import (  # pyright: ignore[reportMissingTypeStubs]
     OpenAILike,
-)  # pyright: ignore[reportMissingTypeStubs]
+)
 from pydantic import BaseModel
 
+from src.chat.constant import ExecutionMode, LLMStep
+from src.chat.degradation import get_execution_mode
+from src.chat.usage import llm_step
 from src.embedding.utils import create_file_filter, create_partition_filter
 from src.partitions.constants import PartitionFileToolType
+from src.partitions.models.partition_file_summary import PartitionFileSummary
 from src.partitions.models.partition_file_tool import PartitionFileTool
+from src.tools.config import TOOL_SETTINGS
+from src.tools.constants import SUMMARY_ANSWER_PROMPT_TMPL, VectorToolMode
+from src.tools.context import (
+    CONTEXT_RETRIEVER_ATTR,
+    assemble_retrieved_nodes,
+    describe_unpacked_nodes,
+    pack_retrieved_nodes,
+)
+from src.tools.node_loader import FileNodeLoader
+from src.tools.prefetch import (
+    PREFETCH_ATTR,
+    aretrieve_prefetched,
+    get_retrieval_prefetch,
+)
+from src.tools.reranker import reranker
+from src.tools.summary import build_summary_context
 from src.utils import set_instance_var
 
+# Loads the stored summary tree of a partition file
+SummaryLoader = Callable[[uuid.UUID], Awaitable[Sequence[PartitionFileSummary]]]
+
+# Resolves the LLM of a tool call when it is made, cached tools outlive the
+# execution mode of the request that built them
+LLMResolver = Callable[[], OpenAILike]
+
 
 class CreateToolArgs(TypedDict):
     vector_store_index: VectorStoreIndex
     storage_context: StorageContext
-    nodes: Optional[List[BaseNode]]
+    node_loader: FileNodeLoader
+    summary_loader: SummaryLoader
 
 
 class FileToolHelper(ABC):
@@ -55,7 +98,7 @@ class FileToolHelper(ABC):
     async def create_tool(
         cls,
         partition_file_tool: PartitionFileTool,
-        llm: OpenAILike,
+        get_llm: LLMResolver,
         **kwargs: Unpack[CreateToolArgs],
     ) -> BaseTool:
         raise NotImplementedError()
@@ -94,28 +137,62 @@ class SummaryToolHandler(FileToolHelper):
     async def create_tool(
         cls,
         partition_file_tool: PartitionFileTool,
-        llm: OpenAILike,
+        get_llm: LLMResolver,
         **kwargs: Unpack[CreateToolArgs],
     ) -> BaseTool:
-        nodes: Optional[List[BaseNode]] = kwargs["nodes"]
-        if nodes is None:
-            # TODO Make exceptions for qdrant
-            raise Exception("Could not find desired file nodes")
-
-        summary_index: BaseIndex[Any] = SummaryIndex(
-            nodes=nodes
-        )  # pyright: ignore[reportUnknownVariableType]
-        summary_query_engine: BaseQueryEngine = (
-            summary_index.as_query_engine(  # pyright: ignore[reportUnknownMemberType]
-                response_mode="tree_summarize",
-                use_async=True,
-                llm=llm,
-            )
-        )
+        node_loader: FileNodeLoader = kwargs["node_loader"]
+        summary_loader: SummaryLoader = kwargs["summary_loader"]
+        partition_file_id = partition_file_tool.partition_file_id
+        summary_context: Optional[str] = None
+        summary_index: Optional[BaseIndex[Any]] = None
+
+        async def summary_query(
+            query: str,
+        ):
+            """Use to answer broad questions over a given paper.
 
-        summary_tool = QueryEngineTool.from_defaults(
+            Args:
+                query (str): the question to summarize the paper for.
+
+            """
+            nonlocal summary_context, summary_index
+            if summary_context is None and summary_index is None:
+                summaries = await summary_loader(partition_file_id)
+                if summaries:
+                    summary_context = build_summary_context(summaries)
+                else:
+                    # Files ingested before summary trees, summarize the chunks
+                    nodes: List[BaseNode] = await node_loader.load(
+                        str(partition_file_id)
+                    )
+                    if not nodes:
+                        # TODO Make exceptions for qdrant
+                        raise Exception("Could not find desired file nodes")
+
+                    summary_index = SummaryIndex(
+                        nodes=nodes
+                    )  # pyright: ignore[reportUnknownVariableType]
+
+            llm = get_llm()
+            with llm_step(LLMStep.SYNTHESIS):
+                if summary_context is not None:
+                    return await llm.apredict(
+                        PromptTemplate(SUMMARY_ANSWER_PROMPT_TMPL),
+                        context_str=summary_context,
+                        query_str=query,
+                    )
+
+                summary_query_engine: BaseQueryEngine = summary_index.as_query_engine(  # type: ignore[union-attr]
+                    response_mode="tree_summarize",
+                    use_async=True,
+                    llm=llm,
+                )
+                response = await summary_query_engine.aquery(query)
+            return response
+
+        summary_tool = FunctionTool.from_defaults(
             name=cls.create_tool_name(partition_file_tool.partition_file.file.name),
-            query_engine=summary_query_engine,
+            fn=summary_query,
             description=cls.create_tool_description(
                 partition_file_tool.partition_file.file.name
             ),
@@ -152,11 +229,67 @@ class VectorToolHandler(FileToolHelper):
     async def create_tool(
         cls,
         partition_file_tool: PartitionFileTool,
-        llm: OpenAILike,
+        get_llm: LLMResolver,
         **kwargs: Unpack[CreateToolArgs],
     ) -> BaseTool:
 
         vector_index: VectorStoreIndex = kwargs["vector_store_index"]
+        file_name = partition_file_tool.partition_file.file.name
+
+        # Resolved up front, cached tools outlive the session that loaded them
+        qdrant_filter = {
+            "must": [
+                create_file_filter(str(partition_file_tool.partition_file.file_id)),
+                create_partition_filter(
+                    str(partition_file_tool.partition_file.partition_id)
+                ),
+            ]
+        }
+
+        tool_id = str(partition_file_tool.id)
+
+        # Reranking retrieves wider, then narrows down to fewer, better chunks
+        similarity_top_k = (
+            TOOL_SETTINGS.RERANK_CANDIDATES
+            if TOOL_SETTINGS.RERANK_ENABLED
+            else TOOL_SETTINGS.VECTOR_TOP_K
+        )
+
+        async def retrieve(query: str) -> List[NodeWithScore]:
+            retriever = (
+                vector_index.as_retriever(  # pyright: ignore[reportUnknownMemberType]
+                    similarity_top_k=(
+                        TOOL_SETTINGS.DEGRADED_VECTOR_TOP_K
+                        if get_execution_mode() == ExecutionMode.DEGRADED
+                        else similarity_top_k
+                    ),
+                    vector_store_kwargs={"filter": qdrant_filter},
+                )
+            )
+            return await retriever.aretrieve(query)
+
+        def prefetch(query: str) -> None:
+            retrieval_prefetch = get_retrieval_prefetch()
+            if retrieval_prefetch is not None:
+                retrieval_prefetch.start(tool_id, query, retrieve)
+
+        async def retrieve_ranked(query: str) -> List[NodeWithScore]:
+            # Served from the request's prefetch when the query was guessed right
+            nodes = await aretrieve_prefetched(tool_id, query, retrieve)
+            # Degraded runs already retrieve few chunks, reranking is skipped
+            if (
+                TOOL_SETTINGS.RERANK_ENABLED
+                and get_execution_mode() != ExecutionMode.DEGRADED
+            ):
+                nodes = await reranker.arerank(query, nodes, TOOL_SETTINGS.RERANK_TOP_N)
+            return nodes
+
+        async def retrieve_context(query: str) -> str:
+            return assemble_retrieved_nodes(
+                await retrieve_ranked(query),
+                file_name,
+                cast(int, TOOL_SETTINGS.VECTOR_MAX_TOKENS),
+            )
 
         async def vector_query(
             query: str,
@@ -169,33 +302,35 @@ class VectorToolHandler(FileToolHelper):
                 query (str): the string query to be embedded.
 
             """
-            qdrant_filter = {
-                "must": [
-                    create_file_filter(str(partition_file_tool.partition_file.file_id)),
-                    create_partition_filter(
-                        str(partition_file_tool.partition_file.partition_id)
-                    ),
-                ]
-            }
-
-            query_engine = vector_index.as_query_engine(  # pyright: ignore[reportUnknownMemberType]
-                similarity_top_k=5,  # TODO Add to config
-                vector_store_kwargs={"filter": qdrant_filter},
-                use_async=True,
-                llm=llm,
+            if TOOL_SETTINGS.VECTOR_TOOL_MODE == VectorToolMode.RETRIEVE:
+                # Chunks go straight to the agent, skipping the nested synthesis
+                return await retrieve_context(query)
+
+            # Synthesized from the same packed chunks, so answers built across
+            # the request's tool calls never repeat or outgrow its context
+            retrieved = await retrieve_ranked(query)
+            nodes = pack_retrieved_nodes(
+                retrieved, cast(int, TOOL_SETTINGS.VECTOR_MAX_TOKENS)
+            )
+            if not nodes:
+                return describe_unpacked_nodes(retrieved, file_name)
+
+            response_synthesizer = get_response_synthesizer(
+                llm=get_llm(), use_async=True
             )
-            response = await query_engine.aquery(query)
+            with llm_step(LLMStep.SYNTHESIS):
+                response = await response_synthesizer.asynthesize(query, nodes)
             return response
 
         vector_query_tool = FunctionTool.from_defaults(
-            name=cls.create_tool_name(partition_file_tool.partition_file.file.name),
+            name=cls.create_tool_name(file_name),
             fn=vector_query,
-            description=cls.create_tool_description(
-                partition_file_tool.partition_file.file.name
-            ),
+            description=cls.create_tool_description(file_name),
         )
 
-        set_instance_var(vector_query_tool, "id", str(partition_file_tool.id))
+        set_instance_var(vector_query_tool, "id", tool_id)
+        set_instance_var(vector_query_tool, PREFETCH_ATTR, prefetch)
+        set_instance_var(vector_query_tool, CONTEXT_RETRIEVER_ATTR, retrieve_context)
 
         return vector_query_tool
 
@@ -219,3 +354,11 @@ class FileToolTypeHandler:
             type[FileToolHelper]: _description_
         """
         return cls.handlers[partition_tool_type]
+
+    @classmethod
+    def get_tool_type(cls, tool_name: str) -> Optional[PartitionFileToolType]:
+        """Recovers the tool type from a tool name made by create_tool_name"""
+        for tool_type, handler in cls.handlers.items():
+            if tool_name.startswith(handler.create_tool_name("")):
+                return tool_type
+        return None
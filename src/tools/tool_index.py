@@ -0,0 +1,60 @@
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+from llama_index.core.schema import BaseNode
+from llama_index.vector_stores.qdrant import QdrantVectorStore
+from qdrant_client import AsyncQdrantClient
+from qdrant_client.http import models as rest
+
+from src.embedding.utils import create_partition_filter
+from src.llamaindex_patch.retrievers.in_memory_retriever import normalize_rows
+from src.tools.config import TOOL_SETTINGS
+
+
+async def scroll_tool_nodes(
+    vector_store: QdrantVectorStore,
+    qdrant_client: AsyncQdrantClient,
+    partition_id: str,
+    tool_ids: Sequence[str],
+    batch_size: int = TOOL_SETTINGS.NODE_SCROLL_BATCH_SIZE,
+) -> Tuple[List[BaseNode], np.ndarray]:
+    """Scrolls the tool nodes of the given PartitionFileTool ids, returning
+    them with their normalized dense embeddings, one row per node
+    """
+    nodes: List[BaseNode] = []
+    embeddings: List[List[float]] = []
+    if not tool_ids:
+        return nodes, np.empty((0, 0), dtype=np.float32)
+
+    # Tool nodes are stored under their PartitionFileTool id
+    scroll_filter = rest.Filter(
+        must=[
+            rest.FieldCondition.model_validate(create_partition_filter(partition_id)),
+            rest.HasIdCondition(has_id=list(tool_ids)),
+        ]
+    )
+
+    offset: Optional[rest.ExtendedPointId] = None
+    while True:
+        points, offset = await qdrant_client.scroll(
+            collection_name=vector_store.collection_name,
+            scroll_filter=scroll_filter,
+            limit=batch_size,
+            offset=offset,
+            with_payload=True,
+            with_vectors=[vector_store.dense_vector_name],
+        )
+        for node in vector_store.parse_to_query_result(points).nodes:
+            if node.embedding is None:
+                continue
+            embeddings.append(node.embedding)
+            # Held once, in the matrix
+            node.embedding = None
+            nodes.append(node)
+
+        if offset is None:
+            break
+
+    if not embeddings:
+        return nodes, np.empty((0, 0), dtype=np.float32)
+    return nodes, normalize_rows(embeddings)
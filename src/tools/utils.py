@@ -1,3 +1,6 @@
+from typing import List
+
+from llama_index.core.schema import NodeWithScore
 from llama_index.core.vector_stores import (
     FilterOperator,
     MetadataFilter,
@@ -16,3 +19,12 @@ def get_partition_file_llamaindex_filter(partition_file_id: str):
             )
         ]
     )
+
+
+def format_retrieved_nodes(nodes: List[NodeWithScore], file_name: str) -> str:
+    """Formats retrieved chunks for the agent"""
+    return "\n\n".join(
+        f"[{rank}] {file_name} (score: {node.score or 0.0:.3f})\n"
+        f"{node.node.get_content()}"
+        for rank, node in enumerate(nodes, start=1)
+    )
@@ -0,0 +1,163 @@
+import asyncio
+
+import pytest
+from fakeredis import FakeAsyncRedis
+
+from src.chat.admission import AdmissionController
+from src.deadline import set_deadline
+from src.exceptions import TooManyRequestsError
+
+
+def make_controller(**kwargs: float) -> AdmissionController:
+    settings = {
+        "enabled": True,
+        "global_limit": 2,
+        "partition_limit": 2,
+        "queue_size": 4,
+        "queue_timeout_seconds": 5.0,
+        "poll_interval_seconds": 0.01,
+        "lease_ttl_seconds": 60,
+        "retry_after_seconds": 1,
+        "grace_seconds": 0.0,
+        **kwargs,
+    }
+    return AdmissionController(**settings)  # type: ignore[arg-type]
+
+
+async def leases(redis: FakeAsyncRedis, partition_id: str) -> int:
+    return await redis.zcard(f"partition:{partition_id}:admission:leases")
+
+
+def test_admits_up_to_the_limit_then_queues(redis: FakeAsyncRedis) -> None:
+    async def main() -> None:
+        controller = make_controller()
+        first = await controller.acquire("p")
+        second = await controller.acquire("p")
+        waiting = asyncio.create_task(controller.acquire("p"))
+        await asyncio.sleep(0.05)
+
+        assert not waiting.done()
+        assert await controller.get_queue_depth() == 1
+        assert await leases(redis, "p") == 2
+
+        await controller.release(first)
+        third = await asyncio.wait_for(waiting, 1)
+        assert await controller.get_queue_depth() == 0
+
+        for ticket in (second, third):
+            await controller.release(ticket)
+
+    asyncio.run(main())
+
+
+def test_queued_requests_are_admitted_in_order(redis: FakeAsyncRedis) -> None:
+    async def main() -> None:
+        controller = make_controller(global_limit=1, partition_limit=1)
+        holder = await controller.acquire("p")
+        earlier = asyncio.create_task(controller.acquire("p"))
+        await asyncio.sleep(0.05)
+        later = asyncio.create_task(controller.acquire("p"))
+        await asyncio.sleep(0.05)
+
+        await controller.release(holder)
+        admitted = await asyncio.wait_for(earlier, 1)
+        await asyncio.sleep(0.05)
+        assert not later.done()
+
+        await controller.release(admitted)
+        await controller.release(await asyncio.wait_for(later, 1))
+
+    asyncio.run(main())
+
+
+def test_full_queue_is_rejected(redis: FakeAsyncRedis) -> None:
+    async def main() -> None:
+        controller = make_controller(global_limit=1, partition_limit=1, queue_size=1)
+        holder = await controller.acquire("p")
+        waiting = asyncio.create_task(controller.acquire("p"))
+        await asyncio.sleep(0.05)
+
+        with pytest.raises(TooManyRequestsError):
+            await controller.acquire("p")
+
+        waiting.cancel()
+        await controller.release(holder)
+
+    asyncio.run(main())
+
+
+def test_cancelled_request_leaves_the_queue(redis: FakeAsyncRedis) -> None:
+    async def main() -> None:
+        controller = make_controller(global_limit=1, partition_limit=1)
+        holder = await controller.acquire("p")
+        waiting = asyncio.create_task(controller.acquire("p"))
+        await asyncio.sleep(0.05)
+
+        waiting.cancel()
+        await asyncio.gather(waiting, return_exceptions=True)
+        assert await controller.get_queue_depth() == 0
+
+        await controller.release(holder)
+        assert await leases(redis, "p") == 0
+
+    asyncio.run(main())
+
+
+def test_release_leaves_no_lease(redis: FakeAsyncRedis) -> None:
+    async def main() -> None:
+        controller = make_controller()
+        ticket = await controller.acquire("p")
+        await controller.release(ticket)
+
+        assert await leases(redis, "p") == 0
+        assert await redis.zcard("chat:admission:leases") == 0
+        assert not controller._renew_tasks
+
+    asyncio.run(main())
+
+
+def test_leases_are_renewed_while_held(redis: FakeAsyncRedis) -> None:
+    async def main() -> None:
+        controller = make_controller(
+            global_limit=1, partition_limit=1, lease_ttl_seconds=1
+        )
+        ticket = await controller.acquire("p")
+        await asyncio.sleep(1.5)
+
+        # Would take the slot over, had the lease expired
+        with pytest.raises(TooManyRequestsError):
+            await make_controller(
+                global_limit=1,
+                partition_limit=1,
+                lease_ttl_seconds=1,
+                queue_timeout_seconds=0.1,
+            ).acquire("p")
+
+        await controller.release(ticket)
+
+    asyncio.run(main())
+
+
+def test_leases_expire_past_the_request_deadline(redis: FakeAsyncRedis) -> None:
+    async def main() -> None:
+        controller = make_controller(
+            global_limit=1, partition_limit=1, lease_ttl_seconds=1
+        )
+        set_deadline(asyncio.get_running_loop().time() + 0.2)
+        # Abandoned, never released
+        await controller.acquire("p")
+        set_deadline(None)
+        await asyncio.sleep(1.6)
+
+        assert not controller._renew_tasks
+        ticket = await asyncio.wait_for(controller.acquire("p"), 1)
+        await controller.release(ticket)
+
+    asyncio.run(main())
+
+
+def test_disabled_controller_admits_everything(redis: FakeAsyncRedis) -> None:
+    async def main() -> None:
+        assert await make_controller(enabled=False).acquire("p") is None
+
+    asyncio.run(main())
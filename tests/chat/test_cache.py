@@ -0,0 +1,99 @@
+import asyncio
+import time
+
+import pytest
+from fakeredis import FakeAsyncRedis
+
+from src.chat.cache import SemanticAnswerCache
+from src.tools.cache import tool_cache
+
+
+def make_cache() -> SemanticAnswerCache:
+    return SemanticAnswerCache(threshold=0.9, ttl_seconds=60, max_entries=2)
+
+
+def test_hits_only_above_the_threshold(redis: FakeAsyncRedis) -> None:
+    async def main() -> None:
+        cache = make_cache()
+        await cache.set("p", "default", "question", [1.0, 0.0], "answer")
+
+        # cos = 0.995, the norm of the query doesn't matter
+        cached = await cache.get("p", "default", [10.0, 1.0])
+        assert cached is not None
+        assert cached.response == "answer"
+        assert cached.similarity > 0.99
+
+        # cos = 0.707
+        assert await cache.get("p", "default", [1.0, 1.0]) is None
+
+    asyncio.run(main())
+
+
+def test_returns_the_closest_answer(redis: FakeAsyncRedis) -> None:
+    async def main() -> None:
+        cache = make_cache()
+        await cache.set("p", "default", "first", [1.0, 0.0, 0.0], "a")
+        await cache.set("p", "default", "second", [0.0, 1.0, 0.0], "b")
+
+        cached = await cache.get("p", "default", [0.1, 1.0, 0.0])
+        assert cached is not None and cached.query == "second"
+
+    asyncio.run(main())
+
+
+def test_keeps_the_latest_entries(redis: FakeAsyncRedis) -> None:
+    async def main() -> None:
+        cache = make_cache()
+        for i in range(3):
+            embedding = [0.0, 0.0, 0.0]
+            embedding[i] = 1.0
+            await cache.set("p", "default", f"q{i}", embedding, f"a{i}")
+
+        assert await cache.get("p", "default", [1.0, 0.0, 0.0]) is None
+        assert await cache.get("p", "default", [0.0, 0.0, 1.0]) is not None
+
+    asyncio.run(main())
+
+
+def test_partition_changes_invalidate_answers(redis: FakeAsyncRedis) -> None:
+    async def main() -> None:
+        cache = make_cache()
+        await cache.set("p", "default", "question", [1.0, 0.0], "answer")
+        await tool_cache.invalidate_partition("p")
+
+        assert await cache.get("p", "default", [1.0, 0.0]) is None
+
+        await cache.set("p", "default", "question", [1.0, 0.0], "new answer")
+        cached = await cache.get("p", "default", [1.0, 0.0])
+        assert cached is not None and cached.response == "new answer"
+
+    asyncio.run(main())
+
+
+def test_answers_are_scoped_to_partition_and_tool_group(
+    redis: FakeAsyncRedis,
+) -> None:
+    async def main() -> None:
+        cache = make_cache()
+        await cache.set("p", "default", "question", [1.0, 0.0], "answer")
+
+        assert await cache.get("q", "default", [1.0, 0.0]) is None
+        assert await cache.get("p", "other", [1.0, 0.0]) is None
+        # Embedded by another model
+        assert await cache.get("p", "default", [1.0, 0.0, 0.0]) is None
+
+    asyncio.run(main())
+
+
+def test_expired_answers_are_ignored(
+    redis: FakeAsyncRedis, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    async def main() -> None:
+        cache = make_cache()
+        await cache.set("p", "default", "question", [1.0, 0.0], "answer")
+
+        later = time.time() + 61
+        monkeypatch.setattr(time, "time", lambda: later)
+        assert await cache.get("p", "default", [1.0, 0.0]) is None
+
+    asyncio.run(main())
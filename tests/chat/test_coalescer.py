@@ -0,0 +1,127 @@
+import asyncio
+from typing import Any, Dict, List
+
+import pytest
+from fakeredis import FakeAsyncRedis
+
+from src.chat.coalescer import RequestCoalescer
+
+
+def make_coalescer(**kwargs: float) -> RequestCoalescer:
+    settings = {
+        "lock_ttl_seconds": 60,
+        "result_ttl_seconds": 60,
+        "poll_interval_seconds": 0.01,
+        **kwargs,
+    }
+    return RequestCoalescer(**settings)  # type: ignore[arg-type]
+
+
+def test_key_ignores_case_and_whitespace() -> None:
+    key = RequestCoalescer._get_key("p", "default", "What is  RAG?", "auto", 30.0)
+
+    assert key == RequestCoalescer._get_key(
+        "p", "default", " what is rag? ", "auto", 30.0
+    )
+
+
+def test_key_separates_paths_and_time_budgets() -> None:
+    key = RequestCoalescer._get_key("p", "default", "question", "auto", 30.0)
+
+    assert key != RequestCoalescer._get_key("p", "default", "question", "plan", 30.0)
+    assert key != RequestCoalescer._get_key("p", "default", "question", "auto", 60.0)
+    assert key != RequestCoalescer._get_key("p", "other", "question", "auto", 30.0)
+    assert key != RequestCoalescer._get_key("q", "default", "question", "auto", 30.0)
+
+
+def test_identical_requests_run_once(redis: FakeAsyncRedis) -> None:
+    async def main() -> None:
+        runs: List[str] = []
+
+        async def loader() -> Dict[str, Any]:
+            runs.append("run")
+            await asyncio.sleep(0.05)
+            return {"response": "answer"}
+
+        # Separate instances share the run through Redis, as workers do
+        results = await asyncio.gather(
+            *(
+                coalescer.run("p", "default", message, "auto", 30.0, loader)
+                for coalescer, message in [
+                    (make_coalescer(), "question"),
+                    (make_coalescer(), "Question"),
+                    (make_coalescer(), "question "),
+                ]
+            )
+        )
+
+        assert runs == ["run"]
+        assert results == [{"response": "answer"}] * 3
+
+    asyncio.run(main())
+
+
+def test_lock_is_released_after_the_run(redis: FakeAsyncRedis) -> None:
+    async def main() -> None:
+        async def loader() -> Dict[str, Any]:
+            return {"response": "answer"}
+
+        await make_coalescer().run("p", "default", "question", "auto", 30.0, loader)
+
+        assert await redis.keys("*:lock") == []
+        assert len(await redis.keys("*:result")) == 1
+
+    asyncio.run(main())
+
+
+def test_waiter_runs_when_the_holder_fails(redis: FakeAsyncRedis) -> None:
+    async def main() -> None:
+        holder_started = asyncio.Event()
+
+        async def failing_loader() -> Dict[str, Any]:
+            holder_started.set()
+            await asyncio.sleep(0.05)
+            raise RuntimeError("run failed")
+
+        async def loader() -> Dict[str, Any]:
+            return {"response": "answer"}
+
+        holder = asyncio.create_task(
+            make_coalescer().run(
+                "p", "default", "question", "auto", 30.0, failing_loader
+            )
+        )
+        await holder_started.wait()
+        waiter = make_coalescer().run("p", "default", "question", "auto", 30.0, loader)
+
+        assert await waiter == {"response": "answer"}
+        with pytest.raises(RuntimeError):
+            await holder
+
+    asyncio.run(main())
+
+
+def test_lock_is_renewed_while_the_run_goes_on(redis: FakeAsyncRedis) -> None:
+    async def main() -> None:
+        runs: List[str] = []
+
+        async def loader() -> Dict[str, Any]:
+            runs.append("run")
+            # Outlives the lock TTL
+            await asyncio.sleep(1.5)
+            return {"response": "answer"}
+
+        holder = asyncio.create_task(
+            make_coalescer(lock_ttl_seconds=1).run(
+                "p", "default", "question", "auto", 30.0, loader
+            )
+        )
+        await asyncio.sleep(0.05)
+        waiter = make_coalescer(lock_ttl_seconds=1).run(
+            "p", "default", "question", "auto", 30.0, loader
+        )
+
+        assert await asyncio.gather(holder, waiter) == [{"response": "answer"}] * 2
+        assert runs == ["run"]
+
+    asyncio.run(main())
@@ -0,0 +1,109 @@
+import asyncio
+from typing import Any, List, Optional
+
+from fakeredis import FakeAsyncRedis
+
+from src.chat.conversation import ConversationStore, ConversationTurn
+
+
+class FakeSummaryLLM:
+    """Summarizes every turn it is given into their user messages"""
+
+    def __init__(self, on_predict: Optional[Any] = None) -> None:
+        self.on_predict = on_predict
+        self.turns: List[str] = []
+
+    async def apredict(self, prompt: Any, summary_str: str, turns_str: str) -> str:
+        self.turns.append(turns_str)
+        if self.on_predict is not None:
+            await self.on_predict()
+        users = [line for line in turns_str.splitlines() if line.startswith("User:")]
+        return f"{summary_str} | " + ", ".join(users)
+
+
+def make_turn(i: int) -> ConversationTurn:
+    return ConversationTurn(user=f"q{i}", assistant=f"a{i}")
+
+
+async def append_turns(
+    store: ConversationStore, count: int, llm: FakeSummaryLLM
+) -> None:
+    for i in range(count):
+        await store.append("p", "c", make_turn(i), llm)  # type: ignore[arg-type]
+    await asyncio.gather(*store._compaction_tasks)
+
+
+def test_compaction_keeps_the_last_turns(redis: FakeAsyncRedis) -> None:
+    async def main() -> None:
+        store = ConversationStore(ttl_seconds=60, max_turns=4, keep_turns=2)
+        llm = FakeSummaryLLM()
+        await append_turns(store, 5, llm)
+
+        conversation = await store.load("p", "c")
+        assert [turn.user for turn in conversation.turns] == ["q3", "q4"]
+        assert conversation.summary == "None | User: q0, User: q1, User: q2"
+
+    asyncio.run(main())
+
+
+def test_no_compaction_up_to_max_turns(redis: FakeAsyncRedis) -> None:
+    async def main() -> None:
+        store = ConversationStore(ttl_seconds=60, max_turns=4, keep_turns=2)
+        llm = FakeSummaryLLM()
+        await append_turns(store, 4, llm)
+
+        conversation = await store.load("p", "c")
+        assert len(conversation.turns) == 4
+        assert conversation.summary is None
+        assert llm.turns == []
+
+    asyncio.run(main())
+
+
+def test_turns_appended_during_compaction_are_kept(redis: FakeAsyncRedis) -> None:
+    async def main() -> None:
+        store = ConversationStore(ttl_seconds=60, max_turns=2, keep_turns=1)
+
+        async def append_meanwhile() -> None:
+            await redis.rpush(
+                "partition:p:conversation:c:turns", make_turn(9).model_dump_json()
+            )
+
+        llm = FakeSummaryLLM(on_predict=append_meanwhile)
+        await append_turns(store, 3, llm)
+
+        conversation = await store.load("p", "c")
+        assert [turn.user for turn in conversation.turns] == ["q2", "q9"]
+        assert conversation.summary == "None | User: q0, User: q1"
+
+    asyncio.run(main())
+
+
+def test_compaction_is_skipped_while_locked(redis: FakeAsyncRedis) -> None:
+    async def main() -> None:
+        store = ConversationStore(ttl_seconds=60, max_turns=2, keep_turns=1)
+        await redis.set("partition:p:conversation:c:lock", "other")
+        llm = FakeSummaryLLM()
+        await append_turns(store, 3, llm)
+
+        assert len((await store.load("p", "c")).turns) == 3
+        assert llm.turns == []
+
+    asyncio.run(main())
+
+
+def test_failed_compaction_keeps_every_turn(redis: FakeAsyncRedis) -> None:
+    async def main() -> None:
+        store = ConversationStore(ttl_seconds=60, max_turns=2, keep_turns=1)
+
+        async def fail() -> None:
+            raise RuntimeError("LLM unavailable")
+
+        await append_turns(store, 3, FakeSummaryLLM(on_predict=fail))
+
+        conversation = await store.load("p", "c")
+        assert len(conversation.turns) == 3
+        assert conversation.summary is None
+        assert await redis.get("partition:p:conversation:c:lock") is None
+
+    asyncio.run(main())
@@ -0,0 +1,118 @@
+import asyncio
+from typing import Any, AsyncGenerator, List, Sequence
+
+from llama_index.core.base.llms.types import ChatMessage, ChatResponse, MessageRole
+from llama_index.core.llms.llm import ToolSelection
+from llama_index.core.tools import BaseTool, FunctionTool
+
+from src.chat.planner import PlanExecutor, SingleToolExecutor, run_to_output
+from src.tools.context import CONTEXT_RETRIEVER_ATTR
+from src.utils import set_instance_var
+
+
+def lookup(query: str) -> str:
+    """Looks the query up"""
+    return f"result for {query}"
+
+
+class FakePlanningLLM:
+    """Plans tool_count lookup calls, then records the answer request"""
+
+    def __init__(self, tool_count: int) -> None:
+        self.tool_count = tool_count
+        self.answer_messages: List[ChatMessage] = []
+
+    async def achat_with_tools(
+        self, tools: Sequence[BaseTool], chat_history: List[ChatMessage], **_: Any
+    ) -> ChatResponse:
+        tool_calls = [
+            {
+                "id": f"call_{i}",
+                "type": "function",
+                "function": {"name": "lookup", "arguments": f'{{"query": "q{i}"}}'},
+            }
+            for i in range(self.tool_count)
+        ]
+        return ChatResponse(
+            message=ChatMessage(
+                role=MessageRole.ASSISTANT,
+                content="",
+                additional_kwargs={"tool_calls": tool_calls},
+            )
+        )
+
+    def get_tool_calls_from_response(
+        self, response: ChatResponse, **_: Any
+    ) -> List[ToolSelection]:
+        return [
+            ToolSelection(
+                tool_id=tool_call["id"],
+                tool_name=tool_call["function"]["name"],
+                tool_kwargs={"query": tool_call["id"]},
+            )
+            for tool_call in response.message.additional_kwargs["tool_calls"]
+        ]
+
+    async def astream_chat(
+        self, messages: List[ChatMessage]
+    ) -> AsyncGenerator[ChatResponse, None]:
+        self.answer_messages = messages
+
+        async def gen() -> AsyncGenerator[ChatResponse, None]:
+            yield ChatResponse(
+                message=ChatMessage(role=MessageRole.ASSISTANT, content="answer"),
+                delta="answer",
+            )
+
+        return gen()
+
+
+def test_tool_calls_past_the_cap_are_dropped_from_the_answer_request() -> None:
+    llm = FakePlanningLLM(tool_count=5)
+    executor = PlanExecutor(
+        llm=llm,  # type: ignore[arg-type]
+        tools=[FunctionTool.from_defaults(fn=lookup, name="lookup")],
+        system_prompt="system",
+        max_tool_calls=2,
+    )
+
+    output = asyncio.run(run_to_output(executor.stream_events("question")))
+
+    assert output.response.content == "answer"
+    assistant = next(
+        message
+        for message in llm.answer_messages
+        if message.role == MessageRole.ASSISTANT
+    )
+    sent_ids = [
+        tool_call["id"] for tool_call in assistant.additional_kwargs["tool_calls"]
+    ]
+    answered_ids = [
+        message.additional_kwargs["tool_call_id"]
+        for message in llm.answer_messages
+        if message.role == MessageRole.TOOL
+    ]
+    assert sent_ids == ["call_0", "call_1"]
+    assert answered_ids == sent_ids
+
+
+def test_fast_path_answers_from_the_raw_chunks_in_one_call() -> None:
+    def synthesize(query: str) -> str:
+        raise AssertionError("The tool's own answer must not be asked for")
+
+    async def retrieve_context(query: str) -> str:
+        return f"chunks for {query}"
+
+    tool = FunctionTool.from_defaults(fn=synthesize, name="vector_tool")
+    set_instance_var(tool, CONTEXT_RETRIEVER_ATTR, retrieve_context)
+    llm = FakePlanningLLM(tool_count=0)
+    executor = SingleToolExecutor(
+        llm=llm,  # type: ignore[arg-type]
+        tool=tool,
+        system_prompt="system",
+    )
+
+    output = asyncio.run(run_to_output(executor.stream_events("question")))
+
+    assert output.response.content == "answer"
+    assert "chunks for question" in (llm.answer_messages[-1].content or "")
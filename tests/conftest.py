@@ -0,0 +1,32 @@
+import os
+from typing import Iterator
+
+import pytest
+from fakeredis import FakeAsyncRedis
+
+# Settings without defaults, never used to reach a real service in tests
+for name in (
+    "POSTGRES_DB",
+    "POSTGRES_USER",
+    "POSTGRES_PASSWORD",
+    "QDRANT_API_KEY",
+    "REDIS_PASSWORD",
+    "S3_ENDPOINT_URL",
+    "S3_ACCESS_KEY_ID",
+    "S3_SECRET_ACCESS_KEY",
+    "S3_BUCKET",
+    "OPENROUTER_API_KEY",
+    "NOVITA_API_KEY",
+    "DEEPINFRA_API_KEY",
+):
+    os.environ.setdefault(name, "test")
+
+
+@pytest.fixture
+def redis(monkeypatch: pytest.MonkeyPatch) -> Iterator[FakeAsyncRedis]:
+    """In-memory Redis, with Lua scripting, behind redis_manager"""
+    from src.database import redis_manager
+
+    client = FakeAsyncRedis(decode_responses=True)
+    monkeypatch.setattr(redis_manager, "_client", client)
+    yield client
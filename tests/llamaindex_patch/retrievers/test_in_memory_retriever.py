@@ -0,0 +1,76 @@
+from typing import List
+
+import numpy as np
+import pytest
+from llama_index.core import MockEmbedding
+from llama_index.core.schema import NodeWithScore, QueryBundle, TextNode
+
+from src.llamaindex_patch.retrievers.in_memory_retriever import (
+    InMemoryRetriever,
+    normalize_rows,
+)
+
+EMBEDDINGS = [
+    [1.0, 0.0, 0.0],
+    [0.0, 2.0, 0.0],
+    [3.0, 3.0, 0.0],
+    [0.0, 0.0, 5.0],
+    [1.0, 1.0, 1.0],
+]
+
+
+def make_retriever(similarity_top_k: int) -> InMemoryRetriever:
+    nodes = [TextNode(id_=f"node-{i}", text=f"chunk {i}") for i in range(5)]
+    return InMemoryRetriever(
+        nodes,
+        normalize_rows(EMBEDDINGS),
+        MockEmbedding(embed_dim=3),
+        similarity_top_k=similarity_top_k,
+    )
+
+
+def search(retriever: InMemoryRetriever, embedding: List[float]) -> List[NodeWithScore]:
+    return retriever.retrieve(QueryBundle(query_str="query", embedding=embedding))
+
+
+def test_normalize_rows() -> None:
+    matrix = normalize_rows([[3.0, 4.0], [0.0, 0.0]])
+
+    np.testing.assert_allclose(matrix, [[0.6, 0.8], [0.0, 0.0]])
+    np.testing.assert_allclose(normalize_rows([0.0, 2.0]), [0.0, 1.0])
+
+
+def test_returns_the_top_k_by_cosine_similarity() -> None:
+    results = search(make_retriever(similarity_top_k=3), [2.0, 1.0, 0.0])
+
+    assert [result.node.node_id for result in results] == [
+        "node-2",
+        "node-0",
+        "node-4",
+    ]
+    # Scores don't depend on the norm of either side
+    assert results[1].score == pytest.approx(2 / np.sqrt(5))
+    scores = [result.score for result in results]
+    assert scores == sorted(scores, reverse=True)
+
+
+def test_top_k_past_the_node_count_returns_every_node() -> None:
+    results = search(make_retriever(similarity_top_k=10), [0.0, 0.0, 1.0])
+
+    assert len(results) == 5
+    assert results[0].node.node_id == "node-3"
+    assert results[0].score == pytest.approx(1.0)
+
+
+def test_no_nodes() -> None:
+    retriever = InMemoryRetriever(
+        [], np.empty((0, 0), dtype=np.float32), MockEmbedding(embed_dim=3)
+    )
+    assert search(retriever, [1.0, 0.0, 0.0]) == []
+
+
+def test_every_node_needs_an_embedding() -> None:
+    with pytest.raises(ValueError):
+        InMemoryRetriever(
+            [TextNode(text="chunk")], normalize_rows(EMBEDDINGS), MockEmbedding(3)
+        )
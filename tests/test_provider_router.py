@@ -0,0 +1,131 @@
+import asyncio
+import json
+from typing import List
+
+import httpx
+
+from src.provider_router import (
+    ProviderEndpoint,
+    ProviderRouter,
+    ProviderRoutingTransport,
+    ProviderStats,
+)
+
+
+def make_router(**kwargs: object) -> ProviderRouter:
+    settings = {
+        "hedge_enabled": True,
+        "hedge_quantile": 0.9,
+        "hedge_min_delay": 0.5,
+        "hedge_default_delay": 3.0,
+        "window": 20,
+        "min_samples": 5,
+        "max_error_rate": 0.5,
+        **kwargs,
+    }
+    return ProviderRouter(**settings)  # type: ignore[arg-type]
+
+
+def test_stats_quantile() -> None:
+    stats = ProviderStats(window=10)
+    assert stats.quantile(0.5) is None
+
+    for latency in (5.0, 1.0, 4.0, 2.0, 3.0):
+        stats.record_success(latency)
+    assert stats.quantile(0.0) == 1.0
+    assert stats.quantile(0.5) == 3.0
+    assert stats.quantile(1.0) == 5.0
+
+
+def test_stats_window_drops_old_calls() -> None:
+    stats = ProviderStats(window=2)
+    stats.record_error()
+    stats.record_success(1.0)
+    stats.record_success(2.0)
+
+    assert list(stats.latencies) == [1.0, 2.0]
+    assert stats.error_rate == 0.0
+
+
+def test_hedge_delay_follows_the_latency_quantile() -> None:
+    router = make_router()
+    for latency in range(1, 11):
+        router.get_stats("a").record_success(float(latency))
+
+    assert router.get_hedge_delay("a") == 9.0
+
+
+def test_hedge_delay_defaults_and_bounds() -> None:
+    router = make_router()
+    # Too few samples
+    router.get_stats("a").record_success(10.0)
+    assert router.get_hedge_delay("a") == 3.0
+
+    for _ in range(5):
+        router.get_stats("b").record_success(0.1)
+    assert router.get_hedge_delay("b") == 0.5
+
+    assert make_router(hedge_enabled=False).get_hedge_delay("a") is None
+
+
+def test_unhealthy_endpoints_are_tried_last() -> None:
+    router = make_router()
+    for _ in range(5):
+        router.get_stats("a").record_error()
+        router.get_stats("c").record_success(1.0)
+
+    assert router.order(["a", "b", "c"]) == [1, 2, 0]
+
+
+def make_transport(
+    router: ProviderRouter, statuses: List[int], called: List[str]
+) -> ProviderRoutingTransport:
+    fallbacks = [
+        ProviderEndpoint(api_base=f"https://fallback{i}/v1", api_key="k", model="m")
+        for i in range(1, len(statuses))
+    ]
+    status_by_host = dict(
+        zip(["primary"] + [f"fallback{i}" for i in range(1, len(statuses))], statuses)
+    )
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        called.append(request.url.host)
+        return httpx.Response(status_by_host[request.url.host], json={})
+
+    return ProviderRoutingTransport(fallbacks, httpx.MockTransport(handler), router)
+
+
+def send(transport: ProviderRoutingTransport) -> httpx.Response:
+    request = httpx.Request(
+        "POST",
+        "https://primary/v1/chat/completions",
+        content=json.dumps({"model": "m", "messages": []}).encode(),
+    )
+    return asyncio.run(transport.handle_async_request(request))
+
+
+def test_failed_calls_fail_over_in_order() -> None:
+    called: List[str] = []
+    transport = make_transport(make_router(), [503, 502, 200], called)
+
+    assert send(transport).status_code == 200
+    assert called == ["primary", "fallback1", "fallback2"]
+
+
+def test_last_failure_is_returned_when_every_endpoint_fails() -> None:
+    called: List[str] = []
+    transport = make_transport(make_router(), [503, 429], called)
+
+    assert send(transport).status_code == 429
+    assert called == ["primary", "fallback1"]
+
+
+def test_unhealthy_primary_is_skipped() -> None:
+    router = make_router()
+    for _ in range(5):
+        router.get_stats("primary/m").record_error()
+    called: List[str] = []
+    transport = make_transport(router, [200, 200], called)
+
+    assert send(transport).status_code == 200
+    assert called == ["fallback1"]
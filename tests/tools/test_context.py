@@ -0,0 +1,82 @@
+import asyncio
+from typing import List
+
+from llama_index.core.schema import NodeWithScore, TextNode
+
+from src.embedding.constants import TOKEN_COUNT_KEY
+from src.tools.context import (
+    ContextAssembler,
+    assemble_retrieved_nodes,
+    start_context_assembler,
+)
+
+
+def make_nodes(*token_counts: int, prefix: str = "node") -> List[NodeWithScore]:
+    return [
+        NodeWithScore(
+            node=TextNode(
+                id_=f"{prefix}-{i}",
+                text=f"chunk {i}",
+                metadata={TOKEN_COUNT_KEY: token_count},
+            ),
+            score=1.0,
+        )
+        for i, token_count in enumerate(token_counts)
+    ]
+
+
+def node_ids(nodes: List[NodeWithScore]) -> List[str]:
+    return [node.node.node_id for node in nodes]
+
+
+def test_pack_keeps_nodes_in_order_within_the_call_cap() -> None:
+    nodes = make_nodes(40, 40, 40)
+
+    packed = ContextAssembler(token_budget=1000).pack(nodes, max_tokens=100)
+    assert node_ids(packed) == ["node-0", "node-1"]
+
+
+def test_pack_skips_nodes_too_large_for_what_is_left() -> None:
+    nodes = make_nodes(60, 50, 30)
+
+    packed = ContextAssembler(token_budget=1000).pack(nodes, max_tokens=100)
+    assert node_ids(packed) == ["node-0", "node-2"]
+
+
+def test_pack_dedupes_across_calls() -> None:
+    context_assembler = ContextAssembler(token_budget=1000)
+    nodes = make_nodes(10, 10, 10)
+
+    assert node_ids(context_assembler.pack(nodes[:2], max_tokens=100)) == [
+        "node-0",
+        "node-1",
+    ]
+    assert node_ids(context_assembler.pack(nodes, max_tokens=100)) == ["node-2"]
+    assert context_assembler.pack(nodes, max_tokens=100) == []
+
+
+def test_pack_stops_at_the_request_budget() -> None:
+    context_assembler = ContextAssembler(token_budget=100)
+    nodes = make_nodes(40, 40, 40, 10)
+
+    assert len(context_assembler.pack(nodes[:2], max_tokens=100)) == 2
+    assert context_assembler.remaining_tokens == 20
+    # Only the smaller chunk fits what is left of the budget
+    assert node_ids(context_assembler.pack(nodes, max_tokens=100)) == ["node-3"]
+    assert context_assembler.remaining_tokens == 10
+
+
+def test_assembled_context_explains_empty_calls() -> None:
+    async def main() -> None:
+        start_context_assembler(token_budget=100)
+        nodes = make_nodes(50)
+
+        assert "chunk 0" in assemble_retrieved_nodes(nodes, "a.pdf", 100)
+        assert "already provided" in assemble_retrieved_nodes(nodes, "a.pdf", 100)
+        assert "No more content" in assemble_retrieved_nodes(
+            make_nodes(200, prefix="other"), "b.pdf", 100
+        )
+        assert "No relevant content" in assemble_retrieved_nodes([], "c.pdf", 100)
+
+    # Run in a context of its own, the assembler is scoped to it
+    asyncio.run(main())